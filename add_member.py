@@ -1,23 +1,18 @@
 import psycopg
 import streamlit as st
-import pandas as pd
 from db_config import get_connection
+from record_picker import MEMBERS, fetch_record, record_picker
+from village_cache import bump_village, mno_list
+from village_events import publish
 
 
 def family_members_tab(user):
     st.title("👨‍👩‍👧‍👦 Family Members")
 
-    # --- Database Connection ---
-    conn = get_connection()
-    cur = conn.cursor()
-
     # --- Get Available M No for the User's Village ---
-    mno_list = pd.read_sql(
-        "SELECT m_no FROM m_no_register WHERE village_name = %s ORDER BY m_no",
-        conn, params=(user['village'],)
-    )
+    mno_list_df = mno_list(user['village'])
 
-    if mno_list.empty:
+    if mno_list_df.empty:
         st.warning("⚠️ कृपया आधी 'M No Register' मध्ये नोंदी जोडा.")
         st.stop()
 
@@ -38,7 +33,7 @@ def family_members_tab(user):
         with st.form("add_member_form", clear_on_submit=True):
             col1, col2 = st.columns(2)
             with col1:
-                mno = st.selectbox("M No निवडा:", mno_list["m_no"])
+                mno = st.selectbox("M No निवडा:", mno_list_df["m_no"])
                 member_name = st.text_input("सदस्याचे नाव:")
                 age = st.number_input("वय:", min_value=0, step=1)
                 gender = st.selectbox("लिंग:", ["Male", "Female", "Other"])
@@ -52,41 +47,32 @@ def family_members_tab(user):
                 if not member_name.strip():
                     st.warning("⚠️ कृपया सदस्याचे नाव भरा.")
                 else:
-                    try:
-                        cur.execute("""
-                            INSERT INTO family_members
-                            (village_name, m_no, member_name, age, gender, bp, sugar, other, mobile)
-                            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                        """, (
-                            user["village"], int(mno), member_name, int(age), gender, bp, sugar, other, mobile
-                        ))
-                        conn.commit()
-                        st.success(f"✅ '{member_name}' (M No {mno}) यांची नोंद जतन झाली.")
-                    except psycopg.Error as e:
-                        conn.rollback()
-                        st.error(f"❌ Database Error: {e.pgerror}")
+                    with get_connection() as conn:
+                        cur = conn.cursor()
+                        try:
+                            cur.execute("""
+                                INSERT INTO family_members
+                                (village_name, m_no, member_name, age, gender, bp, sugar, other, mobile)
+                                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+                            """, (
+                                user["village"], int(mno), member_name, int(age), gender, bp, sugar, other, mobile
+                            ))
+                            publish(cur, "family_members", user["village"])
+                            conn.commit()
+                            bump_village(user["village"])
+                            st.success(f"✅ '{member_name}' (M No {mno}) यांची नोंद जतन झाली.")
+                        except psycopg.Error as e:
+                            conn.rollback()
+                            st.error(f"❌ Database Error: {e.pgerror}")
 
     # ------------------ EDIT MEMBER ------------------
     elif action == "✏️ Edit Member":
         st.subheader("✏️ सदस्य माहिती संपादित करा")
 
-        member_list = pd.read_sql("""
-            SELECT id, member_name, m_no FROM family_members
-            WHERE village_name = %s ORDER BY m_no
-        """, conn, params=(user['village'],))
-
-        if not member_list.empty:
-            member_display = member_list.apply(lambda x: f"M No {x['m_no']} - {x['member_name']}", axis=1)
-            selected = st.selectbox("संपादनासाठी सदस्य निवडा:", member_display)
+        selected_id = record_picker("संपादनासाठी सदस्य निवडा:", MEMBERS, user['village'], key="edit_member")
 
-            selected_id = int(
-                member_list.loc[member_display == selected, "id"].values[0]
-            )
-
-            cur.execute("SELECT * FROM family_members WHERE id = %s", (selected_id,))
-            rec = cur.fetchone()
-            cols = [d[0] for d in cur.description]
-            data = dict(zip(cols, rec))
+        if selected_id is not None:
+            data = fetch_record("family_members", selected_id, user['village'])
 
             with st.form("edit_member_form"):
                 col1, col2 = st.columns(2)
@@ -102,47 +88,40 @@ def family_members_tab(user):
                     mobile = st.text_input("मोबाईल क्रमांक:", value=data["mobile"])
 
                 if st.form_submit_button("💾 बदल जतन करा"):
-                    try:
-                        cur.execute("""
-                            UPDATE family_members
-                            SET member_name=%s, age=%s, gender=%s, bp=%s, sugar=%s, other=%s, mobile=%s
-                            WHERE id=%s
-                        """, (member_name, int(age), gender, bp, sugar, other, mobile, selected_id))
-                        conn.commit()
-                        st.success("✅ सदस्य माहिती यशस्वीरित्या अद्यतनित झाली.")
-                        st.rerun()
-                    except psycopg2.Error as e:
-                        conn.rollback()
-                        st.error(f"❌ Edit Error: {e.pgerror}")
-        else:
-            st.info("⛔ सध्या कोणतीही सदस्य नोंद उपलब्ध नाही.")
+                    with get_connection() as conn:
+                        cur = conn.cursor()
+                        try:
+                            cur.execute("""
+                                UPDATE family_members
+                                SET member_name=%s, age=%s, gender=%s, bp=%s, sugar=%s, other=%s, mobile=%s
+                                WHERE id=%s
+                            """, (member_name, int(age), gender, bp, sugar, other, mobile, selected_id))
+                            publish(cur, "family_members", user["village"])
+                            conn.commit()
+                            bump_village(user["village"])
+                            st.success("✅ सदस्य माहिती यशस्वीरित्या अद्यतनित झाली.")
+                            st.rerun()
+                        except psycopg.Error as e:
+                            conn.rollback()
+                            st.error(f"❌ Edit Error: {e.pgerror}")
 
     # ------------------ DELETE MEMBER ------------------
     elif action == "❌ Delete Member":
         st.subheader("❌ सदस्य हटवा")
 
-        member_list = pd.read_sql("""
-            SELECT id, member_name, m_no FROM family_members
-            WHERE village_name = %s ORDER BY m_no
-        """, conn, params=(user['village'],))
-
-        if not member_list.empty:
-            member_display = member_list.apply(lambda x: f"M No {x['m_no']} - {x['member_name']}", axis=1)
-            selected = st.selectbox("हटवण्यासाठी सदस्य निवडा:", member_display)
+        selected_id = record_picker("हटवण्यासाठी सदस्य निवडा:", MEMBERS, user['village'], key="delete_member")
 
+        if selected_id is not None:
             if st.button("🗑️ सदस्य हटवा"):
-                selected_id = int(
-                    member_list.loc[member_display == selected, "id"].values[0]
-                )
-                try:
-                    cur.execute("DELETE FROM family_members WHERE id = %s", (selected_id,))
-                    conn.commit()
-                    st.success("✅ सदस्य नोंद हटवली गेली.")
-                    st.rerun()
-                except psycopg.Error as e:
-                    conn.rollback()
-                    st.error(f"❌ Delete Error: {e.pgerror}")
-        else:
-            st.info("⛔ हटवण्यासाठी कोणतीही सदस्य नोंद नाही.")
-
-    conn.close()
+                with get_connection() as conn:
+                    cur = conn.cursor()
+                    try:
+                        cur.execute("DELETE FROM family_members WHERE id = %s", (selected_id,))
+                        publish(cur, "family_members", user["village"])
+                        conn.commit()
+                        bump_village(user["village"])
+                        st.success("✅ सदस्य नोंद हटवली गेली.")
+                        st.rerun()
+                    except psycopg.Error as e:
+                        conn.rollback()
+                        st.error(f"❌ Delete Error: {e.pgerror}")
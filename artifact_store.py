@@ -0,0 +1,180 @@
+# artifact_store.py
+"""
+Content-addressed cache for generated PDF / DOCX files.
+
+Many outputs are byte-identical across users and reruns: the blank
+register book for a given set-count dict, a survey form for a page
+count, the yearly diary for a year. Each is stored under the sha256 of
+
+    (generator, version, inputs, data_version)
+
+so a repeat request is a memory hit or one disk read instead of a render,
+and identical requests arriving together share one render:
+
+    pdf = cached_artifact("reg.register_book", engine_version(), register_sets,
+                          lambda: render_register_book(register_sets))
+
+``version`` must change whenever the generator's output would (layout,
+font build); ``data_version`` is for outputs built from database rows,
+e.g. the village_cache version of the village.
+
+Files live under .cache/artifacts/ and survive restarts. The most
+recently used ones are also kept in memory. Both tiers are bounded and
+evict least-recently-used entries first.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+from assets import CACHE_DIR, write_atomic
+from single_flight import get_flights
+
+ARTIFACT_DIR = CACHE_DIR / "artifacts"
+MAX_DISK_BYTES = 512 * 1024 * 1024
+MAX_MEMORY_BYTES = 64 * 1024 * 1024
+
+
+def artifact_key(generator, version, inputs, data_version=None):
+    """sha256 of the canonical JSON of everything the output depends on."""
+    payload = json.dumps([generator, version, inputs, data_version], ensure_ascii=False, sort_keys=True,
+                         separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArtifactStore:
+    """Thread-safe two-tier (memory LRU → disk) {key: bytes} store."""
+
+    def __init__(self, root=ARTIFACT_DIR, max_disk_bytes=MAX_DISK_BYTES, max_memory_bytes=MAX_MEMORY_BYTES):
+        self.root = root
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> bytes, most recently used last
+        self._memory_bytes = 0
+        self._disk = None  # key -> size, oldest first; scanned on first use
+        self._disk_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return self.root / key[:2] / f"{key}.bin"
+
+    def _scan(self):
+        """Index what earlier processes left on disk, least recently used first."""
+        if self._disk is not None:
+            return
+        found = []
+        if self.root.exists():
+            for path in self.root.glob("*/*.bin"):
+                stat = path.stat()
+                found.append((stat.st_mtime, path.stem, stat.st_size))
+        self._disk = OrderedDict((key, size) for _, key, size in sorted(found))
+        self._disk_bytes = sum(self._disk.values())
+
+    def _remember(self, key, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def get(self, key, record=True):
+        """Bytes stored under ``key`` or None; ``record=False`` leaves the hit/miss counters alone."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += record
+                return data
+            self._scan()
+            if key not in self._disk:
+                self.misses += record
+                return None
+        try:
+            path = self._path(key)
+            data = path.read_bytes()
+            os.utime(path)  # mtime is the LRU order after a restart
+        except FileNotFoundError:  # evicted by another process
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+                self.misses += record
+            return None
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self._remember(key, data)
+            self.disk_hits += record
+        return data
+
+    def put(self, key, data):
+        write_atomic(self._path(key), data)
+        with self._lock:
+            self._scan()
+            self._disk_bytes += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._remember(key, data)
+            evict = []
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                old, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                evict.append(old)
+                if old in self._memory:
+                    self._memory_bytes -= len(self._memory.pop(old))
+            self.evictions += len(evict)
+        for old in evict:
+            self._path(old).unlink(missing_ok=True)
+
+    def get_or_create(self, key, build, record=True):
+        data = self.get(key, record)
+        if data is None:
+            data = build()
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._scan()
+            keys = list(self._disk)
+            self._disk.clear()
+            self._disk_bytes = 0
+            self._memory.clear()
+            self._memory_bytes = 0
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    def stats(self):
+        with self._lock:
+            self._scan()
+            return {"files": len(self._disk), "disk_bytes": self._disk_bytes,
+                    "memory_entries": len(self._memory), "memory_bytes": self._memory_bytes,
+                    "memory_hits": self.memory_hits, "disk_hits": self.disk_hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+
+@st.cache_resource
+def get_store():
+    return ArtifactStore()
+
+
+def cached_artifact(generator, version, inputs, build, data_version=None):
+    """Bytes of ``build()``, served from the store when the same inputs were built before.
+
+    Concurrent misses for the same key share one build (see single_flight).
+    """
+    store = get_store()
+    key = artifact_key(generator, version, inputs, data_version)
+    data = store.get(key)
+    if data is None:
+        # Re-checked inside the flight: an identical render may have just finished
+        data = get_flights().do(key, lambda: store.get_or_create(key, build, record=False), label=generator)
+    return data
@@ -0,0 +1,293 @@
+# assets.py
+"""
+Process-wide cache of the binary assets the PDF generators use.
+
+Each asset is read from disk once per process (not on every rerun) and
+is addressed by the sha256 of its content, so callers can use the digest
+as a cache / version key.
+
+Generated pages do not inline the assets. publish() copies them under
+static/assets/ (served by Streamlit's static file serving, see
+.streamlit/config.toml) and returns a content-versioned URL; Tornado
+sends a long-lived Cache-Control header for URLs carrying ``?v=``, so a
+browser downloads the font and logo once. pdfmake_assets_js() is the
+loader the pdfMake pages include in place of the old base64 strings:
+
+    from assets import FONT_PATH, pdf_font, pdfmake_assets_js
+    loader = pdfmake_assets_js(fonts={"Marathi.ttf": pdf_font()})
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import streamlit as st
+from font_build import BUILD_VERSION, build_pdf_font
+
+BASE_DIR = Path(__file__).resolve().parent
+FONT_PATH = BASE_DIR / "fonts" / "NotoSerifDevanagari-VariableFont_wdth,wght.ttf"
+LOGO_PATH = BASE_DIR / "fonts" / "img.png"
+STATIC_DIR = BASE_DIR / "static"
+PUBLISHED_DIR = STATIC_DIR / "assets"
+STATIC_URL = "app/static"  # relative, so it also resolves inside components.html iframes
+CACHE_DIR = BASE_DIR / ".cache"
+
+PDFMAKE_VERSION = "0.1.72"
+PDFMAKE_CDN_URL = f"https://cdnjs.cloudflare.com/ajax/libs/pdfmake/{PDFMAKE_VERSION}/pdfmake.min.js"
+PDFMAKE_PATH = STATIC_DIR / "vendor" / f"pdfmake-{PDFMAKE_VERSION}.min.js"  # see vendor_pdfmake.py
+# sha256 of the vendored bundle; vendor_pdfmake.py pins it on first download and
+# refuses a different file after that. A local copy that does not match is not served.
+PDFMAKE_SHA256 = None
+
+_build_lock = threading.Lock()
+
+log = logging.getLogger(__name__)
+
+
+def write_atomic(path, data):
+    """Write then rename, so a concurrent reader never sees half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class Asset:
+    """Raw bytes of one file plus its content hash; base64 is encoded on first use."""
+
+    def __init__(self, path, data):
+        self.path = Path(path)
+        self.data = data
+        self.sha256 = hashlib.sha256(data).hexdigest()
+        self._b64 = None
+        self._lock = threading.Lock()
+
+    @property
+    def b64(self):
+        with self._lock:
+            if self._b64 is None:
+                self._b64 = base64.b64encode(self.data).decode()
+            return self._b64
+
+    @property
+    def size(self):
+        return len(self.data)
+
+
+class AssetStore:
+    """Thread-safe {path: Asset} / {sha256: Asset} registry."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_path = {}
+        self._by_hash = {}
+        self._urls = {}
+
+    def load(self, path):
+        path = Path(path)
+        with self._lock:
+            asset = self._by_path.get(path)
+        if asset is None:
+            asset = Asset(path, path.read_bytes())
+            with self._lock:
+                # Same content under another path shares one Asset
+                asset = self._by_hash.setdefault(asset.sha256, asset)
+                self._by_path[path] = asset
+        return asset
+
+    def publish(self, asset, name=None):
+        """Copy ``asset`` under static/assets/ once and return its versioned URL."""
+        name = name or asset.path.name
+        key = (name, asset.sha256)
+        with self._lock:
+            url = self._urls.get(key)
+        if url is None:
+            target = PUBLISHED_DIR / name
+            if not target.exists() or hashlib.sha256(target.read_bytes()).hexdigest() != asset.sha256:
+                write_atomic(target, asset.data)
+            url = f"{STATIC_URL}/assets/{name}?v={asset.sha256[:16]}"
+            with self._lock:
+                self._urls[key] = url
+        return url
+
+    def by_hash(self, digest):
+        with self._lock:
+            return self._by_hash.get(digest)
+
+    def stats(self):
+        with self._lock:
+            return {"assets": len(self._by_hash),
+                    "bytes": sum(a.size for a in self._by_hash.values())}
+
+
+@st.cache_resource
+def get_store():
+    return AssetStore()
+
+
+def font():
+    """The Devanagari font used by every PDF generator."""
+    return get_store().load(FONT_PATH)
+
+
+def pdf_font():
+    """Instanced + subset build of the font (see font_build) – what the PDFs embed.
+
+    Built once per source font / BUILD_VERSION and cached under .cache/.
+    """
+    source = font()
+    path = CACHE_DIR / f"pdf-font-{source.sha256[:16]}-v{BUILD_VERSION}.ttf"
+    if not path.exists():
+        with _build_lock:
+            if not path.exists():
+                write_atomic(path, build_pdf_font(source.data))
+    return get_store().load(path)
+
+
+def logo():
+    """Logo embedded in the monthly final report."""
+    return get_store().load(LOGO_PATH)
+
+
+def publish(asset, name=None):
+    """Versioned static URL for an asset (see AssetStore.publish)."""
+    return get_store().publish(asset, name)
+
+
+# Streamlit serves .js static files as text/plain with nosniff, so a
+# <script src> would be refused. The vendored file is fetched synchronously
+# (the page's inline scripts use pdfMake right away) through the browser
+# cache and evaluated globally; if that fails the CDN copy is used.
+_PDFMAKE_SCRIPT = """<script>
+(function () {
+  var xhr = new XMLHttpRequest();
+  try {
+    xhr.open("GET", __URL__, false);
+    xhr.send();
+  } catch (e) {}
+  if (xhr.status === 200) {
+    (0, eval)(xhr.responseText);
+  } else {
+    document.write('<script src="__CDN__"><\\/script>');
+  }
+})();
+</script>"""
+
+
+@st.cache_resource
+def _vendored_pdfmake():
+    """(asset, None) for a bundle matching PDFMAKE_SHA256, else (None, problem) – logged once."""
+    if not PDFMAKE_PATH.exists():
+        problem = f"{PDFMAKE_PATH.relative_to(BASE_DIR)} is missing – run vendor_pdfmake.py"
+    elif PDFMAKE_SHA256 is None:
+        problem = "assets.PDFMAKE_SHA256 is not pinned – run vendor_pdfmake.py"
+    else:
+        asset = get_store().load(PDFMAKE_PATH)
+        if asset.sha256 == PDFMAKE_SHA256:
+            return asset, None
+        problem = f"{PDFMAKE_PATH.relative_to(BASE_DIR)} sha256 {asset.sha256[:16]}… does not match PDFMAKE_SHA256"
+    log.error("%s; PDF pages load pdfmake from cdnjs and need internet access", problem)
+    return None, problem
+
+
+def pdfmake_problem():
+    """Why the vendored pdfmake is not being served (shown in Admin), or None."""
+    return _vendored_pdfmake()[1]
+
+
+def pdfmake_script():
+    """<script> markup defining pdfMake from the vendored, versioned copy.
+
+    vfs_fonts.js (Roboto) is not loaded: every page registers its own
+    font through pdfmake_assets_js().
+    """
+    asset, _ = _vendored_pdfmake()
+    if asset is None:
+        return f'<script src="{PDFMAKE_CDN_URL}"></script>'
+    url = f"{STATIC_URL}/vendor/{PDFMAKE_PATH.name}?v={asset.sha256[:16]}"
+    return _PDFMAKE_SCRIPT.replace("__URL__", json.dumps(url)).replace("__CDN__", PDFMAKE_CDN_URL)
+
+
+_PDFMAKE_LOADER = """
+(function () {
+  function toBase64(buffer) {
+    const bytes = new Uint8Array(buffer);
+    let binary = "";
+    for (let i = 0; i < bytes.length; i += 0x8000) {
+      binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+    }
+    return btoa(binary);
+  }
+  function load(name, url) {
+    return fetch(url).then(function (r) {
+      if (!r.ok) { throw new Error(url + " → HTTP " + r.status); }
+      return r.arrayBuffer();
+    }).then(function (buffer) { pdfMake.vfs[name] = toBase64(buffer); });
+  }
+  pdfMake.vfs = pdfMake.vfs || {};
+  const files = __FILES__;
+  const images = __IMAGES__;
+  let ready = false;
+  window.mpwAssetsReady = Promise.all(Object.keys(files).map(function (name) { return load(name, files[name]); }))
+    .then(function () { ready = true; });
+  // Documents are created only once every file is in the vfs; images are
+  // referenced by their vfs name through the docDefinition image dictionary.
+  const create = pdfMake.createPdf.bind(pdfMake);
+  pdfMake.createPdf = function (docDefinition) {
+    const rest = Array.prototype.slice.call(arguments, 1);
+    function build() {
+      docDefinition.images = Object.assign({}, images, docDefinition.images || {});
+      return create.apply(null, [docDefinition].concat(rest));
+    }
+    const doc = {};
+    ["download", "open", "print", "getBase64", "getDataUrl", "getBlob", "getBuffer"].forEach(function (method) {
+      doc[method] = function () {
+        const args = Array.prototype.slice.call(arguments);
+        if (ready) {
+          const real = build();
+          return real[method].apply(real, args);
+        }
+        // On a slow link the fonts may still be loading when the button is
+        // clicked. open()/print() call window.open, which the browser only
+        // allows during the click, so the window is opened now and handed
+        // to pdfmake's open(options, win) / print(options, win) later.
+        let win = null;
+        if ((method === "open" || method === "print") && !args[1]) {
+          win = window.open("", "_blank");
+          args[0] = args[0] || {};
+          args[1] = win;
+        }
+        return window.mpwAssetsReady.then(function () {
+          const real = build();
+          return real[method].apply(real, args);
+        }).catch(function (e) {
+          if (win) { win.close(); }
+          console.error(e);
+          alert("PDF: " + e.message);
+        });
+      };
+    });
+    return doc;
+  };
+})();
+"""
+
+
+def pdfmake_assets_js(fonts=None, images=None):
+    """JS that loads fonts / images into pdfMake.vfs from their static URLs.
+
+    ``fonts`` and ``images`` map the vfs file name the page uses to an
+    Asset. Include it right after pdfmake.min.js, where the page used to
+    assign ``pdfMake.vfs[name] = "<base64>"``; images can then be used as
+    ``image: "<vfs name>"``.
+    """
+    fonts, images = fonts or {}, images or {}
+    files = {name: publish(asset) for name, asset in {**fonts, **images}.items()}
+    return (_PDFMAKE_LOADER
+            .replace("__FILES__", json.dumps(files))
+            .replace("__IMAGES__", json.dumps({name: name for name in images})))
@@ -0,0 +1,101 @@
+# bench_village_payload.py
+"""
+Benchmark for the village-wise PDF payload (reports_and_search.village_payload).
+
+Builds synthetic villages of 100 to 100k members, times the vectorized
+payload plus its JSON encoding, and checks the time per member stays
+flat (linear scaling). The old row loop nested inside iterrows() is
+timed on the small sizes for comparison.
+
+    python bench_village_payload.py
+    python bench_village_payload.py --sizes 100 1000 10000 100000 --repeat 5
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from reports_and_search import village_payload
+
+# Per-member cost at the largest size may be at most this multiple of the smallest
+LINEAR_TOLERANCE = 3.0
+QUADRATIC_MAX_ROWS = 2000
+
+
+def synthetic_village(members, seed=0):
+    """Arrow-backed frame shaped like village_cache.report_frame()."""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "id": np.arange(1, members + 1),
+        "village_name": "bench",
+        "m_no": np.sort(rng.integers(1, max(members // 5, 1) + 1, members)),
+        "member_name": [f"सदस्य {i}" for i in range(members)],
+        "age": pd.array(rng.integers(0, 95, members), dtype="int64[pyarrow]"),
+        "gender": rng.choice(["Male", "Female", "Other"], members),
+        "bp": rng.random(members) < 0.12,
+        "sugar": rng.random(members) < 0.08,
+        "other": "",
+        "mobile": [f"98{i:08d}" for i in range(members)],
+        "family_head": "प्रमुख",
+    })
+    frame.loc[frame.sample(frac=0.02, random_state=seed).index, "age"] = None
+    return frame.convert_dtypes(dtype_backend="pyarrow")
+
+
+def old_payload(df):
+    """The previous O(n²) implementation, kept for comparison."""
+    data_json = []
+    for _, row in df.iterrows():
+        data_json = []
+        for row in df.itertuples(index=False):
+            data_json.append({
+                "m_no": str(row.m_no),
+                "member_name": str(row.member_name),
+                "age": str(getattr(row, 'age', '')),
+                "gender": str(getattr(row, 'gender', '')),
+                "bp": "होय" if getattr(row, 'bp', False) else "नाही",
+                "sugar": "होय" if getattr(row, 'sugar', False) else "नाही",
+                "other": str(getattr(row, 'other', '')),
+                "mobile": str(getattr(row, 'mobile', ''))
+            })
+    return data_json
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'members':>9} {'payload ms':>11} {'µs/member':>10} {'json KB':>9} {'old loop ms':>12}")
+    per_member = []
+    for size in args.sizes:
+        df = synthetic_village(size)
+        seconds = best_of(lambda: json.dumps(village_payload(df), ensure_ascii=False), args.repeat)
+        size_kb = len(json.dumps(village_payload(df), ensure_ascii=False).encode("utf-8")) / 1024
+        old = f"{best_of(lambda: old_payload(df), 1) * 1000:12.1f}" if size <= QUADRATIC_MAX_ROWS else f"{'skipped':>12}"
+        per_member.append(seconds / size)
+        print(f"{size:>9} {seconds * 1000:11.2f} {seconds / size * 1e6:10.2f} {size_kb:9.1f} {old}")
+
+    ratio = per_member[-1] / per_member[0]
+    print(f"\nper-member cost ratio {args.sizes[-1]} vs {args.sizes[0]}: {ratio:.2f} (limit {LINEAR_TOLERANCE})")
+    if ratio > LINEAR_TOLERANCE:
+        print("❌ payload build does not scale linearly")
+        return 1
+    print("✅ linear scaling")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+# bulk_import.py
+"""
+Bulk import of a village survey (households + family members) from CSV/XLSX.
+
+Files are validated in vectorized pandas passes, loaded with COPY into
+temporary staging tables and merged into m_no_register / family_members
+in a single transaction. Rows that fail validation are skipped and
+returned in a per-row error report.
+
+Command line:
+
+    python bulk_import.py VILLAGE --households h.csv --members m.xlsx --user mpw1 [--dry-run]
+        [--overwrite-households]   # update households whose M No is already in the register
+        [--replace-members]        # replace the members of every M No in the members file
+"""
+import argparse
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+from db_config import get_connection
+from village_cache import bump_village, mno_list
+from village_events import publish
+
+HOUSEHOLD_COLUMNS = ["m_no", "family_head", "member_count", "mobile", "address",
+                     "ranjan", "balar", "taki", "dera", "frize", "e_bhandi"]
+HOUSEHOLD_COUNT_COLUMNS = ["member_count", "ranjan", "balar", "taki", "dera", "frize", "e_bhandi"]
+MEMBER_COLUMNS = ["m_no", "member_name", "age", "gender", "bp", "sugar", "other", "mobile"]
+
+GENDERS = {
+    "male": "Male", "m": "Male", "पुरुष": "Male",
+    "female": "Female", "f": "Female", "स्त्री": "Female",
+    "other": "Other", "o": "Other", "इतर": "Other",
+}
+EXISTING_MNO_ERROR = "M No already in register – kept unless overwriting existing households is confirmed"
+
+YES_NO = {
+    "yes": True, "y": True, "true": True, "1": True, "होय": True,
+    "no": False, "n": False, "false": False, "0": False, "नाही": False, "": False,
+}
+
+
+# ==========================
+# 🔧 Helper Functions
+# ==========================
+def read_table(file, name=None):
+    """Read a CSV or XLSX upload/path as all-string columns."""
+    name = str(name or getattr(file, "name", file))
+    if name.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(file, dtype=str)
+    else:
+        df = pd.read_csv(file, dtype=str)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    return df.fillna("").apply(lambda col: col.str.strip())
+
+
+def _flag(errors, df, mask, column, message):
+    if mask.any():
+        errors.append(pd.DataFrame({"row": df.index[mask] + 2, "column": column, "error": message}))
+
+
+def _missing_columns(df, required, errors):
+    missing = [c for c in required if c not in df.columns]
+    for c in missing:
+        errors.append(pd.DataFrame({"row": [1], "column": [c], "error": ["column missing"]}))
+    return missing
+
+
+def _whole_numbers(series):
+    """Parsed integers (nullable) and a mask of values that are not whole numbers."""
+    numbers = pd.to_numeric(series, errors="coerce")
+    bad = numbers.isna() | (numbers % 1 != 0)
+    return numbers.where(~bad).astype("Int64"), bad
+
+
+def _mobiles(series):
+    """Normalised 10-digit mobile numbers and a mask of invalid non-empty values."""
+    digits = series.str.replace(r"[\s\-]", "", regex=True).str.replace(r"^(\+91|0)", "", regex=True)
+    bad = (digits != "") & ~digits.str.fullmatch(r"[6-9]\d{9}")
+    return digits, bad
+
+
+def _report(errors):
+    if not errors:
+        return pd.DataFrame(columns=["row", "column", "error"])
+    return pd.concat(errors, ignore_index=True).sort_values(["row", "column"], ignore_index=True)
+
+
+def validate_households(df, existing_mnos=()):
+    """Return (valid rows, error report) for a households table.
+
+    Rows whose M No is in ``existing_mnos`` stay valid but are listed in
+    the report with EXISTING_MNO_ERROR: load_village only overwrites those
+    households with ``overwrite_households``.
+    """
+    errors = []
+    if _missing_columns(df, ["m_no", "family_head"], errors):
+        return pd.DataFrame(columns=HOUSEHOLD_COLUMNS), _report(errors)
+    df = df.reindex(columns=HOUSEHOLD_COLUMNS, fill_value="")
+
+    out = pd.DataFrame(index=df.index)
+    out["m_no"], bad = _whole_numbers(df["m_no"])
+    bad |= out["m_no"] <= 0
+    _flag(errors, df, bad, "m_no", "M No must be a positive whole number")
+    _flag(errors, df, out["m_no"].duplicated(keep=False) & out["m_no"].notna(), "m_no", "duplicate M No in file")
+
+    out["family_head"] = df["family_head"]
+    _flag(errors, df, df["family_head"] == "", "family_head", "family head name is required")
+
+    for col in HOUSEHOLD_COUNT_COLUMNS:
+        filled = df[col].replace("", "0")
+        out[col], bad = _whole_numbers(filled)
+        _flag(errors, df, bad | (out[col] < 0), col, "must be a whole number ≥ 0")
+
+    out["mobile"], bad = _mobiles(df["mobile"])
+    _flag(errors, df, bad, "mobile", "mobile must be a 10 digit number")
+    out["address"] = df["address"]
+
+    invalid = _report(errors)["row"] - 2
+    valid = out.loc[~out.index.isin(invalid), HOUSEHOLD_COLUMNS]
+    _flag(errors, df, out.index.isin(valid.index) & out["m_no"].isin(existing_mnos), "m_no", EXISTING_MNO_ERROR)
+    return valid, _report(errors)
+
+
+def validate_members(df, known_mnos):
+    """Return (valid rows, error report) for a members table.
+
+    ``known_mnos`` are the M Nos a member may belong to: households already
+    in the register plus the valid rows of the households file.
+    """
+    errors = []
+    if _missing_columns(df, ["m_no", "member_name"], errors):
+        return pd.DataFrame(columns=MEMBER_COLUMNS), _report(errors)
+    df = df.reindex(columns=MEMBER_COLUMNS, fill_value="")
+
+    out = pd.DataFrame(index=df.index)
+    out["m_no"], bad = _whole_numbers(df["m_no"])
+    _flag(errors, df, bad, "m_no", "M No must be a whole number")
+    _flag(errors, df, ~bad & ~out["m_no"].isin(known_mnos), "m_no", "M No not found in register or households file")
+
+    out["member_name"] = df["member_name"]
+    _flag(errors, df, df["member_name"] == "", "member_name", "member name is required")
+    # Same key the merge dedupes on against family_members
+    _flag(errors, df, out.duplicated(["m_no", "member_name"]) & out["m_no"].notna() & (df["member_name"] != ""),
+          "member_name", "duplicate member in file (same M No and name)")
+
+    out["age"], bad = _whole_numbers(df["age"])
+    _flag(errors, df, bad | (out["age"] < 0) | (out["age"] > 120), "age", "age must be between 0 and 120")
+
+    out["gender"] = df["gender"].str.lower().map(GENDERS)
+    _flag(errors, df, out["gender"].isna(), "gender", "gender must be Male / Female / Other")
+
+    for col in ["bp", "sugar"]:
+        out[col] = df[col].str.lower().map(YES_NO)
+        _flag(errors, df, out[col].isna(), col, "must be yes / no")
+
+    out["other"] = df["other"]
+    out["mobile"], bad = _mobiles(df["mobile"])
+    _flag(errors, df, bad, "mobile", "mobile must be a 10 digit number")
+
+    report = _report(errors)
+    valid = out.loc[~out.index.isin(report["row"] - 2), MEMBER_COLUMNS]
+    return valid, report
+
+
+def _copy_rows(cur, table, columns, df):
+    rows = df.astype(object).where(df.notna(), None)
+    with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        for row in rows.itertuples(index=False, name=None):
+            copy.write_row(row)
+
+
+def load_village(conn, village, households, members, created_by, replace_members=False,
+                 overwrite_households=False):
+    """COPY validated frames into staging tables and merge them in one transaction.
+
+    New households are inserted; households whose M No is already in the
+    register are left alone unless ``overwrite_households``. Members are appended,
+    skipping anyone already recorded under the same M No and name, so
+    re-importing the same survey does not duplicate people. With
+    ``replace_members`` the existing members of every M No present in the
+    members file are deleted first (see members_to_replace). Returns
+    (households, members) row counts written.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            CREATE TEMP TABLE stage_households (
+                m_no INTEGER, family_head TEXT, member_count INTEGER, mobile TEXT, address TEXT,
+                ranjan INTEGER, balar INTEGER, taki INTEGER, dera INTEGER, frize INTEGER, e_bhandi INTEGER
+            ) ON COMMIT DROP
+        """)
+        cur.execute("""
+            CREATE TEMP TABLE stage_members (
+                m_no INTEGER, member_name TEXT, age INTEGER, gender TEXT,
+                bp BOOLEAN, sugar BOOLEAN, other TEXT, mobile TEXT
+            ) ON COMMIT DROP
+        """)
+        _copy_rows(cur, "stage_households", HOUSEHOLD_COLUMNS, households)
+        _copy_rows(cur, "stage_members", MEMBER_COLUMNS, members)
+
+        on_conflict = """DO UPDATE
+            SET family_head = EXCLUDED.family_head, member_count = EXCLUDED.member_count,
+                mobile = EXCLUDED.mobile, address = EXCLUDED.address,
+                ranjan = EXCLUDED.ranjan, balar = EXCLUDED.balar, taki = EXCLUDED.taki,
+                dera = EXCLUDED.dera, frize = EXCLUDED.frize, e_bhandi = EXCLUDED.e_bhandi
+        """ if overwrite_households else "DO NOTHING"
+        cur.execute("""
+            INSERT INTO m_no_register (village_name, m_no, family_head, member_count, mobile, address,
+                                       ranjan, balar, taki, dera, frize, e_bhandi, created_by)
+            SELECT %s, m_no, family_head, member_count, mobile, address,
+                   ranjan, balar, taki, dera, frize, e_bhandi, %s
+            FROM stage_households
+            ON CONFLICT (village_name, m_no) """ + on_conflict, (village, created_by))
+        household_count = cur.rowcount
+        # Automatic M No allocation must continue after the imported numbers
+        cur.execute("""
+            INSERT INTO mno_counters AS c (village_name, last_m_no)
+            SELECT %s, MAX(m_no) FROM stage_households HAVING MAX(m_no) IS NOT NULL
+            ON CONFLICT (village_name) DO UPDATE SET last_m_no = GREATEST(c.last_m_no, EXCLUDED.last_m_no)
+        """, (village,))
+
+        if replace_members:
+            cur.execute("""
+                DELETE FROM family_members
+                WHERE village_name = %s AND m_no IN (SELECT DISTINCT m_no FROM stage_members)
+            """, (village,))
+        cur.execute("""
+            INSERT INTO family_members (village_name, m_no, member_name, age, gender, bp, sugar, other, mobile)
+            SELECT %s, s.m_no, s.member_name, s.age, s.gender, s.bp, s.sugar, s.other, s.mobile
+            FROM stage_members s
+            WHERE NOT EXISTS (SELECT 1 FROM family_members f
+                              WHERE f.village_name = %s AND f.m_no = s.m_no AND f.member_name = s.member_name)
+        """, (village, village))
+        member_count = cur.rowcount
+
+        publish(cur, "m_no_register", village)
+        publish(cur, "family_members", village)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    bump_village(village)
+    return household_count, member_count
+
+
+def members_to_replace(village, members):
+    """Existing member count per M No that a replace import of ``members`` would delete."""
+    m_nos = sorted(int(m) for m in members["m_no"].dropna().unique())
+    if not m_nos:
+        return pd.DataFrame(columns=["m_no", "existing_members"])
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT m_no, count(*) FROM family_members
+                WHERE village_name = %s AND m_no = ANY(%s)
+                GROUP BY m_no ORDER BY m_no
+            """, (village, m_nos))
+            rows = cur.fetchall()
+    return pd.DataFrame(rows, columns=["m_no", "existing_members"])
+
+
+def validate_files(village, households_file=None, members_file=None):
+    """Validate both files against the village's existing M Nos.
+
+    Returns (households, members, error report) where the report has a
+    ``file`` column telling which upload each row came from.
+    """
+    households = pd.DataFrame(columns=HOUSEHOLD_COLUMNS)
+    h_errors = pd.DataFrame(columns=["row", "column", "error"])
+    existing = mno_list(village)["m_no"]
+    if households_file is not None:
+        households, h_errors = validate_households(read_table(households_file), existing)
+
+    members = pd.DataFrame(columns=MEMBER_COLUMNS)
+    m_errors = pd.DataFrame(columns=["row", "column", "error"])
+    if members_file is not None:
+        known = pd.concat([existing, households["m_no"]]).dropna().astype(int).unique()
+        members, m_errors = validate_members(read_table(members_file), known)
+
+    report = pd.concat([h_errors.assign(file="households"), m_errors.assign(file="members")],
+                       ignore_index=True)[["file", "row", "column", "error"]]
+    return households, members, report
+
+
+# ==========================
+# 📥 Bulk Import Page
+# ==========================
+def bulk_import_tab(user):
+    st.title("📥 Bulk Import – Village Survey")
+    st.write("CSV किंवा Excel फाईलमधून संपूर्ण गावाची कुटुंबे व सदस्य एकाच वेळी जोडा.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("⬇️ Households template", ",".join(HOUSEHOLD_COLUMNS) + "\n",
+                           file_name="households_template.csv", mime="text/csv")
+        households_file = st.file_uploader("Households (m_no_register)", type=["csv", "xlsx"])
+    with col2:
+        st.download_button("⬇️ Members template", ",".join(MEMBER_COLUMNS) + "\n",
+                           file_name="members_template.csv", mime="text/csv")
+        members_file = st.file_uploader("Family members", type=["csv", "xlsx"])
+
+    if households_file is None and members_file is None:
+        st.info("कृपया किमान एक फाईल निवडा.")
+        return
+
+    households, members, report = validate_files(user["village"], households_file, members_file)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Valid households", len(households))
+    c2.metric("Valid members", len(members))
+    c3.metric("Rows with errors", report[["file", "row"]].drop_duplicates().shape[0])
+
+    if not report.empty:
+        st.warning("⚠️ खालील ओळी आयात केल्या जाणार नाहीत (आधीपासून असलेले M No फक्त खाली पुष्टी केल्यासच बदलले जातील).")
+        st.dataframe(report, use_container_width=True, hide_index=True)
+        st.download_button("⬇️ Download error report", report.to_csv(index=False).encode("utf-8"),
+                           file_name="import_errors.csv", mime="text/csv")
+
+    replace_members, confirmed = False, True
+    existing = households[households["m_no"].isin(mno_list(user["village"])["m_no"])]
+    overwrite_households = False
+    if not existing.empty:
+        st.warning(f"⚠️ {len(existing)} M No रजिस्टरमध्ये आधीच आहेत. पुष्टी न केल्यास ती कुटुंबे तशीच राहतील "
+                   "(फाईलमधील माहिती दुर्लक्षित होईल):")
+        st.dataframe(existing[["m_no", "family_head"]], use_container_width=True, hide_index=True)
+        overwrite_households = st.checkbox("होय, या आधीच्या कुटुंबांची माहिती फाईलमधील माहितीने बदला")
+    if not members.empty:
+        mode = st.radio("सदस्य आयात पद्धत", ["➕ नवीन सदस्य जोडा", "♻️ कुटुंबातील सदस्य बदला"],
+                        horizontal=True,
+                        help="जोडा: आधीचे सदस्य तसेच राहतात, त्याच नावाचे सदस्य पुन्हा जोडले जात नाहीत. "
+                             "बदला: फाईलमधील प्रत्येक M No चे आधीचे सर्व सदस्य काढून फाईलमधील सदस्य ठेवले जातात.")
+        replace_members = mode.startswith("♻️")
+        if replace_members:
+            try:
+                replaced = members_to_replace(user["village"], members)
+            except Exception as e:
+                st.error(f"Failed to check existing members: {e}")
+                return
+            if replaced.empty:
+                st.info("फाईलमधील कोणत्याही M No चे आधीचे सदस्य नाहीत.")
+            else:
+                st.warning(f"⚠️ {len(replaced)} कुटुंबांचे एकूण {replaced['existing_members'].sum()} "
+                           "आधीचे सदस्य हटवले जातील:")
+                st.dataframe(replaced, use_container_width=True, hide_index=True)
+                confirmed = st.checkbox("होय, या कुटुंबांचे आधीचे सदस्य हटवून फाईलमधील सदस्य ठेवा")
+
+    if st.button("💾 Import", disabled=(households.empty and members.empty) or not confirmed):
+        try:
+            with get_connection() as conn:
+                h_count, m_count = load_village(conn, user["village"], households, members, user["username"],
+                                                replace_members=replace_members,
+                                                overwrite_households=overwrite_households)
+            st.success(f"✅ {h_count} कुटुंबे व {m_count} सदस्य आयात झाले.")
+        except Exception as e:
+            st.error(f"❌ Import failed: {e}")
+
+
+# ==========================
+# 🖥️ Command line
+# ==========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import a village survey")
+    parser.add_argument("village")
+    parser.add_argument("--households", type=Path, help="CSV/XLSX of m_no_register rows")
+    parser.add_argument("--members", type=Path, help="CSV/XLSX of family_members rows")
+    parser.add_argument("--user", required=True, help="username recorded as created_by")
+    parser.add_argument("--errors", type=Path, help="write the error report CSV here")
+    parser.add_argument("--overwrite-households", action="store_true",
+                        help="update households whose M No is already in the register (default: keep them)")
+    parser.add_argument("--replace-members", action="store_true",
+                        help="delete the existing members of every M No in the members file first")
+    parser.add_argument("--dry-run", action="store_true", help="validate only")
+    args = parser.parse_args(argv)
+
+    households, members, report = validate_files(args.village, args.households, args.members)
+    print(f"Valid households: {len(households)}, valid members: {len(members)}, errors: {len(report)}")
+    if not report.empty:
+        buffer = io.StringIO()
+        report.to_csv(buffer, index=False)
+        if args.errors:
+            args.errors.write_text(buffer.getvalue(), encoding="utf-8")
+        else:
+            print(buffer.getvalue())
+
+    if args.replace_members:
+        replaced = members_to_replace(args.village, members)
+        print(f"Replacing {replaced['existing_members'].sum()} existing members of {len(replaced)} households")
+
+    if args.dry_run:
+        return 1 if not report.empty else 0
+    with get_connection() as conn:
+        h_count, m_count = load_village(conn, args.village, households, members, args.user,
+                                        replace_members=args.replace_members,
+                                        overwrite_households=args.overwrite_households)
+    print(f"✅ Imported {h_count} households and {m_count} members into {args.village}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,16 @@
-import psycopg
 import streamlit as st
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
+from db_metrics import METRICS, InstrumentedCursor
 
 
-def get_connection():
-    return psycopg.connect(
+def _secret(name, default):
+    return st.secrets.get(name, default)
+
+
+def conninfo():
+    """libpq connection string built from the Streamlit secrets."""
+    return make_conninfo(
         host=st.secrets['DB_HOST'],
         port=int(st.secrets['DB_PORT']),
         dbname=st.secrets['DB_NAME'],
@@ -12,3 +19,37 @@ def get_connection():
         connect_timeout=10,
         sslmode='require'  # Most cloud providers require this
     )
+
+
+@st.cache_resource
+def get_pool():
+    """Process-wide connection pool shared by every Streamlit session."""
+    METRICS.slow_ms = float(_secret('SLOW_QUERY_MS', 500))
+    return ConnectionPool(
+        conninfo(),
+        kwargs={"cursor_factory": InstrumentedCursor},  # every execute is timed (db_metrics)
+        min_size=int(_secret('DB_POOL_MIN', 2)),
+        max_size=int(_secret('DB_POOL_MAX', 10)),
+        timeout=float(_secret('DB_POOL_TIMEOUT', 30)),  # max wait for a free connection
+        max_idle=float(_secret('DB_POOL_MAX_IDLE', 300)),  # close connections idle this long
+        max_lifetime=float(_secret('DB_POOL_MAX_LIFETIME', 1800)),  # recycle long-lived connections
+        check=ConnectionPool.check_connection,  # health check on every checkout
+        name="mpw",
+        open=True,
+    )
+
+
+def get_connection():
+    """Borrow a pooled connection; use as ``with get_connection() as conn:``.
+
+    The connection goes back to the pool when the block exits (rolled back
+    if the block raised), so callers must not close it themselves.
+    """
+    return get_pool().connection()
+
+
+def pool_stats():
+    """Current pool counters (size, in use, waiting requests, wait time)."""
+    stats = get_pool().get_stats()
+    stats["connections_in_use"] = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+    return stats
@@ -0,0 +1,192 @@
+# db_metrics.py
+"""
+SQL instrumentation for every pooled connection.
+
+db_config.get_pool() opens its connections with
+``cursor_factory=InstrumentedCursor``, so every ``cur.execute`` and
+``pd.read_sql`` call is timed without touching the page modules. Each
+statement is recorded under a fingerprint (literals and placeholders
+replaced by ``?``) together with its duration, rows returned and the
+Streamlit page that ran it.
+
+main.py calls start_rerun() at the top of every script run and
+set_page() once the sidebar tab is known; queries are then counted per
+rerun. Statements slower than the slow-query threshold are logged to the
+``mpw.slow_sql`` logger. Everything is shown in the Admin tab.
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+import psycopg
+from psycopg import sql
+
+SAMPLES_PER_FINGERPRINT = 500
+RECENT_RERUNS = 200
+SLOW_LOG_SIZE = 100
+FINGERPRINT_MAX_LEN = 300
+
+slow_log = logging.getLogger("mpw.slow_sql")
+
+_current_rerun = contextvars.ContextVar("mpw_current_rerun", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(query):
+    """Normalise a statement so calls differing only in values group together."""
+    text = _STRING.sub("?", query)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _IN_LIST.sub("(?, ...)", text)
+    text = _SPACE.sub(" ", text).strip()
+    return text[:FINGERPRINT_MAX_LEN]
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RerunStats:
+    """Query counters for one Streamlit script run."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = datetime.now()
+        self.queries = 0
+        self.total_ms = 0.0
+
+
+class QueryMetrics:
+    """Thread-safe rolling statistics keyed by statement fingerprint."""
+
+    def __init__(self, slow_ms=500.0):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._calls = Counter()
+        self._rows = Counter()
+        self._pages = {}
+        self.reruns = deque(maxlen=RECENT_RERUNS)
+        self.slow = deque(maxlen=SLOW_LOG_SIZE)
+
+    def record(self, query, duration_ms, rows, page):
+        fp = fingerprint(query)
+        with self._lock:
+            self._durations.setdefault(fp, deque(maxlen=SAMPLES_PER_FINGERPRINT)).append(duration_ms)
+            self._calls[fp] += 1
+            self._rows[fp] += max(rows, 0)
+            self._pages.setdefault(fp, Counter())[page] += 1
+            if duration_ms >= self.slow_ms:
+                self.slow.append({"at": datetime.now(), "page": page, "ms": round(duration_ms, 1),
+                                  "rows": rows, "query": fp})
+        if duration_ms >= self.slow_ms:
+            slow_log.warning("%.1f ms [%s] %d rows: %s", duration_ms, page, rows, fp)
+
+    def start_rerun(self, page):
+        stats = RerunStats(page)
+        with self._lock:
+            self.reruns.append(stats)
+        return stats
+
+    def summary(self):
+        """One dict per fingerprint, slowest p95 first."""
+        with self._lock:
+            rows = []
+            for fp, samples in self._durations.items():
+                ordered = sorted(samples)
+                calls = self._calls[fp]
+                rows.append({
+                    "query": fp,
+                    "calls": calls,
+                    "p50 ms": round(_percentile(ordered, 50), 1),
+                    "p95 ms": round(_percentile(ordered, 95), 1),
+                    "p99 ms": round(_percentile(ordered, 99), 1),
+                    "avg rows": round(self._rows[fp] / calls, 1),
+                    "top page": self._pages[fp].most_common(1)[0][0],
+                })
+        return sorted(rows, key=lambda r: r["p95 ms"], reverse=True)
+
+    def rerun_summary(self):
+        with self._lock:
+            return [{"started": r.started, "page": r.page, "queries": r.queries,
+                     "total ms": round(r.total_ms, 1)} for r in reversed(self.reruns)]
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._calls.clear()
+            self._rows.clear()
+            self._pages.clear()
+            self.reruns.clear()
+            self.slow.clear()
+
+
+METRICS = QueryMetrics()
+
+
+# ==========================
+# 🔁 Rerun / page context
+# ==========================
+def start_rerun(page):
+    """Begin counting queries for the current script run."""
+    _current_rerun.set(METRICS.start_rerun(page))
+
+
+def set_page(page):
+    """Attribute the rest of this rerun's queries to ``page``."""
+    rerun = _current_rerun.get()
+    if rerun is None:
+        start_rerun(page)
+    else:
+        rerun.page = page
+
+
+def current_page():
+    rerun = _current_rerun.get()
+    return rerun.page if rerun is not None else threading.current_thread().name
+
+
+def _observe(cursor, query, started):
+    duration_ms = (time.perf_counter() - started) * 1000
+    if isinstance(query, sql.Composable):
+        try:
+            query = query.as_string(cursor)
+        except Exception:
+            query = repr(query)
+    elif isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    METRICS.record(query, duration_ms, cursor.rowcount, current_page())
+    rerun = _current_rerun.get()
+    if rerun is not None:
+        rerun.queries += 1
+        rerun.total_ms += duration_ms
+
+
+class InstrumentedCursor(psycopg.Cursor):
+    """psycopg cursor that times every execute/executemany."""
+
+    def execute(self, query, params=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, params, **kwargs)
+        finally:
+            _observe(self, query, started)
+
+    def executemany(self, query, params_seq, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, params_seq, **kwargs)
+        finally:
+            _observe(self, query, started)
@@ -0,0 +1,57 @@
+# exports.py
+"""
+On-demand CSV / Excel exports streamed straight from PostgreSQL.
+
+CSV comes from COPY ... TO STDOUT and Excel from a server-side (named)
+cursor written through an openpyxl write-only workbook. Both spool into a
+SpooledTemporaryFile that moves to disk past SPOOL_MAX_BYTES, so neither
+the query result nor the file is ever fully held by pandas.
+"""
+import tempfile
+
+from openpyxl import Workbook
+from psycopg import sql
+from db_config import get_connection
+
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+FETCH_ROWS = 2000
+
+CSV_MIME = "text/csv"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _spool():
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b")
+
+
+def export_csv(query, params=None):
+    """Run ``query`` as COPY (...) TO STDOUT CSV HEADER; return a rewound spooled file."""
+    out = _spool()
+    copy_sql = sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER true)").format(sql.SQL(query))
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            with cur.copy(copy_sql, params) as copy:
+                # UTF-8 BOM so Excel opens Devanagari text correctly
+                out.write(b"\xef\xbb\xbf")
+                for chunk in copy:
+                    out.write(chunk)
+    out.seek(0)
+    return out
+
+
+def export_xlsx(query, params=None, sheet_name="Sheet1"):
+    """Stream ``query`` through a server-side cursor into a write-only workbook."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    with get_connection() as conn:
+        # Named cursors need a transaction; the pool rolls it back on return
+        with conn.cursor(name="xlsx_export") as cur:
+            cur.itersize = FETCH_ROWS
+            cur.execute(query, params)
+            ws.append([col.name for col in cur.description])
+            for row in cur:
+                ws.append(row)
+    out = _spool()
+    wb.save(out)
+    out.seek(0)
+    return out
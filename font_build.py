@@ -0,0 +1,78 @@
+# font_build.py
+"""
+Build the compact PDF font from the variable NotoSerifDevanagari font.
+
+The shipped font carries the full weight/width design space and every
+glyph. The generators only ever render its default instance (Regular,
+normal width) and only Marathi / Latin text, so the build
+
+  1. instances the variable font at its default axis values (drops
+     fvar / gvar / HVAR / STAT ...), and
+  2. subsets it to Devanagari, Basic Latin / Latin-1 and common
+     punctuation, keeping the OpenType layout features needed to shape
+     conjuncts and matras.
+
+The result is cached on disk keyed by the source font's hash and
+BUILD_VERSION; assets.pdf_font() loads it once per process.
+
+    python font_build.py            # (re)build the cache and print sizes
+"""
+import io
+import sys
+
+from fontTools import subset
+from fontTools.ttLib import TTFont
+from fontTools.varLib import instancer
+
+# Bump when the ranges or options below change so cached builds are rebuilt
+BUILD_VERSION = 1
+
+UNICODE_RANGES = [
+    (0x0020, 0x007E),  # Basic Latin
+    (0x00A0, 0x00FF),  # Latin-1 (°, ×, ·, non-breaking space)
+    (0x0900, 0x097F),  # Devanagari
+    (0xA8E0, 0xA8FF),  # Devanagari Extended
+    (0x200B, 0x200D),  # zero-width space / ZWNJ / ZWJ
+    (0x2010, 0x2027),  # dashes, quotes, bullets, ellipsis
+    (0x20B9, 0x20B9),  # ₹
+    (0x25CC, 0x25CC),  # dotted circle, inserted by shapers for stray marks
+]
+
+
+def unicodes():
+    return [cp for start, end in UNICODE_RANGES for cp in range(start, end + 1)]
+
+
+def build_pdf_font(data):
+    """Return the instanced + subset TTF bytes for the variable font ``data``."""
+    font = TTFont(io.BytesIO(data))
+    if "fvar" in font:
+        location = {axis.axisTag: axis.defaultValue for axis in font["fvar"].axes}
+        font = instancer.instantiateVariableFont(font, location)
+
+    options = subset.Options()
+    options.layout_features = ["*"]  # conjuncts, half forms, matra positioning
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    options.hinting = False
+    options.desubroutinize = True
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=unicodes())
+    subsetter.subset(font)
+
+    out = io.BytesIO()
+    font.save(out)
+    return out.getvalue()
+
+
+def main():
+    from assets import font, pdf_font
+
+    source, built = font(), pdf_font()
+    print(f"source: {source.path.name} {source.size / 1024:.0f} KB")
+    print(f"built:  {built.path} {built.size / 1024:.0f} KB ({built.size / source.size:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
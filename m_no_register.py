@@ -2,13 +2,57 @@ import psycopg
 import streamlit as st
 import pandas as pd
 from db_config import get_connection
+from record_picker import HOUSEHOLDS, fetch_record, record_picker
+from rollups import actual_members
+from village_cache import bump_village
+from village_events import publish
 
 # ---------------------------
 # 🔧 Helper Functions
 # ---------------------------
-def get_next_mno(cur, village):
-    cur.execute("SELECT COALESCE(MAX(m_no), 0) + 1 FROM m_no_register WHERE village_name = %s", (village,))
-    return cur.fetchone()[0]
+def insert_household(cur, village, m_no, family_head, member_count, mobile, address,
+                     ranjan, balar, taki, dera, frize, e_bhandi, created_by):
+    """Insert one household and return its M No.
+
+    With ``m_no=None`` the next number is taken from mno_counters in the
+    same statement, so concurrent adds in a village never collide. A
+    manual M No also moves the counter forward when it is higher.
+    """
+    values = (family_head, int(member_count), mobile, address,
+              int(ranjan), int(balar), int(taki), int(dera), int(frize), int(e_bhandi), created_by)
+    if m_no is None:
+        cur.execute("""
+            WITH next AS (
+                INSERT INTO mno_counters AS c (village_name, last_m_no) VALUES (%s, 1)
+                ON CONFLICT (village_name) DO UPDATE SET last_m_no = c.last_m_no + 1
+                RETURNING last_m_no
+            )
+            INSERT INTO m_no_register (
+                village_name, m_no, family_head, member_count, mobile,
+                address, ranjan, balar, taki, dera, frize, e_bhandi, created_by
+            )
+            SELECT %s, next.last_m_no, %s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s FROM next
+            RETURNING m_no
+        """, (village, village) + values)
+        return cur.fetchone()[0]
+
+    cur.execute("""
+        INSERT INTO m_no_register (
+            village_name, m_no, family_head, member_count, mobile,
+            address, ranjan, balar, taki, dera, frize, e_bhandi, created_by
+        )
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+    """, (village, int(m_no)) + values)
+    sync_mno_counter(cur, village, int(m_no))
+    return int(m_no)
+
+
+def sync_mno_counter(cur, village, m_no):
+    """Make sure automatic allocation continues after a manually chosen M No."""
+    cur.execute("""
+        INSERT INTO mno_counters AS c (village_name, last_m_no) VALUES (%s, %s)
+        ON CONFLICT (village_name) DO UPDATE SET last_m_no = GREATEST(c.last_m_no, EXCLUDED.last_m_no)
+    """, (village, m_no))
 
 
 def fetch_all_records(cur, village):
@@ -53,8 +97,6 @@ def update_record(cur, conn, record_id, family_head, member_count, mobile, addre
 # ---------------------------
 def m_no_register_tab(user):
     st.title("🏠 M No Register")
-    conn = get_connection()
-    cur = conn.cursor()
 
     # Main menu buttons
     st.markdown("### कृपया खालीलपैकी एक पर्याय निवडा:")
@@ -75,7 +117,8 @@ def m_no_register_tab(user):
             col1, col2 = st.columns(2)
 
             with col1:
-                m_no = st.number_input("M No :", format="%d", value=get_next_mno(cur, user["village"]))
+                m_no = st.number_input("M No :", format="%d", value=None, step=1, min_value=1,
+                                       placeholder="आपोआप – पुढील क्रमांक")
                 family_head = st.text_input("कुटुंब प्रमुखाचे नाव:")
                 member_count = st.number_input("घरातील एकूण सदस्य:", min_value=0, step=1)
                 mobile = st.text_input("मोबाईल नंबर:")
@@ -94,47 +137,33 @@ def m_no_register_tab(user):
                 if not family_head.strip():
                     st.warning("⚠️ कृपया कुटुंब प्रमुखाचे नाव भरा.")
                 else:
-                    try:
-                        cur.execute("""
-                            INSERT INTO m_no_register (
-                                village_name, m_no, family_head, member_count, mobile,
-                                address, ranjan, balar, taki, dera, frize, e_bhandi, created_by
+                    with get_connection() as conn:
+                        cur = conn.cursor()
+                        try:
+                            m_no = insert_household(
+                                cur, user["village"], m_no, family_head, member_count, mobile,
+                                address, ranjan, balar, taki, dera, frize, e_bhandi, user["username"]
                             )
-                            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                        """, (
-                            user["village"], int(m_no), family_head, int(member_count), mobile,
-                            address, int(ranjan), int(balar), int(taki), int(dera), int(frize), int(e_bhandi),
-                            user["username"]
-                        ))
-                        conn.commit()
-                        st.success(f"✅ M No {m_no} — {family_head} यांची नोंद जतन झाली.")
-                    except psycopg.Error as e:
-                        conn.rollback()
-                        st.error(f"❌ Database Error: {e.pgerror}")
+                            publish(cur, "m_no_register", user["village"])
+                            conn.commit()
+                            bump_village(user["village"])
+                            st.success(f"✅ M No {m_no} — {family_head} यांची नोंद जतन झाली.")
+                        except psycopg.errors.UniqueViolation:
+                            conn.rollback()
+                            st.error(f"❌ M No {m_no} या गावात आधीच अस्तित्वात आहे.")
+                        except psycopg.Error as e:
+                            conn.rollback()
+                            st.error(f"❌ Database Error: {e.pgerror}")
 
     # ------------------ EDIT RECORD ------------------
     elif menu == "✏️ Edit Record":
         st.subheader("✏️ नोंद संपादित करा")
 
         try:
-            record_list = pd.read_sql(
-                "SELECT id, m_no, family_head FROM m_no_register WHERE village_name=%s ORDER BY m_no",
-                conn, params=(user["village"],)
-            )
-
-            if not record_list.empty:
-                selected_row = st.selectbox(
-                    "संपादनासाठी M No निवडा:",
-                    record_list.apply(lambda x: f"{x['m_no']} - {x['family_head']}", axis=1)
-                )
-                selected_id = int(record_list.loc[
-                    record_list.apply(lambda x: f"{x['m_no']} - {x['family_head']}", axis=1) == selected_row, "id"
-                ].values[0])
+            selected_id = record_picker("संपादनासाठी M No निवडा:", HOUSEHOLDS, user["village"], key="edit_mno")
 
-                cur.execute("SELECT * FROM m_no_register WHERE id=%s", (selected_id,))
-                rec = cur.fetchone()
-                columns = [desc[0] for desc in cur.description]
-                data = dict(zip(columns, rec))
+            if selected_id is not None:
+                data = fetch_record("m_no_register", selected_id, user["village"])
 
                 with st.form("edit_form"):
                     col1, col2 = st.columns(2)
@@ -142,6 +171,8 @@ def m_no_register_tab(user):
                         st.text_input("M No", value=data["m_no"], disabled=True)
                         family_head = st.text_input("कुटुंब प्रमुखाचे नाव:", value=data["family_head"])
                         member_count = st.number_input("घरातील एकूण सदस्य:", value=data["member_count"], step=1)
+                        st.caption(f"Family Members मध्ये नोंदवलेले सदस्य: "
+                                   f"{actual_members(user['village'], data['m_no'])}")
                         mobile = st.text_input("मोबाईल नंबर:", value=data["mobile"])
                         address = st.text_area("पत्ता:", value=data["address"])
 
@@ -154,11 +185,13 @@ def m_no_register_tab(user):
                         e_bhandi = st.number_input("इतर भांडी:", value=data["e_bhandi"], step=1)
 
                     if st.form_submit_button("💾 बदल जतन करा"):
-                        update_record(cur, conn, selected_id, family_head, member_count, mobile, address,
-                                      ranjan, balar, taki, dera, frize, e_bhandi)
+                        with get_connection() as conn:
+                            cur = conn.cursor()
+                            publish(cur, "m_no_register", user["village"])
+                            update_record(cur, conn, selected_id, family_head, member_count, mobile,
+                                          address, ranjan, balar, taki, dera, frize, e_bhandi)
+                        bump_village(user["village"])
                         st.rerun()
-            else:
-                st.info("⛔ संपादित करण्यासाठी कोणतीही नोंद नाही.")
         except Exception as e:
             st.error(f"❌ Edit Error: {e}")
 
@@ -167,19 +200,16 @@ def m_no_register_tab(user):
         st.subheader("❌ नोंद हटवा")
 
         try:
-            delete_options = pd.read_sql(
-                "SELECT m_no FROM m_no_register WHERE village_name=%s ORDER BY m_no",
-                conn, params=(user["village"],)
-            )
-            if not delete_options.empty:
-                delete_mno = st.selectbox("हटवण्यासाठी M No निवडा:", delete_options["m_no"])
+            selected_id = record_picker("हटवण्यासाठी M No निवडा:", HOUSEHOLDS, user["village"], key="delete_mno")
+            if selected_id is not None:
                 if st.button("🗑️ निवडलेली नोंद हटवा"):
-                    delete_record(cur, conn, user["village"], delete_mno)
+                    delete_mno = fetch_record("m_no_register", selected_id, user["village"])["m_no"]
+                    with get_connection() as conn:
+                        cur = conn.cursor()
+                        publish(cur, "m_no_register", user["village"])
+                        delete_record(cur, conn, user["village"], delete_mno)
+                    bump_village(user["village"])
                     st.success(f"🗑️ M No {delete_mno} यांची नोंद हटवली गेली.")
                     st.rerun()
-            else:
-                st.info("⛔ हटवण्यासाठी कोणतीही नोंद उपलब्ध नाही.")
         except Exception as e:
             st.error(f"❌ Delete Error: {e}")
-
-    conn.close()
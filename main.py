@@ -4,18 +4,31 @@ import bcrypt
 from monthly_repoert import monthly_repo
 from xhtml2pdf import pisa
 import io
-from db_config import get_connection
+from db_config import get_connection, pool_stats
+import assets
+import artifact_store
+import migrations
+import report_jobs
+import village_cache
+import village_events
+import db_metrics
+import rollups
+import single_flight
 from kitkshastriy_survekshan import entomological_survey_pdf
 from m_no_register import m_no_register_tab
 from add_member import family_members_tab
+from bulk_import import bulk_import_tab
 from mothly_diary import monthly_diary
 from polio_imunization_list import beneficiaries_tab
 from rakt_namune import rakt_namne_pdf
 from reg import combined_all_registers
 from reports_and_search import reports_page
+from ncd_dashboard import ncd_dashboard_page
 from yearly_dairy import dairy
 
 st.set_page_config(page_title="Village Health Register", layout="wide")
+village_events.start_listener()
+db_metrics.start_rerun("🔐 Login")
 
 
 # ---------------- Helper Functions ----------------
@@ -32,12 +45,11 @@ def verify_password(password, stored_hash):
 
 
 def verify_user(username, password):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT password_hash, village_name, role FROM users WHERE username=%s", (username,))
-    record = cur.fetchone()
-    cur.close();
-    conn.close()
+    with get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT password_hash, village_name, role FROM users WHERE username=%s", (username,))
+        record = cur.fetchone()
+        cur.close()
     if record:
         hashed, village, role = record
         if verify_password(password, hashed):
@@ -78,17 +90,24 @@ if "user" not in st.session_state:
 # ---------------- Main App ----------------
 user = st.session_state.user
 st.sidebar.success(f"👤 {user['username']} ({user['village']}) – {user['role']}")
+try:
+    totals = rollups.village_totals(user["village"])
+    st.sidebar.caption(f"👥 लोकसंख्या: {totals['members']} | BP: {totals['bp']} | "
+                       f"Sugar: {totals['sugar']} | दोन्ही: {totals['bp_sugar']}")
+except Exception:
+    pass  # rollup tables not migrated yet
 
 # Logout button in sidebar
 if st.sidebar.button("🚪 Logout"):
     logout()
 
 # Tabs for navigation
-tabs = ["🏠 M No Register", "👨‍👩‍👧 Family Members", "📊 Reports & Search", "Monthly Diary", "MPW Registers", "💉 Immunization List", "Yearly Dairy", "Entomological Survey", "Monthly Report", "Blood sample register"]
+tabs = ["🏠 M No Register", "👨‍👩‍👧 Family Members", "📥 Bulk Import", "📊 Reports & Search", "📈 NCD Dashboard", "Monthly Diary", "MPW Registers", "💉 Immunization List", "Yearly Dairy", "Entomological Survey", "Monthly Report", "Blood sample register", "📂 My reports"]
 if user["role"].lower() == "admin":
     tabs.append("👥 Admin")
 
 tab = st.sidebar.radio("Navigate", tabs)
+db_metrics.set_page(tab)
 
 # ---------------- M No Register ----------------
 if tab == "🏠 M No Register":
@@ -98,9 +117,15 @@ if tab == "🏠 M No Register":
 elif tab == "👨‍👩‍👧 Family Members":
     family_members_tab(user)
 
+# ---------------- Bulk Import ----------------
+elif tab == "📥 Bulk Import":
+    bulk_import_tab(user)
+
 # ---------------- Reports & Search ----------------
 elif tab == "📊 Reports & Search":
     reports_page()
+elif tab == "📈 NCD Dashboard":
+    ncd_dashboard_page(user)
 elif tab == "💉 Immunization List":
     beneficiaries_tab(user)
 elif tab == "Monthly Diary":
@@ -115,6 +140,8 @@ elif tab == "Monthly Report":
     monthly_repo()
 elif tab == "Blood sample register":
     rakt_namne_pdf()
+elif tab == "📂 My reports":
+    report_jobs.my_reports_page(user)
 # ---------------- Admin ----------------
 elif tab == "👥 Admin":
     if user["role"].lower() != "admin":
@@ -131,13 +158,12 @@ elif tab == "👥 Admin":
         role = st.selectbox("Role", ["user", "admin"])
         sub = st.form_submit_button("Create User")
         if sub:
-            conn = get_connection();
-            cur = conn.cursor()
-            cur.execute("INSERT INTO users(username,password_hash,village_name,role) VALUES(%s,%s,%s,%s)",
-                        (uname, hash_password(upass), vil, role))
-            conn.commit();
-            cur.close();
-            conn.close()
+            with get_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("INSERT INTO users(username,password_hash,village_name,role) VALUES(%s,%s,%s,%s)",
+                            (uname, hash_password(upass), vil, role))
+                conn.commit()
+                cur.close()
             st.success(f"✅ Added user {uname}")
 
     # Reset Password Form
@@ -146,17 +172,91 @@ elif tab == "👥 Admin":
         newpass = st.text_input("New Password", type="password")
         rsub = st.form_submit_button("Reset Password")
         if rsub:
-            conn = get_connection();
-            cur = conn.cursor()
-            cur.execute("UPDATE users SET password_hash=%s WHERE username=%s",
-                        (hash_password(newpass), rname))
-            conn.commit();
-            cur.close();
-            conn.close()
+            with get_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("UPDATE users SET password_hash=%s WHERE username=%s",
+                            (hash_password(newpass), rname))
+                conn.commit()
+                cur.close()
             st.success("🔑 Password reset done.")
 
     # Show all users
-    conn = get_connection()
-    df = pd.read_sql("SELECT id, username, village_name, role FROM users ORDER BY id", conn)
+    with get_connection() as conn:
+        df = pd.read_sql("SELECT id, username, village_name, role FROM users ORDER BY id", conn)
     st.dataframe(df)
-    conn.close()
+
+    # Connection pool health
+    st.subheader("🔌 Database Connection Pool")
+    stats = pool_stats()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Open connections", f"{stats.get('pool_size', 0)} / {stats.get('pool_max', 0)}")
+    c2.metric("In use", stats["connections_in_use"])
+    c3.metric("Waiting requests", stats.get("requests_waiting", 0))
+    c4.metric("Total wait (ms)", stats.get("requests_wait_ms", 0))
+    with st.expander("All pool statistics"):
+        st.json(stats)
+    cache_stats = village_cache.get_cache().stats()
+    st.caption(f"Village cache: {cache_stats['entries']} entries, "
+               f"{cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    pdfmake_problem = assets.pdfmake_problem()
+    if pdfmake_problem:
+        st.error(f"❌ pdfmake is not vendored: {pdfmake_problem}. PDF pages fall back to cdnjs and fail offline.")
+    artifacts = artifact_store.get_store().stats()
+    st.caption(f"Artifact cache: {artifacts['files']} files ({artifacts['disk_bytes'] / 2**20:.1f} MB), "
+               f"{artifacts['memory_hits'] + artifacts['disk_hits']} hits / {artifacts['misses']} misses, "
+               f"{artifacts['evictions']} evicted")
+    flights = single_flight.get_flights()
+    renders = pd.DataFrame(flights.stats())
+    coalesced = int(renders["coalesced"].sum()) if not renders.empty else 0
+    st.caption(f"Report renders: {coalesced} coalesced into in-flight renders, {flights.in_flight()} running")
+    if not renders.empty:
+        with st.expander("Renders by generator"):
+            st.dataframe(renders, use_container_width=True, hide_index=True)
+    try:
+        st.caption(f"Report jobs: {report_jobs.get_runner().running} running in the background")
+    except Exception:
+        pass  # report_jobs table not migrated yet
+    listener = village_events.start_listener()
+    st.caption(f"Invalidation listener: {'🟢 connected' if listener.connected else '🔴 reconnecting'}, "
+               f"{listener.received} events received")
+
+    # Query metrics
+    st.subheader("⏱️ SQL Queries")
+    reruns = pd.DataFrame(db_metrics.METRICS.rerun_summary())
+    if not reruns.empty:
+        per_page = reruns.groupby("page")["queries"].agg(["count", "mean", "max"]).round(1)
+        per_page.columns = ["reruns", "avg queries / rerun", "max queries / rerun"]
+        st.markdown("**Queries per rerun, by page**")
+        st.dataframe(per_page.sort_values("avg queries / rerun", ascending=False), use_container_width=True)
+    st.markdown("**Statements (rolling percentiles)**")
+    st.dataframe(pd.DataFrame(db_metrics.METRICS.summary()), use_container_width=True, hide_index=True)
+    with st.expander(f"Slow queries (≥ {db_metrics.METRICS.slow_ms:.0f} ms)"):
+        st.dataframe(pd.DataFrame(list(db_metrics.METRICS.slow)), use_container_width=True, hide_index=True)
+    with st.expander("Recent reruns"):
+        st.dataframe(reruns, use_container_width=True, hide_index=True)
+    if st.button("♻️ Reset query metrics"):
+        db_metrics.METRICS.reset()
+        st.rerun()
+
+    # Schema migrations
+    st.subheader("🗄️ Database Schema")
+    with get_connection() as conn:
+        pending = migrations.pending_migrations(conn)
+    if pending:
+        st.warning("Pending migrations: " + ", ".join(f"{v:03d} {name}" for v, name, _ in pending))
+        if st.button("⬆️ Apply migrations"):
+            try:
+                applied = migrations.migrate()
+                st.success("✅ Applied: " + ", ".join(f"{v:03d} {name}" for v, name in applied))
+            except Exception as e:
+                st.error(f"❌ Migration failed: {e}")
+    else:
+        st.info(f"✅ Schema is up to date (version {migrations.MIGRATIONS[-1][0]:03d}).")
+    if st.button("🔍 Check query plans"):
+        with st.spinner("Seeding a test dataset and running EXPLAIN..."):
+            failures = migrations.check_query_plans()
+        if failures:
+            for name, tables in failures.items():
+                st.error(f"❌ {name}: sequential scan on {', '.join(tables)}")
+        else:
+            st.success(f"✅ All {len(migrations.PLAN_QUERIES)} hot queries use indexes.")
@@ -0,0 +1,455 @@
+# migrations.py
+"""
+Versioned schema migrations for the Village Health Register database.
+
+Run from the Admin tab or from the command line:
+
+    python migrations.py                 # apply pending migrations
+    python migrations.py --status        # list applied / pending versions
+    python migrations.py --check-plans   # EXPLAIN the hot queries on a seeded dataset
+"""
+import argparse
+import json
+import sys
+
+import psycopg
+from db_config import get_connection
+
+# Arbitrary key for pg_advisory_xact_lock so two app replicas never migrate at once
+MIGRATION_LOCK_KEY = 7_201_045
+
+
+def _no_duplicates(table, columns, fix):
+    """Statement that aborts the migration with a readable list of duplicate keys.
+
+    Run it right before adding a unique constraint / index, so an old
+    database fails with the rows to clean up instead of a bare
+    "could not create unique index".
+    """
+    key = ", ".join(columns)
+    shown = " || '/' || ".join(f"{c}::text" for c in columns)
+    return f"""DO $$
+        DECLARE
+          dups TEXT;
+          total INTEGER;
+        BEGIN
+          SELECT string_agg(k || ' ×' || n, ', ' ORDER BY k), count(*) INTO dups, total
+          FROM (SELECT {shown} AS k, count(*) AS n FROM {table}
+                GROUP BY {key} HAVING count(*) > 1) d;
+          IF total > 0 THEN
+            RAISE EXCEPTION '% duplicate ({key}) in {table}: % – {fix}, then apply migrations again',
+                            total, left(dups, 2000);
+          END IF;
+        END
+        $$"""
+
+# ==========================
+# 📜 Migrations (append only – never edit an applied version)
+# ==========================
+MIGRATIONS = [
+    (1, "m_no_register unique (village_name, m_no)", [
+        # Serves WHERE village_name = ? ORDER BY m_no and the family_members join.
+        # Databases filled by the old MAX(m_no)+1 allocation can hold duplicates.
+        _no_duplicates("m_no_register", ("village_name", "m_no"),
+                       "give each extra household a new M No (and move its family_members)"),
+        """ALTER TABLE m_no_register
+           ADD CONSTRAINT m_no_register_village_mno_key UNIQUE (village_name, m_no)""",
+    ]),
+    (2, "family_members join and BP/Sugar partial indexes", [
+        """CREATE INDEX IF NOT EXISTS family_members_village_mno_idx
+           ON family_members (village_name, m_no)""",
+        """CREATE INDEX IF NOT EXISTS family_members_bp_idx
+           ON family_members (village_name, m_no) WHERE bp""",
+        """CREATE INDEX IF NOT EXISTS family_members_sugar_idx
+           ON family_members (village_name, m_no) WHERE sugar""",
+        """CREATE INDEX IF NOT EXISTS family_members_bp_sugar_idx
+           ON family_members (village_name, m_no) WHERE bp AND sugar""",
+    ]),
+    (3, "beneficiaries and users lookups", [
+        """CREATE INDEX IF NOT EXISTS beneficiaries_created_by_booth_idx
+           ON beneficiaries (created_by, booth_no, name)""",
+        """CREATE INDEX IF NOT EXISTS beneficiaries_created_by_id_idx
+           ON beneficiaries (created_by, id)""",
+        _no_duplicates("users", ("username",), "rename or delete the extra user accounts"),
+        """CREATE UNIQUE INDEX IF NOT EXISTS users_username_key
+           ON users (username)""",
+    ]),
+    (4, "normalized name search key and trigram indexes", [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        # Keep in step with name_search.search_key(): NFC, lower case, chandrabindu -> anusvara,
+        # Devanagari digits -> ASCII, nukta / ZWJ / ZWNJ dropped, punctuation -> single spaces
+        """CREATE OR REPLACE FUNCTION mpw_search_key(name TEXT) RETURNS TEXT
+           LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+             SELECT btrim(regexp_replace(
+                 translate(lower(normalize(coalesce(name, ''), NFC)),
+                           U&'\0901\0966\0967\0968\0969\096A\096B\096C\096D\096E\096F\093C\200C\200D',
+                           U&'\09020123456789'),
+                 U&'[^[:alnum:]\0900-\097F]+', ' ', 'g'))
+           $$""",
+        """CREATE INDEX IF NOT EXISTS family_members_name_trgm_idx
+           ON family_members USING gin (mpw_search_key(member_name) gin_trgm_ops)""",
+        """CREATE INDEX IF NOT EXISTS m_no_register_family_head_trgm_idx
+           ON m_no_register USING gin (mpw_search_key(family_head) gin_trgm_ops)""",
+        """CREATE INDEX IF NOT EXISTS beneficiaries_name_trgm_idx
+           ON beneficiaries USING gin (mpw_search_key(name) gin_trgm_ops)""",
+    ]),
+    (5, "per-village M No counters", [
+        # Last M No handed out per village; bumped atomically by INSERT ... ON CONFLICT DO UPDATE
+        """CREATE TABLE IF NOT EXISTS mno_counters (
+               village_name TEXT PRIMARY KEY,
+               last_m_no    INTEGER NOT NULL
+           )""",
+        """INSERT INTO mno_counters (village_name, last_m_no)
+           SELECT village_name, MAX(m_no) FROM m_no_register GROUP BY village_name
+           ON CONFLICT (village_name) DO NOTHING""",
+    ]),
+    (6, "trigger-maintained household and village NCD rollups", [
+        """CREATE TABLE IF NOT EXISTS household_counts (
+               village_name TEXT NOT NULL,
+               m_no         INTEGER NOT NULL,
+               members      INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (village_name, m_no)
+           )""",
+        """CREATE TABLE IF NOT EXISTS village_ncd_rollup (
+               village_name TEXT NOT NULL,
+               gender       TEXT NOT NULL,
+               age_band     TEXT NOT NULL,
+               members      INTEGER NOT NULL DEFAULT 0,
+               bp           INTEGER NOT NULL DEFAULT 0,
+               sugar        INTEGER NOT NULL DEFAULT 0,
+               bp_sugar     INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (village_name, gender, age_band)
+           )""",
+        # Keep in step with rollups.AGE_BANDS
+        """CREATE OR REPLACE FUNCTION mpw_age_band(age INTEGER) RETURNS TEXT
+           LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+             SELECT CASE
+                 WHEN age IS NULL THEN 'Unknown'
+                 WHEN age < 18 THEN '0-17'
+                 WHEN age < 30 THEN '18-29'
+                 WHEN age < 40 THEN '30-39'
+                 WHEN age < 50 THEN '40-49'
+                 WHEN age < 60 THEN '50-59'
+                 ELSE '60+'
+             END
+           $$""",
+        # Statement-level trigger over the transition tables: a 50k-row bulk import
+        # applies one grouped delta instead of 50k single-row updates
+        """CREATE OR REPLACE FUNCTION family_members_rollup() RETURNS trigger
+           LANGUAGE plpgsql AS $$
+           DECLARE
+             deltas TEXT := CASE TG_OP
+                 WHEN 'INSERT' THEN 'SELECT village_name, m_no, gender, age, bp, sugar, 1 AS n FROM new_rows'
+                 WHEN 'DELETE' THEN 'SELECT village_name, m_no, gender, age, bp, sugar, -1 AS n FROM old_rows'
+                 ELSE 'SELECT village_name, m_no, gender, age, bp, sugar, 1 AS n FROM new_rows
+                       UNION ALL
+                       SELECT village_name, m_no, gender, age, bp, sugar, -1 AS n FROM old_rows'
+             END;
+           BEGIN
+             EXECUTE format($sql$
+               WITH d AS (%s),
+               households AS (
+                 INSERT INTO household_counts AS h (village_name, m_no, members)
+                 SELECT village_name, m_no, sum(n) FROM d GROUP BY village_name, m_no
+                 ON CONFLICT (village_name, m_no) DO UPDATE SET members = h.members + EXCLUDED.members
+               )
+               INSERT INTO village_ncd_rollup AS r (village_name, gender, age_band, members, bp, sugar, bp_sugar)
+               SELECT village_name, coalesce(gender, 'Unknown'), mpw_age_band(age), sum(n),
+                      coalesce(sum(n) FILTER (WHERE bp), 0),
+                      coalesce(sum(n) FILTER (WHERE sugar), 0),
+                      coalesce(sum(n) FILTER (WHERE bp AND sugar), 0)
+               FROM d GROUP BY 1, 2, 3
+               ON CONFLICT (village_name, gender, age_band) DO UPDATE
+               SET members = r.members + EXCLUDED.members, bp = r.bp + EXCLUDED.bp,
+                   sugar = r.sugar + EXCLUDED.sugar, bp_sugar = r.bp_sugar + EXCLUDED.bp_sugar
+             $sql$, deltas);
+             RETURN NULL;
+           END
+           $$""",
+        # Block member writes until the triggers exist and the backfill is done
+        "LOCK TABLE family_members IN SHARE ROW EXCLUSIVE MODE",
+        """CREATE TRIGGER family_members_rollup_ins AFTER INSERT ON family_members
+           REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION family_members_rollup()""",
+        """CREATE TRIGGER family_members_rollup_upd AFTER UPDATE ON family_members
+           REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+           FOR EACH STATEMENT EXECUTE FUNCTION family_members_rollup()""",
+        """CREATE TRIGGER family_members_rollup_del AFTER DELETE ON family_members
+           REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION family_members_rollup()""",
+        "TRUNCATE household_counts, village_ncd_rollup",
+        """INSERT INTO household_counts (village_name, m_no, members)
+           SELECT village_name, m_no, count(*) FROM family_members GROUP BY village_name, m_no""",
+        """INSERT INTO village_ncd_rollup (village_name, gender, age_band, members, bp, sugar, bp_sugar)
+           SELECT village_name, coalesce(gender, 'Unknown'), mpw_age_band(age), count(*),
+                  count(*) FILTER (WHERE bp), count(*) FILTER (WHERE sugar), count(*) FILTER (WHERE bp AND sugar)
+           FROM family_members GROUP BY 1, 2, 3""",
+    ]),
+    (7, "village to PHC mapping", [
+        """CREATE TABLE IF NOT EXISTS village_phc (
+               village_name TEXT PRIMARY KEY,
+               phc_name     TEXT NOT NULL
+           )""",
+    ]),
+    (8, "background report jobs", [
+        """CREATE TABLE IF NOT EXISTS report_jobs (
+               id           BIGSERIAL PRIMARY KEY,
+               username     TEXT NOT NULL,
+               kind         TEXT NOT NULL,
+               title        TEXT NOT NULL,
+               params       JSONB NOT NULL DEFAULT '{}',
+               status       TEXT NOT NULL DEFAULT 'queued'
+                            CHECK (status IN ('queued', 'running', 'done', 'failed')),
+               progress     REAL NOT NULL DEFAULT 0,
+               worker       TEXT,
+               artifact_key TEXT,
+               file_name    TEXT,
+               mime         TEXT,
+               size_bytes   BIGINT,
+               error        TEXT,
+               created_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+               started_at   TIMESTAMPTZ,
+               finished_at  TIMESTAMPTZ
+           )""",
+        "CREATE INDEX IF NOT EXISTS report_jobs_user_idx ON report_jobs (username, created_at DESC)",
+        """CREATE INDEX IF NOT EXISTS report_jobs_active_idx ON report_jobs (worker)
+           WHERE status IN ('queued', 'running')""",
+    ]),
+    (9, "report job leases", [
+        # Renewed by the owning process; an active job whose lease ran out belongs to a dead replica
+        "ALTER TABLE report_jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMPTZ",
+        "ALTER TABLE report_jobs ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 1",
+        "UPDATE report_jobs SET heartbeat_at = coalesce(started_at, created_at) WHERE heartbeat_at IS NULL",
+        "ALTER TABLE report_jobs ALTER COLUMN heartbeat_at SET DEFAULT now(), ALTER COLUMN heartbeat_at SET NOT NULL",
+        """CREATE INDEX IF NOT EXISTS report_jobs_lease_idx ON report_jobs (heartbeat_at)
+           WHERE status IN ('queued', 'running')""",
+    ]),
+    (10, "report job output files", [
+        # Kept apart from report_jobs so listing jobs never reads the bytes
+        """CREATE TABLE IF NOT EXISTS report_job_files (
+               job_id BIGINT PRIMARY KEY REFERENCES report_jobs (id) ON DELETE CASCADE,
+               data   BYTEA NOT NULL
+           )""",
+    ]),
+]
+
+
+# ==========================
+# 🔧 Helper Functions
+# ==========================
+def _ensure_version_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version    INTEGER PRIMARY KEY,
+            name       TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+
+
+def applied_versions(conn):
+    """Return the set of migration versions already applied."""
+    with conn.cursor() as cur:
+        _ensure_version_table(cur)
+        cur.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def pending_migrations(conn):
+    """Migrations (version, name, statements) not yet applied, in order."""
+    done = applied_versions(conn)
+    return [m for m in MIGRATIONS if m[0] not in done]
+
+
+def migrate(conn=None):
+    """Apply every pending migration, each in its own transaction.
+
+    Returns the list of (version, name) that were applied. A failing
+    migration is rolled back and re-raised; earlier ones stay applied.
+    """
+    if conn is None:
+        with get_connection() as pooled:
+            return migrate(pooled)
+
+    applied = []
+    for version, name, statements in pending_migrations(conn):
+        with conn.cursor() as cur:
+            try:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+                cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+                if cur.fetchone():  # another replica got here first
+                    conn.commit()
+                    continue
+                for statement in statements:
+                    cur.execute(statement)
+                cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                conn.commit()
+            except psycopg.Error:
+                conn.rollback()
+                raise
+        applied.append((version, name))
+    return applied
+
+
+# ==========================
+# 🔍 EXPLAIN-based index check
+# ==========================
+PLAN_CHECK_VILLAGE = "__plan_check_0001"
+PLAN_CHECK_USER = "__plan_check_user_0001"
+
+# The hot queries the app runs, by name. Each must be served by an index.
+PLAN_QUERIES = {
+    "m_no list": (
+        "SELECT m_no FROM m_no_register WHERE village_name = %s ORDER BY m_no",
+        (PLAN_CHECK_VILLAGE,),
+    ),
+    "member list": (
+        "SELECT id, member_name, m_no FROM family_members WHERE village_name = %s ORDER BY m_no",
+        (PLAN_CHECK_VILLAGE,),
+    ),
+    "village report": (
+        """SELECT f.*, m.family_head FROM family_members f
+           JOIN m_no_register m ON f.m_no = m.m_no AND f.village_name = m.village_name
+           WHERE f.village_name = %s""",
+        (PLAN_CHECK_VILLAGE,),
+    ),
+    "village report (BP)": (
+        """SELECT f.*, m.family_head FROM family_members f
+           JOIN m_no_register m ON f.m_no = m.m_no AND f.village_name = m.village_name
+           WHERE f.village_name = %s AND f.bp = TRUE""",
+        (PLAN_CHECK_VILLAGE,),
+    ),
+    "village report (Sugar)": (
+        """SELECT f.*, m.family_head FROM family_members f
+           JOIN m_no_register m ON f.m_no = m.m_no AND f.village_name = m.village_name
+           WHERE f.village_name = %s AND f.sugar = TRUE""",
+        (PLAN_CHECK_VILLAGE,),
+    ),
+    "village report (BP + Sugar)": (
+        """SELECT f.*, m.family_head FROM family_members f
+           JOIN m_no_register m ON f.m_no = m.m_no AND f.village_name = m.village_name
+           WHERE f.village_name = %s AND f.bp = TRUE AND f.sugar = TRUE""",
+        (PLAN_CHECK_VILLAGE,),
+    ),
+    "beneficiaries by booth": (
+        "SELECT name, dob, gender FROM beneficiaries WHERE created_by = %s AND booth_no = %s ORDER BY name",
+        (PLAN_CHECK_USER, "7"),
+    ),
+    "member name search": (
+        "SELECT id FROM family_members WHERE mpw_search_key(member_name) LIKE %s",
+        ("%member 123 4%",),
+    ),
+    "user login": (
+        "SELECT password_hash, village_name, role FROM users WHERE username = %s",
+        (PLAN_CHECK_USER,),
+    ),
+}
+
+CHECKED_TABLES = {"m_no_register", "family_members", "beneficiaries", "users"}
+
+
+def _seed_plan_dataset(cur, villages, households, members_per_household):
+    """Insert a district-sized synthetic dataset (caller rolls it back)."""
+    cur.execute("""
+        INSERT INTO m_no_register (village_name, m_no, family_head, member_count, mobile, address,
+                                   ranjan, balar, taki, dera, frize, e_bhandi, created_by)
+        SELECT '__plan_check_' || lpad(v::text, 4, '0'), h, 'head ' || h, %s, '', '',
+               0, 0, 0, 0, 0, 0, 'plan_check'
+        FROM generate_series(1, %s) v, generate_series(1, %s) h
+    """, (members_per_household, villages, households))
+    cur.execute("""
+        INSERT INTO family_members (village_name, m_no, member_name, age, gender, bp, sugar, other, mobile)
+        SELECT '__plan_check_' || lpad(v::text, 4, '0'), h, 'member ' || h || '-' || i,
+               (h * 7 + i * 13) %% 90, 'Male', (h + i) %% 10 = 0, (h * i) %% 12 = 0, '', ''
+        FROM generate_series(1, %s) v, generate_series(1, %s) h, generate_series(1, %s) i
+    """, (villages, households, members_per_household))
+    cur.execute("""
+        INSERT INTO beneficiaries (name, dob, gender, booth_no, created_by)
+        SELECT 'child ' || b, current_date - (b %% 1800), 'M', (b %% 20)::text,
+               '__plan_check_user_' || lpad(u::text, 4, '0')
+        FROM generate_series(1, %s) u, generate_series(1, 200) b
+    """, (villages,))
+    cur.execute("""
+        INSERT INTO users (username, password_hash, village_name, role)
+        SELECT '__plan_check_user_' || lpad(u::text, 4, '0'), '',
+               '__plan_check_' || lpad((u %% %s + 1)::text, 4, '0'), 'user'
+        FROM generate_series(1, %s) u
+    """, (villages, max(villages, 5000)))
+    for table in sorted(CHECKED_TABLES):
+        cur.execute(f"ANALYZE {table}")
+
+
+def _seq_scanned_tables(plan_node):
+    """Tables from CHECKED_TABLES read by a Seq Scan anywhere in the plan tree."""
+    found = set()
+    if plan_node.get("Node Type") == "Seq Scan" and plan_node.get("Relation Name") in CHECKED_TABLES:
+        found.add(plan_node["Relation Name"])
+    for child in plan_node.get("Plans", []):
+        found |= _seq_scanned_tables(child)
+    return found
+
+
+def check_query_plans(conn=None, villages=200, households=60, members_per_household=5):
+    """EXPLAIN every PLAN_QUERIES entry against a seeded dataset.
+
+    The dataset is inserted inside a transaction that is always rolled
+    back. Returns {query name: [seq-scanned tables]} for the queries that
+    are *not* index-backed – an empty dict means every query passed.
+    """
+    if conn is None:
+        with get_connection() as pooled:
+            return check_query_plans(pooled, villages, households, members_per_household)
+
+    failures = {}
+    # ClientCursor binds parameters client-side so EXPLAIN sees literal values
+    cur = psycopg.ClientCursor(conn)
+    try:
+        _seed_plan_dataset(cur, villages, households, members_per_household)
+        for name, (query, params) in PLAN_QUERIES.items():
+            cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            tables = _seq_scanned_tables(plan[0]["Plan"])
+            if tables:
+                failures[name] = sorted(tables)
+    finally:
+        conn.rollback()
+        cur.close()
+    return failures
+
+
+# ==========================
+# 🖥️ Command line
+# ==========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Village Health Register schema migrations")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--check-plans", action="store_true",
+                        help="fail if a hot query falls back to a sequential scan")
+    args = parser.parse_args(argv)
+
+    with get_connection() as conn:
+        if args.status:
+            done = applied_versions(conn)
+            for version, name, _ in MIGRATIONS:
+                print(f"{'✅' if version in done else '⏳'} {version:03d} {name}")
+            return 0
+
+        if args.check_plans:
+            failures = check_query_plans(conn)
+            for name, (_, _) in PLAN_QUERIES.items():
+                status = f"❌ seq scan on {', '.join(failures[name])}" if name in failures else "✅ index"
+                print(f"{name:32} {status}")
+            return 1 if failures else 0
+
+        applied = migrate(conn)
+        for version, name in applied:
+            print(f"✅ Applied {version:03d} {name}")
+        if not applied:
+            print("Schema is up to date.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,345 @@
+import io
+
 import streamlit as st
-import pandas as pd
-import json
-import base64
-import streamlit.components.v1 as components
-from pathlib import Path
+from artifact_store import artifact_key
+from assets import FONT_PATH, logo
+from pdf_render import (CELL_PADDING, custom_page, draw_table, draw_text, engine_version, grouped_header,
+                        header_cell, render_pdf, simple_header, table_height, table_page, text_height)
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.utils import ImageReader
+
+PAGE_SIZE = landscape(A4)
+MARGINS = (15, 15, 15, 15)
+CONTENT_WIDTH = PAGE_SIZE[0] - MARGINS[0] - MARGINS[2]
+SHEET_NAMES = [f"sheet{i}" for i in range(1, 9)]
+GENDER_SUBS = ["पुरुष", "स्त्री", "एकूण"]
+AGE_SUBS = ["मुले", "प्रौढ", "एकूण"]
+
+
+def _pct(*percents):
+    """pdfMake percentage widths as content widths for pdf_render."""
+    return [p * CONTENT_WIDTH / 100 - 2 * CELL_PADDING for p in percents]
+
+
+def _int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def display_value(value):
+    """Zeros and blanks are printed as empty cells."""
+    return "" if value in ("0", 0, "", None) else str(value)
+
+
+def _filled(rows):
+    """Rows with at least one value other than blank / "0", as display strings."""
+    return [[display_value(v) for v in row.values()] for row in rows or []
+            if any(v not in ("", "0") for v in row.values())]
+
+
+# ==========================
+# 🧱 Sheet layouts
+# ==========================
+# A sheet is a list of blocks: heading lines, then a table whose data
+# rows may continue on the next page under a repeated header.
+def _heading(meta, title, first=True):
+    """addPageHeading (programme, PHC, title) for the first table of a sheet, just the title for the second."""
+    line = f"{title} {meta['month_year']}"
+    if not first:
+        return [(line, 12, 10, 15)]
+    return [("राष्ट्रीय कीटकजन्य रोग नियंत्रण कार्यक्रम, जिल्हा पुणे", 13, 20, 4),
+            (f"प्रा. आ. केंद्र {meta['phc_name']} तालुका {meta['taluka']} जिल्हा {meta['district']}", 12, 0, 8),
+            (line, 12, 0, 15)]
+
+
+def _block(headings, widths, header, rows, size=9, span=None, after=20):
+    return {"headings": headings, "widths": widths, "header": header, "rows": rows, "size": size,
+            "span": span or {}, "after": after}
+
+
+S1_HEADER = [
+    [header_cell("अ. क्र.", 0, rowspan=2), header_cell("उपकेंद्राचे नाव", 1, rowspan=2),
+     header_cell("लोकसंख्या", 2, rowspan=2), header_cell("कर्मचाऱ्यांचे नाव वर्गवारी", 3, rowspan=2),
+     header_cell("रक्त नमुना वार्षिक उद्दिष्ट", 4, rowspan=2),
+     header_cell("मासिक घेतलेले रक्त नमुने", 5, colspan=3),
+     header_cell("प्रगतीपथावर घेतलेले रक्त नमुने जानेवारी २०२६ पासून", 8, colspan=3)],
+    [header_cell(text, col, row=1) for col, text in
+     enumerate(["पहिला पंधरावडा", "दुसरा पंधरावडा", "एकूण"] * 2, start=5)],
+]
+
+
+def _sheet1(s1, meta):
+    """रक्त नमुना: one row per staff member, ASHA and total rows; the subcenter columns span them all."""
+    rows = []
+    for staff in s1.get("staff_data") or []:
+        m1, m2 = _int(staff.get("पहिला_पंधरावडा")), _int(staff.get("दुसरा_पंधरावडा"))
+        p1, p2 = _int(staff.get("प्रगती_पहिला")), _int(staff.get("प्रगती_दुसरा"))
+        name = (staff.get("नाव") or "") + (f" ({staff['पदनाम']})" if staff.get("पदनाम") else "")
+        rows.append(["", "", "", name, ""] + [display_value(v) for v in (m1, m2, m1 + m2, p1, p2, p1 + p2)])
+    asha = s1.get("asha_data") or {}
+    af1, af2, ap1, ap2 = (_int(asha.get(k)) for k in ("f1", "f2", "p1", "p2"))
+    rows.append(["", "", "", f"एकूण आशा कार्यकर्ती\nसंख्या {s1.get('total_asha_count') or ''}", ""]
+                + [display_value(v) for v in (af1, af2, af1 + af2, ap1, ap2, ap1 + ap2)])
+    totals = s1.get("totals") or {}
+    rows.append(["", "", "", "एकूण रक्तनमुने", ""]
+                + [display_value(totals.get(k)) for k in ("f1", "f2", "monthly", "p1", "p2", "progress")])
+    span = None
+    if s1.get("staff_data"):
+        span = {0: s1.get("subcenter_sr") or "1", 1: s1.get("subcenter_name") or "",
+                2: s1.get("subcenter_pop") or "", 4: s1.get("annual_target") or ""}
+
+    headings = [(s1.get("title") or "राष्ट्रीय कीटकजन्य रोग नियंत्रण कार्यक्रम, जिल्हा पुणे", 13, 30, 8),
+                (f"प्रा. आ. केंद्र {meta['phc_name']} तालुका {meta['taluka']} जिल्हा {meta['district']}", 12, 0, 8),
+                (f"{s1.get('subtitle') or 'रक्त नमुना मासिक अहवाल'} {s1.get('month_year') or ''}", 12, 0, 5),
+                (f"उपकेंद्र: {s1.get('subcenter_name') or ''}", 11, 5, 15, "left")]
+    return [_block(headings, _pct(5, 12, 10, 15, 8, 8, 8, 8, 8, 8, 10), S1_HEADER, rows, span=span)]
+
+
+S8_HEADER = [
+    [header_cell("अ. क्र.", 0, rowspan=3), header_cell("उपकेंद्राचे नाव", 1, rowspan=3),
+     header_cell("एकूण सार्व. उद्भव", 2, rowspan=3),
+     header_cell("जैविक पाणी नमुने तपासणी", 3, colspan=4), header_cell("रासायनिक पाणी नमुने तपासणी", 7, colspan=4),
+     header_cell("प्रारंभीची शिल्लक टीसीएल साठा (किग्रॅ)", 11, rowspan=3),
+     header_cell("चालू महिन्यात खरेदी केलेला साठा", 12, rowspan=3),
+     header_cell("चालू महिन्यात खर्च केलेला साठा", 13, rowspan=3),
+     header_cell("महिन्याच्या शेवटी शिल्लक साठा (किग्रॅ)", 14, rowspan=3),
+     header_cell("टी.सी.एल. नमुने", 15, colspan=4), header_cell("शौच नमुने", 19, colspan=4),
+     header_cell("मीठ नमुने", 23, colspan=4)],
+    [header_cell(text, col, row=1, colspan=2) for col, text in
+     zip([3, 5, 7, 9, 15, 17, 19, 21, 23, 25], ["महिन्यात", "प्रगती पर"] * 5)],
+    [header_cell(text, col, row=2) for col, text in
+     zip([*range(3, 11), *range(15, 27)], ["घेतलेले", "दुषित"] * 10)],
+]
+S8_KEYS = ["अ. क्र.", "उपकेंद्र", "एकूण_सार्व", "जै_मही_घे", "जै_मही_दू", "जै_प्रगती_घे", "जै_प्रगती_दू",
+           "रा_मही_घे", "रा_मही_दू", "रा_प्रगती_घे", "रा_प्रगती_दू", "TCL_प्रारंभ", "TCL_खरेदी", "TCL_खर्च",
+           "TCL_शेवट", "TCL_नमुना_मही_घे", "TCL_नमुना_मही_दू", None, None, "शौच_मही_घे", "शौच_मही_दू", None, None,
+           "मीठ_मही_घे", "मीठ_मही_दू", None, None]
+
+
+def _sheet8_rows(rows):
+    """प्रयोगशाळा: the entry form has no "प्रगती पर" sample columns, so those print blank."""
+    return [[display_value(row.get(key)) if key else "" for key in S8_KEYS] for row in rows or []
+            if any(v not in ("", "0") for v in row.values())]
+
+
+def _two_tables(sheet, meta, first, second):
+    """Sheets with a village-wise table and a details table: (default title, widths, header) each."""
+    (title1, widths1, header1), (title2, widths2, header2) = first, second
+    return [_block(_heading(meta, sheet.get("title1") or title1), widths1, header1, _filled(sheet.get("table1"))),
+            _block(_heading(meta, sheet.get("title2") or title2, first=False), widths2, header2,
+                   _filled(sheet.get("table2")))]
+
+
+def sheet_blocks(name, sheet, meta):
+    """Layout blocks of one sheet of the report."""
+    village_staff = ["अ. क्र.", "गावाचे नाव", "लोकसंख्या", "कर्मचारी नाव"]
+    patient = ["अ. क्र.", "गावाचे नाव", "संबंधित रुग्णाचे नाव", "वय", "लिंग", "लक्षणे", "कर्मचारी नाव"]
+    if name == "sheet1":
+        return _sheet1(sheet, meta)
+    if name == "sheet2":
+        return _two_tables(sheet, meta, (
+            "थुंकी संकलन गावनिहाय अहवाल", _pct(5, 15, 12, 15, 9, 9, 9, 9, 9, 8),
+            grouped_header(village_staff, ["मासिक", "वार्षिक"], GENDER_SUBS)
+        ), (
+            "संशयीत क्षयरुग्ण तपासणी अहवाल", _pct(5, 12, 15, 7, 7, 12, 12, 12, 12),
+            simple_header(["अ. क्र.", "गावाचे नाव", "संशयीत रुग्णाचे नाव", "वय", "लिंग", "नमुना घेतलेला दिनांक",
+                           "तपासणी दिनांक", "लॅब क्रमांक", "कर्मचारी नाव"])
+        ))
+    if name == "sheet3":
+        return _two_tables(sheet, meta, (
+            "कुष्ठरुग्ण गावनिहाय मासिक अहवाल", ["*"] * 15,
+            grouped_header(["अ. क्र.", "गावाचे नाव", "लोकसंख्या"],
+                           ["संबंधित कुष्ठ रुग्ण", "अहवाल महिन्यात नवीन शोधलेले कुष्ठरुग्ण (एम.बी.)",
+                            "अहवाल महिन्यात नवीन शोधलेले कुष्ठरुग्ण (पी.बी.)", "नियमित औषधोपचार घेणारे कुष्ठरुग्ण"],
+                           AGE_SUBS)
+        ), (
+            "कुष्ठरुग्ण तपशीलवार माहिती", _pct(8, 15, 18, 8, 8, 25, 18), simple_header(patient)
+        ))
+    if name == "sheet4":
+        return _two_tables(sheet, meta, (
+            "क्षयरुग्ण गावनिहाय मासिक अहवाल", _pct(5, 15, 12, 15, 9, 9, 9, 9, 9, 8),
+            grouped_header(village_staff, ["मासिक", "वार्षिक"], GENDER_SUBS)
+        ), (
+            "उपचार घेणारे क्षयरुग्ण तपशील", _pct(5, 12, 15, 7, 7, 10, 12, 12, 15),
+            simple_header(["अ. क्र.", "गावाचे नाव", "क्षयरुग्णाचे नाव", "वय", "लिंग", "कॅटेगरी",
+                           "औषधोपचार सुरू दिनांक", "टी. बी. नंबर", "कर्मचारी नाव"])
+        ))
+    if name == "sheet5":
+        return [_block(_heading(meta, sheet.get("title") or "कंटेनर सर्वेक्षण मासिक अहवाल"), ["*"] * 13,
+                       simple_header(["अ. क्र.", "गावाचे नाव", "लोकसंख्या", "एकूण घरांची संख्या",
+                                      "एडीएस डास अळी करता तपासलेले घरे", "एडीएस डास आळी करता दूषित आढळलेली घरे",
+                                      "एडीएस डास अळी करिता तपासलेली भांडी",
+                                      "एडीएस डास अळी करता दूषित आढळलेली भांडी", "हाऊस इंडेक्स",
+                                      "कंटेनर इंडेक्स", "ब्रँट्यू इंडेक्स", "रिकामी केलेली भांडी",
+                                      "अँबेट टाकलेली भांडी"]),
+                       _filled(sheet.get("data")))]
+    if name == "sheet6":
+        lead = ["अ. क्र.", "उपकेंद्राचे नाव", "गावाचे नाव"]
+        return _two_tables(sheet, meta, (
+            "डासउत्पत्ती स्थानांची गावनिहाय यादी", _pct(8, 18, 18, 12, 12, 32),
+            grouped_header(lead, ["डास उत्पत्ती स्थाने"], ["कायम", "हंगामी"], ["डासउत्पत्ती स्थानाचे ठिकाण"])
+        ), (
+            "गप्पी मासे पैदास केंद्राची यादी", _pct(8, 18, 18, 12, 12, 32),
+            grouped_header(lead, ["गप्पी मासे पैदास केंद्र"], ["कायम", "हंगामी"],
+                           ["गप्पी मासे पैदास केंद्राचे ठिकाण"])
+        ))
+    if name == "sheet7":
+        return _two_tables(sheet, meta, (
+            "मोतीबिंदू गावनिहाय मासिक अहवाल", _pct(8, 15, 12, 10, 10, 10, 10, 10, 10),
+            grouped_header(["अ. क्र.", "गावाचे नाव", "लोकसंख्या"],
+                           ["संशयीत मोतीबिंदू", "अहवाल महिन्यात नवीन शोधलेले मोतीबिंदू"], AGE_SUBS)
+        ), (
+            "मोतीबिंदू रुग्ण तपशीलवार माहिती", _pct(8, 15, 18, 8, 8, 25, 18), simple_header(patient)
+        ))
+    if name == "sheet8":
+        return [_block(_heading(meta, sheet.get("title1") or "राज्य आयोग्य प्रयोगशाळा विविध नमुने तपासणी अहवाल"),
+                       ["*"] * 27, S8_HEADER, _sheet8_rows(sheet.get("table1")), size=8),
+                _block(_heading(meta, sheet.get("title2") or "गावनिहाय TCL साठा अहवाल", first=False),
+                       _pct(8, 18, 12, 12, 12, 12, 14, 12),
+                       simple_header(["अ. क्र.", "उपकेंद्राचे नाव", "एकूण ग्रामपंचायत", "एकूण गावे", "टीसीएल साठा",
+                                      "टीसीएल साठवण", "पाणी शुद्धीकरण", "टीसीएल नसलेले गावे"]),
+                       _filled(sheet.get("table2")))]
+    raise KeyError(name)
+
+
+# ==========================
+# 🖨️ Rendering
+# ==========================
+def _grid(block, chunk):
+    """Header plus ``chunk`` data rows as one grid, so every row gets its own height."""
+    first = len(block["header"])
+    grid = [[header_cell(value, col, row=first + r) for col, value in enumerate(row) if col not in block["span"]]
+            for r, row in enumerate(chunk)]
+    if grid:
+        grid[0].extend(header_cell(text, col, row=first, rowspan=len(chunk)) for col, text in block["span"].items())
+    return table_page("", block["widths"], block["header"] + grid, rows=0, font_size=block["size"],
+                      header_size=block["size"], line_width=0.5, page_size=PAGE_SIZE, margins=MARGINS)
+
+
+def layout_sheet(blocks):
+    """Place the blocks top-down: [[item, ...] per page]; long tables continue under a repeated header."""
+    top, bottom = PAGE_SIZE[1] - MARGINS[1], MARGINS[3]
+    pages = [[]]
+    y = top
+    for block in blocks:
+        rows = block["rows"]
+        headings = [(text, size, before, after, align[0] if align else "center")
+                    for text, size, before, after, *align in block["headings"]]
+        # Keep the headings with the table header and its first row
+        need = sum(before + text_height(text, size, CONTENT_WIDTH) + after for text, size, before, after, _ in headings)
+        if y - need - table_height(_grid(block, rows[:1])) < bottom and pages[-1]:
+            pages.append([])
+            y = top
+        for text, size, before, after, align in headings:
+            y -= before
+            pages[-1].append(("text", text, size, y, align))
+            y -= text_height(text, size, CONTENT_WIDTH) + after
+
+        start = 0
+        while True:
+            end = min(start + 1, len(rows))
+            while end < len(rows) and table_height(_grid(block, rows[start:end + 1])) <= y - bottom:
+                end += 1
+            table = _grid(block, rows[start:end])
+            pages[-1].append(("table", table, y))
+            y -= table_height(table)
+            start = end
+            if start >= len(rows):
+                break
+            pages.append([])
+            y = top
+        y -= block["after"]
+    return pages
+
+
+def _draw_sheet_page(c, page):
+    for item in page["items"]:
+        if item[0] == "text":
+            _, text, size, y, align = item
+            indent = 10 if align == "left" else 0
+            draw_text(c, text, size, MARGINS[0] + indent, y, CONTENT_WIDTH - indent, align=align)
+        else:
+            draw_table(c, item[1], top=item[2])
+
+
+def render_sheet(name, sheet, meta):
+    """One sheet of the report as PDF bytes (its own page range)."""
+    pages = [custom_page(_draw_sheet_page, page_size=PAGE_SIZE, margins=MARGINS, items=items)
+             for items in layout_sheet(sheet_blocks(name, sheet, meta))]
+    return render_pdf(pages, number_from=None)
+
+
+def _draw_cover(c, page):
+    width, height = page["page_size"]
+    meta = page["meta"]
+    image = ImageReader(str(logo().path))
+    image_width, image_height = image.getSize()
+    w = 750
+    h = w * image_height / image_width
+    y = height - MARGINS[1] - 20
+    c.drawImage(image, (width - w) / 2, y - h, w, h, mask="auto")
+    y -= h + 10
+    for text, size in ((f"मासिक आहवाल माहे : {meta['month_year']}", 20),
+                       (f"प्राथमिक आरोग्य केंद्र {meta['phc_name']}", 17),
+                       (f"उपकेंद्र {meta['sub_center']}", 17)):
+        y -= draw_text(c, text, size, 40 + MARGINS[0], y, width - 80 - MARGINS[0] - MARGINS[2], align="center")
+
+
+def render_cover(meta):
+    return render_pdf([custom_page(_draw_cover, page_size=PAGE_SIZE, margins=MARGINS, meta=meta)], number_from=None)
+
+
+HEADING_FIELDS = ("month_year", "phc_name", "taluka", "district")
+
+
+# The sheets carry patient names, so their pages are cached in the user's
+# session only – never in the shared on-disk artifact_store.
+def _cached_part(cache, used, generator, version, inputs, build):
+    key = artifact_key(generator, version, inputs)
+    if key not in cache:
+        cache[key] = build()
+    used.add(key)
+    return cache[key]
+
+
+def cover_pdf(meta, cache, used):
+    return _cached_part(cache, used, "monthly_final_report.cover", f"{engine_version()}-{logo().sha256[:16]}",
+                        meta, lambda: render_cover(meta))
+
+
+def sheet_pdf(name, sheet, meta, cache, used):
+    """One sheet's pages, keyed by a hash of that sheet's data (and the heading fields it prints).
+
+    Editing one sheet leaves every other sheet's cached pages valid.
+    """
+    meta = {k: meta[k] for k in HEADING_FIELDS}
+    return _cached_part(cache, used, "monthly_final_report.sheet", engine_version(),
+                        {"name": name, "sheet": sheet, "meta": meta}, lambda: render_sheet(name, sheet, meta))
+
+
+def monthly_report_pdf(sheet_data, meta, cache=None):
+    """The whole report: the cover and each sheet's pages spliced together with pypdf.
+
+    ``cache`` (a dict kept in st.session_state) holds the parts of the
+    previous build; parts it no longer uses are dropped from it.
+    """
+    cache = {} if cache is None else cache
+    used = set()
+    parts = [cover_pdf(meta, cache, used)] + [sheet_pdf(name, sheet_data[name], meta, cache, used)
+                                              for name in SHEET_NAMES if name in sheet_data]
+    for key in set(cache) - used:
+        del cache[key]
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(io.BytesIO(part)), import_outline=False)
+    writer.add_metadata({"/Title": f"मासिक आहवाल {meta['month_year']}"})
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
 
 
 def mothly_final_report():
@@ -535,9 +871,7 @@ def mothly_final_report():
         st.info("सर्व डेटा भरल्यानंतर येथे PDF तयार करा")
 
         # Check for font file
-        BASE_DIR = Path(__file__).resolve().parent
-        font_path = BASE_DIR / "fonts" / "NotoSerifDevanagari-VariableFont_wdth,wght.ttf"
-        imgpath = BASE_DIR / "fonts" / "img.png"
+        font_path = FONT_PATH
         if not font_path.exists():
             st.error(f"❌ Font file missing at: {font_path}")
             st.info(
@@ -549,872 +883,16 @@ def mothly_final_report():
             """)
             return
 
-        # Read and encode font
-        font_b64 = base64.b64encode(font_path.read_bytes()).decode()
-        img = base64.b64encode(imgpath.read_bytes()).decode()
-        # Prepare all data for PDF
-        all_sheets_json = json.dumps(st.session_state.sheet_data, ensure_ascii=False)
-
-        # PDF generation component with local font
-        components.html(
-            f"""
-            <html>
-            <head>
-              <meta charset="utf-8" />
-              <script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/pdfmake.min.js"></script>
-              <script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/vfs_fonts.js"></script>
-              <style>
-                body {{ padding: 20px; font-family: Arial, sans-serif; }}
-                .button-container {{ margin: 20px 0; }}
-                button {{
-                  padding: 14px 28px;
-                  margin-right: 10px;
-                  border: none;
-                  border-radius: 6px;
-                  cursor: pointer;
-                  font-size: 16px;
-                  font-weight: bold;
-                  box-shadow: 0 3px 6px rgba(0,0,0,0.3);
-                }}
-                .preview-btn {{ background: #2196F3; color: white; }}
-                .download-btn {{ background: #4CAF50; color: white; }}
-                #status {{
-                  margin-top: 15px;
-                  padding: 12px;
-                  border-radius: 4px;
-                  display: none;
-                }}
-              </style>
-            </head>
-
-            <body>
-              <div class="button-container">
-                <button class="preview-btn" onclick="previewPDF()">
-                  👁️ Preview PDF
-                </button>
-                <button class="download-btn" onclick="downloadPDF()">
-                  ⬇️ Download PDF
-                </button>
-              </div>
-
-              <div id="status"></div>
-
-              <script>
-                const logoImage = "data:image/png;base64,{img}";
-                const allData = {all_sheets_json};
-                const metadata = {{
-                  monthYear: "{month_year}",
-                  phcName: "{phc_name}",
-                  taluka: "{taluka}",
-                  district: "{district}",
-                  subcenter: "{sub_center}",
-                  population: "{population}"
-                }};
-
-                pdfMake.vfs["MarathiFont.ttf"] = "{font_b64}";
-                pdfMake.fonts = {{
-                  MarathiFont: {{
-                    normal: "MarathiFont.ttf",
-                    bold: "MarathiFont.ttf",
-                    italics: "MarathiFont.ttf",
-                    bolditalics: "MarathiFont.ttf"
-                  }}
-                }};
-
-                function showStatus(msg, color) {{
-                  const status = document.getElementById('status');
-                  status.innerHTML = msg;
-                  status.style.background = color;
-                  status.style.display = 'block';
-                  setTimeout(() => {{ status.style.display = 'none'; }}, 3000);
-                }}
-
-                function displayValue(val) {{
-                  if (val === '0' || val === 0 || val === '') return '';
-                  return val;
-                }}
-                 
-                function addPageHeading2(title, monthYear) {{
-                  return [
-                    
-                    {{
-                      text: title + ' ' + (monthYear || metadata.monthYear),
-                      alignment: 'center',
-                      bold: true,
-                      fontSize: 12,
-                      margin: [0, 10, 0, 15]
-                    }}
-                  ];
-                }}
-                function addPageHeading(title, monthYear) {{
-                  return [
-                    {{
-                      text: 'राष्ट्रीय कीटकजन्य रोग नियंत्रण कार्यक्रम, जिल्हा पुणे',
-                      alignment: 'center',
-                      bold: true,
-                      fontSize: 13,
-                      margin: [0, 20, 0, 4]
-                    }},
-                    {{
-                      text: 'प्रा. आ. केंद्र ' + metadata.phcName + ' तालुका ' + metadata.taluka + ' जिल्हा ' + metadata.district,
-                      fontSize: 12,
-                      bold: true,
-                      alignment: 'center',
-                      margin: [0, 0, 0, 8]
-                    }},
-                    {{
-                      text: title + ' ' + (monthYear || metadata.monthYear),
-                      alignment: 'center',
-                      bold: true,
-                      fontSize: 12,
-                      margin: [0, 0, 0, 15]
-                    }}
-                  ];
-                }}
-                function createPDFDefinition() {{
-                  const content = [];
-                  content.push({{
-                      stack: [
-                        {{
-                          image: logoImage,
-                          width: 750,
-                          alignment: 'center',
-                          margin: [0, 20, 5 , 10]
-                        }},
-                        {{
-                          text: 'मासिक आहवाल माहे : ' + metadata.monthYear,
-                          alignment: 'center',
-                          bold: true,
-                          fontSize: 20  
-                        }},
-                        {{
-                          text: 'प्राथमिक आरोग्य केंद्र ' + metadata.phcName,
-                          alignment: 'center',
-                          bold: true,
-                          fontSize: 17 
-                        }},
-                        {{
-                          text: 'उपकेंद्र '+ metadata.subcenter,
-                          alignment: 'center',
-                          bold: true,
-                          fontSize: 17 
-                        }}
-                      ],
-                      margin: [40, 10, 40, 10]
-                    }});                  
-                  content.push({{ text: '', pageBreak: 'before' }});
-                  // SHEET 1 - रक्त नमुना (Keep as original)
-                  if (allData.sheet1) {{
-                    const s1 = allData.sheet1;
-                    const tableBody1 = [];
-
-                    content.push({{
-                      text: s1.title || 'राष्ट्रीय कीटकजन्य रोग नियंत्रण कार्यक्रम, जिल्हा पुणे',
-                      alignment: 'center',
-                      bold: true,
-                      fontSize: 13,
-                      margin: [0, 30, 0, 8]
-                    }});
-
-                    content.push({{
-                      text: 'प्रा. आ. केंद्र ' + metadata.phcName + ' तालुका ' + metadata.taluka + ' जिल्हा ' + metadata.district,
-                      fontSize: 12,
-                      bold: true,
-                      alignment: 'center',
-                      margin: [0, 0, 0, 8]
-                    }});
-
-                    content.push({{
-                      text: (s1.subtitle || 'रक्त नमुना मासिक अहवाल') + ' ' + (s1.month_year || ''),
-                      alignment: 'center',
-                      bold: true,
-                      fontSize: 12,
-                      margin: [0, 0, 0, 5]
-                    }});
-
-                    content.push({{
-                      text: 'उपकेंद्र: ' + (s1.subcenter_name || ''),
-                      bold: true,
-                      fontSize: 11,
-                      margin: [10, 5, 0, 15]
-                    }});
-
-                    tableBody1.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'उपकेंद्राचे नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'लोकसंख्या', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'कर्मचाऱ्यांचे नाव वर्गवारी', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'रक्त नमुना वार्षिक उद्दिष्ट', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'मासिक घेतलेले रक्त नमुने', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}},
-                      {{ text: 'प्रगतीपथावर घेतलेले रक्त नमुने जानेवारी २०२६ पासून', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}}
-                    ]);
-
-                    tableBody1.push([
-                      {{}},{{}},{{}},{{}},{{}},
-                      {{ text: 'पहिला पंधरावडा', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'दुसरा पंधरावडा', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'पहिला पंधरावडा', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'दुसरा पंधरावडा', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    const totalRows = (s1.staff_data ? s1.staff_data.length : 0) + 2;
-
-                    if (s1.staff_data && s1.staff_data.length > 0) {{
-                      s1.staff_data.forEach((staff, idx) => {{
-                        const m1 = parseInt(staff.पहिला_पंधरावडा || 0);
-                        const m2 = parseInt(staff.दुसरा_पंधरावडा || 0);
-                        const p1 = parseInt(staff.प्रगती_पहिला || 0);
-                        const p2 = parseInt(staff.प्रगती_दुसरा || 0);
-                        const nameWithDesignation = (staff.नाव || '') + (staff.पदनाम ? ' (' + staff.पदनाम + ')' : '');
-
-                        tableBody1.push([
-                          {{ text: idx === 0 ? (s1.subcenter_sr || '1') : '', fontSize: 9, alignment: 'center', rowSpan: idx === 0 ? totalRows : 1 }},
-                          {{ text: idx === 0 ? (s1.subcenter_name || '') : '', fontSize: 9, alignment: 'center', rowSpan: idx === 0 ? totalRows : 1 }},
-                          {{ text: idx === 0 ? (s1.subcenter_pop || '') : '', fontSize: 9, alignment: 'center', rowSpan: idx === 0 ? totalRows : 1 }},
-                          {{ text: nameWithDesignation, fontSize: 9, alignment: 'center' }},
-                          {{ text: idx === 0 ? (s1.annual_target || '') : '', fontSize: 9, alignment: 'center', rowSpan: idx === 0 ? totalRows : 1 }},
-                          {{ text: displayValue(m1), fontSize: 9, alignment: 'center' }},
-                          {{ text: displayValue(m2), fontSize: 9, alignment: 'center' }},
-                          {{ text: displayValue(m1 + m2), fontSize: 9, alignment: 'center' }},
-                          {{ text: displayValue(p1), fontSize: 9, alignment: 'center' }},
-                          {{ text: displayValue(p2), fontSize: 9, alignment: 'center' }},
-                          {{ text: displayValue(p1 + p2), fontSize: 9, alignment: 'center' }}
-                        ]);
-                      }});
-                    }}
-
-                    const af1 = parseInt(s1.asha_data?.f1 || 0);
-                    const af2 = parseInt(s1.asha_data?.f2 || 0);
-                    const ap1 = parseInt(s1.asha_data?.p1 || 0);
-                    const ap2 = parseInt(s1.asha_data?.p2 || 0);
-
-                    tableBody1.push([
-                      {{ text: '', alignment: 'center' }},
-                      {{ text: '', alignment: 'center' }},
-                      {{ text: '', alignment: 'center' }},
-                      {{ text: 'एकूण आशा कार्यकर्ती\\nसंख्या ' + (s1.total_asha_count || ''), bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: '', alignment: 'center' }},
-                      {{ text: displayValue(af1), fontSize: 9, alignment: 'center' }},
-                      {{ text: displayValue(af2), fontSize: 9, alignment: 'center' }},
-                      {{ text: displayValue(af1 + af2), fontSize: 9, alignment: 'center' }},
-                      {{ text: displayValue(ap1), fontSize: 9, alignment: 'center' }},
-                      {{ text: displayValue(ap2), fontSize: 9, alignment: 'center' }},
-                      {{ text: displayValue(ap1 + ap2), fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    tableBody1.push([
-                      {{ text: '', alignment: 'center' }},
-                      {{ text: '', alignment: 'center' }},
-                      {{ text: '', alignment: 'center' }},
-                      {{ text: 'एकूण रक्तनमुने', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: '', alignment: 'center' }},
-                      {{ text: displayValue(s1.totals?.f1), bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: displayValue(s1.totals?.f2), bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: displayValue(s1.totals?.monthly), bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: displayValue(s1.totals?.p1), bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: displayValue(s1.totals?.p2), bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: displayValue(s1.totals?.progress), bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    content.push({{
-                      table: {{ 
-                        widths: ['5%', '12%', '10%', '15%', '8%', '8%', '8%', '8%', '8%', '8%', '10%'], 
-                        body: tableBody1 
-                      }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }}
-                    }});
-                  }}
-
-                  // SHEET 2 - थुंकी संकलन - TWO TABLES
-                  if (allData.sheet2) {{
-                    content.push({{ text: '', pageBreak: 'before' }});
-                    const s2 = allData.sheet2;
-
-                    content.push(...addPageHeading(s2.title1 || 'थुंकी संकलन गावनिहाय अहवाल', metadata.monthYear));
-
-                    const tableBody2a = [];
-                    tableBody2a.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'लोकसंख्या', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'कर्मचारी नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'मासिक', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}},
-                      {{ text: 'वार्षिक', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}}
-                    ]);
-                    tableBody2a.push([
-                      {{}},{{}},{{}},{{}},
-                      {{ text: 'पुरुष', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'स्त्री', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'पुरुष', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'स्त्री', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    if (s2.table1) {{
-                      s2.table1.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody2a.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: ['5%', '15%', '12%', '15%', '9%', '9%', '9%', '9%', '9%', '8%'], body: tableBody2a }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }},
-                      margin: [0, 0, 0, 20]
-                    }});
-
-                    content.push(...addPageHeading2(s2.title2 || 'संशयीत क्षयरुग्ण तपासणी अहवाल', ''));
-
-                    const tableBody2b = [];
-                    tableBody2b.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'संशयीत रुग्णाचे नाव', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'वय', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'लिंग', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'नमुना घेतलेला दिनांक', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'तपासणी दिनांक', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'लॅब क्रमांक', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'कर्मचारी नाव', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    if (s2.table2) {{
-                      s2.table2.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody2b.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: ['5%', '12%', '15%', '7%', '7%', '12%', '12%', '12%', '12%'], body: tableBody2b }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }}
-                    }});
-                  }}
-
-                  // SHEET 3 - कुष्ठरुग्ण - TWO TABLES
-                  if (allData.sheet3) {{
-                    content.push({{ text: '', pageBreak: 'before' }});
-                    const s3 = allData.sheet3;
-
-                    content.push(...addPageHeading(s3.title1 || 'कुष्ठरुग्ण गावनिहाय मासिक अहवाल', metadata.monthYear));
-
-                    const tableBody3a = [];
-                    tableBody3a.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'लोकसंख्या', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'संबंधित कुष्ठ रुग्ण', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}},
-                      {{ text: 'अहवाल महिन्यात नवीन शोधलेले कुष्ठरुग्ण (एम.बी.)', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}},
-                      {{ text: 'अहवाल महिन्यात नवीन शोधलेले कुष्ठरुग्ण (पी.बी.)', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}},
-                      {{ text: 'नियमित औषधोपचार घेणारे कुष्ठरुग्ण', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}}
-                    ]);
-                    tableBody3a.push([
-                      {{}},{{}},{{}},
-                      {{ text: 'मुले', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'प्रौढ', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'मुले', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'प्रौढ', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'मुले', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'प्रौढ', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'मुले', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'प्रौढ', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    if (s3.table1) {{
-                      s3.table1.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody3a.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: Array(15).fill('*'), body: tableBody3a }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }},
-                      margin: [0, 0, 0, 20]
-                    }});
-
-                    content.push(...addPageHeading2(s3.title2 || 'कुष्ठरुग्ण तपशीलवार माहिती', ''));
-
-                    const tableBody3b = [];
-                    tableBody3b.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'संबंधित रुग्णाचे नाव', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'वय', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'लिंग', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'लक्षणे', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'कर्मचारी नाव', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    if (s3.table2) {{
-                      s3.table2.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody3b.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: ['8%', '15%', '18%', '8%', '8%', '25%', '18%'], body: tableBody3b }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }}
-                    }});
-                  }}
-
-                  // SHEET 4 - क्षय रुग्ण - TWO TABLES
-                  if (allData.sheet4) {{
-                    content.push({{ text: '', pageBreak: 'before' }});
-                    const s4 = allData.sheet4;
-
-                    content.push(...addPageHeading(s4.title1 || 'क्षयरुग्ण गावनिहाय मासिक अहवाल', metadata.monthYear));
-
-                    const tableBody4a = [];
-                    tableBody4a.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'लोकसंख्या', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'कर्मचारी नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'मासिक', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}},
-                      {{ text: 'वार्षिक', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}}
-                    ]);
-                    tableBody4a.push([
-                      {{}},{{}},{{}},{{}},
-                      {{ text: 'पुरुष', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'स्त्री', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'पुरुष', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'स्त्री', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    if (s4.table1) {{
-                      s4.table1.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody4a.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: ['5%', '15%', '12%', '15%', '9%', '9%', '9%', '9%', '9%', '8%'], body: tableBody4a }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }},
-                      margin: [0, 0, 0, 20]
-                    }});
-
-                    content.push(...addPageHeading2(s4.title2 || 'उपचार घेणारे क्षयरुग्ण तपशील', ''));
-
-                    const tableBody4b = [];
-                    tableBody4b.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'क्षयरुग्णाचे नाव', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'वय', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'लिंग', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'कॅटेगरी', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'औषधोपचार सुरू दिनांक', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'टी. बी. नंबर', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'कर्मचारी नाव', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    if (s4.table2) {{
-                      s4.table2.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody4b.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: ['5%', '12%', '15%', '7%', '7%', '10%', '12%', '12%', '15%'], body: tableBody4b }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }}
-                    }});
-                  }}
-
-                  // SHEET 5 - कंटेनर सर्वेक्षण - ONE TABLE
-                  if (allData.sheet5) {{
-                    content.push({{ text: '', pageBreak: 'before' }});
-                    const s5 = allData.sheet5;
-
-                    content.push(...addPageHeading(s5.title || 'कंटेनर सर्वेक्षण मासिक अहवाल', metadata.monthYear));
-
-                    const tableBody5 = [];
-                    tableBody5.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'लोकसंख्या', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण घरांची संख्या', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एडीएस डास अळी करता तपासलेले घरे', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एडीएस डास आळी करता दूषित आढळलेली घरे', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एडीएस डास अळी करिता तपासलेली भांडी', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एडीएस डास अळी करता दूषित आढळलेली भांडी', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'हाऊस इंडेक्स', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'कंटेनर इंडेक्स', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'ब्रँट्यू इंडेक्स', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'रिकामी केलेली भांडी', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'अँबेट टाकलेली भांडी', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    if (s5.data) {{
-                      s5.data.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody5.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: Array(13).fill('*'), body: tableBody5 }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }}
-                    }});
-                  }}
-
-                  // SHEET 6 - डासउत्पत्ती - TWO TABLES
-                  if (allData.sheet6) {{
-                    content.push({{ text: '', pageBreak: 'before' }});
-                    const s6 = allData.sheet6;
-
-                    content.push(...addPageHeading(s6.title1 || 'डासउत्पत्ती स्थानांची गावनिहाय यादी', metadata.monthYear));
-
-                    const tableBody6a = [];
-                    tableBody6a.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'उपकेंद्राचे नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'डास उत्पत्ती स्थाने', bold: true, fontSize: 9, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{ text: 'डासउत्पत्ती स्थानाचे ठिकाण', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }}
-                    ]);
-                    tableBody6a.push([
-                      {{}},{{}},{{}},
-                      {{ text: 'कायम', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'हंगामी', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{}}
-                    ]);
-
-                    if (s6.table1) {{
-                      s6.table1.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody6a.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: ['8%', '18%', '18%', '12%', '12%', '32%'], body: tableBody6a }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }},
-                      margin: [0, 0, 0, 20]
-                    }});
-
-                    content.push(...addPageHeading2(s6.title2 || 'गप्पी मासे पैदास केंद्राची यादी', ''));
-
-                    const tableBody6b = [];
-                    tableBody6b.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'उपकेंद्राचे नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'गप्पी मासे पैदास केंद्र', bold: true, fontSize: 9, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{ text: 'गप्पी मासे पैदास केंद्राचे ठिकाण', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }}
-                    ]);
-                    tableBody6b.push([
-                      {{}},{{}},{{}},
-                      {{ text: 'कायम', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'हंगामी', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{}}
-                    ]);
-
-                    if (s6.table2) {{
-                      s6.table2.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody6b.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: ['8%', '18%', '18%', '12%', '12%', '32%'], body: tableBody6b }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }}
-                    }});
-                  }}
-
-                  // SHEET 7 - मोतीबिंदू - TWO TABLES
-                  if (allData.sheet7) {{
-                    content.push({{ text: '', pageBreak: 'before' }});
-                    const s7 = allData.sheet7;
-
-                    content.push(...addPageHeading(s7.title1 || 'मोतीबिंदू गावनिहाय मासिक अहवाल', metadata.monthYear));
-
-                    const tableBody7a = [];
-                    tableBody7a.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'लोकसंख्या', bold: true, fontSize: 9, rowSpan: 2, alignment: 'center' }},
-                      {{ text: 'संशयीत मोतीबिंदू', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}},
-                      {{ text: 'अहवाल महिन्यात नवीन शोधलेले मोतीबिंदू', bold: true, fontSize: 9, colSpan: 3, alignment: 'center' }},
-                      {{}},{{}}
-                    ]);
-                    tableBody7a.push([
-                      {{}},{{}},{{}},
-                      {{ text: 'मुले', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'प्रौढ', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'मुले', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'प्रौढ', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    if (s7.table1) {{
-                      s7.table1.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody7a.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: ['8%', '15%', '12%', '10%', '10%', '10%', '10%', '10%', '10%'], body: tableBody7a }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }},
-                      margin: [0, 0, 0, 20]
-                    }});
-
-                    content.push(...addPageHeading2(s7.title2 || 'मोतीबिंदू रुग्ण तपशीलवार माहिती', ''));
-
-                    const tableBody7b = [];
-                    tableBody7b.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'गावाचे नाव', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'संबंधित रुग्णाचे नाव', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'वय', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'लिंग', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'लक्षणे', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'कर्मचारी नाव', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    if (s7.table2) {{
-                      s7.table2.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody7b.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: ['8%', '15%', '18%', '8%', '8%', '25%', '18%'], body: tableBody7b }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }}
-                    }});
-                  }}
-
-                  // SHEET 8 - प्रयोगशाळा - TWO TABLES (COMPLEX)
-                  if (allData.sheet8) {{
-                    content.push({{ text: '', pageBreak: 'before' }});
-                    const s8 = allData.sheet8;
-
-                    content.push(...addPageHeading(s8.title1 || 'राज्य आयोग्य प्रयोगशाळा विविध नमुने तपासणी अहवाल', metadata.monthYear));
-
-                    const tableBody8a = [];
-                    // Complex nested header structure
-                    tableBody8a.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 8, rowSpan: 3, alignment: 'center' }},
-                      {{ text: 'उपकेंद्राचे नाव', bold: true, fontSize: 8, rowSpan: 3, alignment: 'center' }},
-                      {{ text: 'एकूण सार्व. उद्भव', bold: true, fontSize: 8, rowSpan: 3, alignment: 'center' }},
-                      {{ text: 'जैविक पाणी नमुने तपासणी', bold: true, fontSize: 8, colSpan: 4, alignment: 'center' }},
-                      {{}},{{}},{{}},
-                      {{ text: 'रासायनिक पाणी नमुने तपासणी', bold: true, fontSize: 8, colSpan: 4, alignment: 'center' }},
-                      {{}},{{}},{{}},
-                      {{ text: 'प्रारंभीची शिल्लक टीसीएल साठा (किग्रॅ)', bold: true, fontSize: 8, rowSpan: 3, alignment: 'center' }},
-                      {{ text: 'चालू महिन्यात खरेदी केलेला साठा', bold: true, fontSize: 8, rowSpan: 3, alignment: 'center' }},
-                      {{ text: 'चालू महिन्यात खर्च केलेला साठा', bold: true, fontSize: 8, rowSpan: 3, alignment: 'center' }},
-                      {{ text: 'महिन्याच्या शेवटी शिल्लक साठा (किग्रॅ)', bold: true, fontSize: 8, rowSpan: 3, alignment: 'center' }},
-                      {{ text: 'टी.सी.एल. नमुने', bold: true, fontSize: 8, colSpan: 4, alignment: 'center' }},
-                      {{}},{{}},{{}},
-                      {{ text: 'शौच नमुने', bold: true, fontSize: 8, colSpan: 4, alignment: 'center' }},
-                      {{}},{{}},{{}},
-                      {{ text: 'मीठ नमुने', bold: true, fontSize: 8, colSpan: 4, alignment: 'center' }},
-                      {{}},{{}},{{}}
-                    ]);
-
-                    // Simplified for readability - showing structure
-                    tableBody8a.push([
-                      {{}},{{}},{{}},
-                      {{ text: 'महिन्यात', bold: true, fontSize: 8, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{ text: 'प्रगती पर', bold: true, fontSize: 8, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{ text: 'महिन्यात', bold: true, fontSize: 8, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{ text: 'प्रगती पर', bold: true, fontSize: 8, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{}},{{}},{{}},{{}},
-                      {{ text: 'महिन्यात', bold: true, fontSize: 8, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{ text: 'प्रगती पर', bold: true, fontSize: 8, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{ text: 'महिन्यात', bold: true, fontSize: 8, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{ text: 'प्रगती पर', bold: true, fontSize: 8, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{ text: 'महिन्यात', bold: true, fontSize: 8, colSpan: 2, alignment: 'center' }},
-                      {{}},
-                      {{ text: 'प्रगती पर', bold: true, fontSize: 8, colSpan: 2, alignment: 'center' }},
-                      {{}}
-                    ]);
-
-                    tableBody8a.push([
-                      {{}},{{}},{{}},
-                      {{ text: 'घेतलेले', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'दुषित', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'घेतलेले', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'दुषित', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'घेतलेले', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'दुषित', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'घेतलेले', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'दुषित', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{}},{{}},{{}},{{}},
-                      {{ text: 'घेतलेले', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'दुषित', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'घेतलेले', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'दुषित', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'घेतलेले', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'दुषित', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'घेतलेले', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'दुषित', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'घेतलेले', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'दुषित', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'घेतलेले', bold: true, fontSize: 8, alignment: 'center' }},
-                      {{ text: 'दुषित', bold: true, fontSize: 8, alignment: 'center' }}
-                    ]);
-
-                    if (s8.table1) {{
-                      s8.table1.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          const rowData = [
-                            {{ text: displayValue(row['अ. क्र.']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['उपकेंद्र']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['एकूण_सार्व']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['जै_मही_घे']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['जै_मही_दू']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['जै_प्रगती_घे']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['जै_प्रगती_दू']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['रा_मही_घे']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['रा_मही_दू']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['रा_प्रगती_घे']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['रा_प्रगती_दू']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['TCL_प्रारंभ']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['TCL_खरेदी']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['TCL_खर्च']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['TCL_शेवट']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['TCL_नमुना_मही_घे']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['TCL_नमुना_मही_दू']), fontSize: 8, alignment: 'center' }},
-                            {{ text: '', fontSize: 8, alignment: 'center' }},
-                            {{ text: '', fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['शौच_मही_घे']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['शौच_मही_दू']), fontSize: 8, alignment: 'center' }},
-                            {{ text: '', fontSize: 8, alignment: 'center' }},
-                            {{ text: '', fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['मीठ_मही_घे']), fontSize: 8, alignment: 'center' }},
-                            {{ text: displayValue(row['मीठ_मही_दू']), fontSize: 8, alignment: 'center' }},
-                            {{ text: '', fontSize: 8, alignment: 'center' }},
-                            {{ text: '', fontSize: 8, alignment: 'center' }}
-                          ];
-                          tableBody8a.push(rowData);
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: Array(27).fill('*'), body: tableBody8a }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 0.7, paddingRight: () => 0.7, paddingTop: () => 3, paddingBottom: () => 3 }},
-                      margin: [0, 0, 0, 20],
-                      fontSize: 7
-                    }});
-
-                    content.push(...addPageHeading2(s8.title2 || 'गावनिहाय TCL साठा अहवाल', ''));
-
-                    const tableBody8b = [];
-                    tableBody8b.push([
-                      {{ text: 'अ. क्र.', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'उपकेंद्राचे नाव', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण ग्रामपंचायत', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'एकूण गावे', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'टीसीएल साठा', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'टीसीएल साठवण', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'पाणी शुद्धीकरण', bold: true, fontSize: 9, alignment: 'center' }},
-                      {{ text: 'टीसीएल नसलेले गावे', bold: true, fontSize: 9, alignment: 'center' }}
-                    ]);
-
-                    if (s8.table2) {{
-                      s8.table2.forEach(row => {{
-                        if (Object.values(row).some(val => val !== '' && val !== '0')) {{
-                          tableBody8b.push(Object.values(row).map(val => ({{ text: displayValue(val), fontSize: 9, alignment: 'center' }})));
-                        }}
-                      }});
-                    }}
-
-                    content.push({{
-                      table: {{ widths: ['8%', '18%', '12%', '12%', '12%', '12%', '14%', '12%'], body: tableBody8b }},
-                      layout: {{ hLineWidth: () => 0.5, vLineWidth: () => 0.5, paddingLeft: () => 4, paddingRight: () => 4, paddingTop: () => 4, paddingBottom: () => 4 }}
-                    }});
-                  }}
-
-                  return {{
-                    pageSize: 'A4',
-                    pageOrientation: 'landscape',
-                    pageMargins: [15, 15, 15, 15],
-                    content: content,
-                    defaultStyle: {{ font: 'MarathiFont', fontSize: 9 }}
-                  }};
-                }}
-
-                function previewPDF() {{
-                  try {{
-                    showStatus('📄 PDF तयार करत आहे...', '#FFF9C4');
-                    const docDef = createPDFDefinition();
-                    pdfMake.createPdf(docDef).open();
-                    showStatus('✅ PDF तयार झाली!', '#C8E6C9');
-                  }} catch(e) {{
-                    showStatus('❌ त्रुटी: ' + e.message, '#FFCDD2');
-                    console.error('PDF Error:', e);
-                  }}
-                }}
-
-                function downloadPDF() {{
-                  try {{
-                    showStatus('⬇️ PDF डाउनलोड करत आहे...', '#FFF9C4');
-                    const docDef = createPDFDefinition();
-                    const filename = 'Masik_Ahwal_' + metadata.monthYear.replace(/\\s+/g, '_') + '.pdf';
-                    pdfMake.createPdf(docDef).download(filename);
-                    showStatus('✅ PDF डाउनलोड झाली!', '#C8E6C9');
-                  }} catch(e) {{
-                    showStatus('❌ त्रुटी: ' + e.message, '#FFCDD2');
-                    console.error('PDF Error:', e);
-                  }}
-                }}
-              </script>
-            </body>
-            </html>
-            """,
-            height=250
-        )
+        meta = {"month_year": month_year, "phc_name": phc_name, "taluka": taluka, "district": district,
+                "sub_center": sub_center}
+        # Rendered on the server; each sheet's pages are cached in this session, so only edited sheets
+        # are re-rendered
+        if st.button("📄 PDF तयार करा", key="monthly_final_pdf"):
+            with st.spinner("PDF तयार होत आहे..."):
+                pdf = monthly_report_pdf(st.session_state.sheet_data, meta,
+                                         st.session_state.setdefault("monthly_final_parts", {}))
+            st.download_button("⬇️ Download PDF", pdf, file_name=f"Masik_Ahwal_{'_'.join(month_year.split())}.pdf",
+                               mime="application/pdf", on_click="ignore")
 
 
 if __name__ == "__main__":
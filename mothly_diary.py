@@ -3,8 +3,7 @@ def monthly_diary():
     import pandas as pd
     import calendar
     import datetime
-    from pathlib import Path
-    import base64
+    from assets import FONT_PATH, pdf_font, pdfmake_assets_js, pdfmake_script
     import json
     import streamlit.components.v1 as components
 
@@ -63,13 +62,12 @@ def monthly_diary():
     # ---------------------------
     # Font load
     # ---------------------------
-    BASE_DIR = Path(__file__).resolve().parent
-    font_path = BASE_DIR / "fonts" / "NotoSerifDevanagari-VariableFont_wdth,wght.ttf"
+    font_path = FONT_PATH
     if not font_path.exists():
         st.error("font 'NotoSerifDevanagari-...' missing!")
         return
 
-    font_b64 = base64.b64encode(font_path.read_bytes()).decode()
+    font_js = pdfmake_assets_js(fonts={"Marathi.ttf": pdf_font()})
     month_year_str = f"{month_name} {year}"
 
     # ---------------------------
@@ -80,8 +78,7 @@ def monthly_diary():
         <html>
         <head>
           <meta charset="utf-8" />
-          <script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/pdfmake.min.js"></script>
-          <script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/vfs_fonts.js"></script>
+          {pdfmake_script()}
         </head>
 
         <body>
@@ -91,7 +88,7 @@ def monthly_diary():
           <script>
             const data = {json_js};
 
-            pdfMake.vfs["Marathi.ttf"] = "{font_b64}";
+            {font_js}
             pdfMake.fonts = {{
               MarathiFont: {{
                 normal: "Marathi.ttf",
@@ -0,0 +1,98 @@
+# name_search.py
+"""
+Ranked, fuzzy name search over members, family heads and beneficiaries.
+
+Names are compared through a normalized search key: search_key() here
+and the mpw_search_key() SQL function from migration 4 must produce the
+same string. Each searched column has a pg_trgm GIN index on its key, so
+substring (LIKE) and word-similarity lookups stay index-driven across a
+whole district. Every query runs under a statement timeout and a row
+limit.
+
+pg_trgm only indexes characters the database locale treats as letters;
+the database must use UTF-8 with a non-C LC_CTYPE for Devanagari names.
+"""
+import logging
+import re
+import unicodedata
+
+import pandas as pd
+import psycopg
+from psycopg import sql
+from db_config import get_connection
+
+RESULT_LIMIT = 20
+SEARCH_TIMEOUT_MS = 1500
+SIMILARITY_THRESHOLD = 0.3
+
+# target -> (table, name column, scope column, extra columns shown)
+TARGETS = {
+    "members": ("family_members", "member_name", "village_name", ("m_no", "age", "gender")),
+    "family heads": ("m_no_register", "family_head", "village_name", ("m_no", "mobile")),
+    "beneficiaries": ("beneficiaries", "name", "created_by", ("dob", "booth_no")),
+}
+
+_KEY_TABLE = str.maketrans({
+    "\u0901": "\u0902",  # chandrabindu -> anusvara
+    **{chr(0x0966 + d): str(d) for d in range(10)},  # Devanagari digits
+    "\u093c": None,  # nukta
+    "\u200c": None,  # ZWNJ
+    "\u200d": None,  # ZWJ
+})
+_SEPARATORS = re.compile(r"(?:[^\w\u0900-\u097f]|_)+")
+
+log = logging.getLogger(__name__)
+
+
+def search_key(text):
+    """Python twin of the mpw_search_key() SQL function."""
+    key = unicodedata.normalize("NFC", text or "").lower().translate(_KEY_TABLE)
+    return _SEPARATORS.sub(" ", key).strip()
+
+
+def search_names(target, text, scope_value=None, limit=RESULT_LIMIT):
+    """Best matches for ``text`` in one target, best first.
+
+    Substring matches rank above fuzzy (word-similarity) matches. Pass
+    ``scope_value`` to restrict to one village / user, or None for the
+    whole district. Returns an empty frame if the query times out.
+    """
+    table, column, scope, extra = TARGETS[target]
+    key = search_key(text)
+    columns = ["id", column, *extra]
+    if not key:
+        return pd.DataFrame(columns=columns + ["score"])
+
+    name_key = sql.SQL("mpw_search_key({})").format(sql.Identifier(column))
+    where = sql.SQL("({name_key} LIKE %(contains)s OR %(key)s <%% {name_key})").format(name_key=name_key)
+    params = {"key": key, "contains": "%" + key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%",
+              "limit": limit}
+    if scope_value is not None:
+        where = sql.SQL("{} = %(scope)s AND {}").format(sql.Identifier(scope), where)
+        params["scope"] = scope_value
+
+    query = sql.SQL("""
+        SELECT {columns}, round(word_similarity(%(key)s, {name_key})::numeric, 2) AS score
+        FROM {table}
+        WHERE {where}
+        ORDER BY ({name_key} LIKE %(contains)s) DESC, score DESC, {name_key}
+        LIMIT %(limit)s
+    """).format(
+        columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        name_key=name_key,
+        table=sql.Identifier(table),
+        where=where,
+    )
+
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            try:
+                cur.execute(f"SET LOCAL statement_timeout = {int(SEARCH_TIMEOUT_MS)}")
+                cur.execute(f"SET LOCAL pg_trgm.word_similarity_threshold = {float(SIMILARITY_THRESHOLD)}")
+                cur.execute(query, params)
+                rows = cur.fetchall()
+            except psycopg.errors.QueryCanceled:
+                log.warning("Name search for %r in %s timed out", text, target)
+                rows = []
+            conn.rollback()
+    return pd.DataFrame(rows, columns=columns + ["score"])
@@ -0,0 +1,123 @@
+# ncd_dashboard.py
+"""
+BP / Sugar (NCD) dashboard served from the rollup tables (see rollups).
+
+The rollup frame is at most (genders × age bands) rows per village, so
+switching the All / BP / Sugar / Both filter is a column pick on a cached
+frame and does no database work.
+"""
+import pandas as pd
+import streamlit as st
+from db_config import get_connection
+from rollups import MEASURES, district_rollup, ordered_bands, village_rollup
+
+FILTERS = {
+    "All Members": "members",
+    "BP Patients": "bp",
+    "Sugar Patients": "sugar",
+    "Both (BP + Sugar)": "bp_sugar",
+}
+
+
+# ==========================
+# 🔧 Helper Functions
+# ==========================
+def _metrics(frame):
+    totals = {m: int(frame[m].sum()) if not frame.empty else 0 for m in MEASURES}
+    population = totals["members"] or 1
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("👥 एकूण सदस्य", totals["members"])
+    c2.metric("🩸 BP", totals["bp"], f"{totals['bp'] / population:.1%}", delta_color="off")
+    c3.metric("🍬 Sugar", totals["sugar"], f"{totals['sugar'] / population:.1%}", delta_color="off")
+    c4.metric("⚠️ दोन्ही", totals["bp_sugar"], f"{totals['bp_sugar'] / population:.1%}", delta_color="off")
+
+
+def _breakdown(frame, measure):
+    """Age band × gender table and chart for one measure."""
+    if frame.empty:
+        st.info("⛔ माहिती उपलब्ध नाही.")
+        return
+    pivot = ordered_bands(frame).pivot_table(
+        index="age_band", columns="gender", values=measure, aggfunc="sum", fill_value=0, observed=True
+    )
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.markdown("**वयोगट व लिंगनिहाय**")
+        st.bar_chart(pivot)
+    with col2:
+        st.dataframe(pivot.assign(Total=pivot.sum(axis=1)), use_container_width=True)
+        gender = frame.groupby("gender")[measure].sum()
+        st.markdown("**लिंगनिहाय**")
+        st.dataframe(gender.rename("count").to_frame(), use_container_width=True)
+
+
+def _phc_mapping_editor(district):
+    """Let admins assign villages to PHCs."""
+    with get_connection() as conn:
+        mapping = pd.read_sql("SELECT village_name, phc_name FROM village_phc", conn)
+    villages = pd.DataFrame({"village_name": sorted(district["village_name"].unique())})
+    current = villages.merge(mapping, on="village_name", how="left")
+    edited = st.data_editor(current, hide_index=True, disabled=["village_name"], use_container_width=True,
+                            key="phc_mapping")
+    if st.button("💾 PHC mapping जतन करा"):
+        rows = edited.dropna(subset=["phc_name"])
+        rows = rows[rows["phc_name"].str.strip() != ""]
+        with get_connection() as conn:
+            cur = conn.cursor()
+            cur.executemany("""
+                INSERT INTO village_phc (village_name, phc_name) VALUES (%s, %s)
+                ON CONFLICT (village_name) DO UPDATE SET phc_name = EXCLUDED.phc_name
+            """, list(rows[["village_name", "phc_name"]].itertuples(index=False, name=None)))
+            conn.commit()
+        district_rollup.clear()
+        st.success("✅ PHC mapping जतन झाले.")
+
+
+# ==========================
+# 📈 Dashboard Page
+# ==========================
+def ncd_dashboard_page(user):
+    st.title("📈 NCD Dashboard – BP / Sugar")
+
+    is_admin = user["role"].lower() == "admin"
+    scope = "गाव"
+    if is_admin:
+        scope = st.radio("Scope", ["गाव", "PHC", "जिल्हा"], horizontal=True)
+
+    if scope == "गाव":
+        village = user["village"]
+        if is_admin:
+            village = st.selectbox("गाव", sorted(district_rollup()["village_name"].unique()) or [village])
+        frame = village_rollup(village)
+        title = village
+    else:
+        district = district_rollup()
+        if district.empty:
+            st.info("⛔ माहिती उपलब्ध नाही.")
+            return
+        if scope == "PHC":
+            phc = st.selectbox("PHC", sorted(district["phc_name"].unique()))
+            district = district[district["phc_name"] == phc]
+            title = phc
+        else:
+            title = "जिल्हा"
+        frame = district.groupby(["gender", "age_band"], as_index=False)[MEASURES].sum()
+
+    st.subheader(f"📍 {title}")
+    _metrics(frame)
+
+    measure = FILTERS[st.radio("Select Report Type", list(FILTERS), horizontal=True)]
+    _breakdown(frame, measure)
+
+    if is_admin and scope != "गाव":
+        district = district_rollup()
+        by_village = district.groupby(["phc_name", "village_name"])[MEASURES].sum()
+        by_village["bp %"] = (by_village["bp"] / by_village["members"] * 100).round(1)
+        by_village["sugar %"] = (by_village["sugar"] / by_village["members"] * 100).round(1)
+        st.markdown("**गावनिहाय सारांश**")
+        if scope == "PHC":
+            by_village = by_village.loc[[phc]]
+        st.dataframe(by_village, use_container_width=True)
+
+        with st.expander("🏥 Village → PHC mapping"):
+            _phc_mapping_editor(district)
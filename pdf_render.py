@@ -0,0 +1,346 @@
+# pdf_render.py
+"""
+Server-side PDF rendering (reportlab) for the blank register / survey forms.
+
+The pdfMake pages build these forms in the browser, cell by cell, which
+is slow on the MPWs' phones. Here a document is a list of page dicts
+drawn straight onto a reportlab canvas and returned as bytes, ready for
+st.download_button:
+
+    pages = [cover_page("नोंदवही"), table_page("शीर्षक", [30, 200], simple_header(["अ.क्र.", "नाव"]))]
+    pdf = render_pdf(pages)
+
+Blank forms repeat the same page many times (sets × pages_per_set), so
+render_pdf() lays out each distinct page dict once as a form XObject and
+every repeat is a reference to it; only the page number is drawn per
+page. Repeat a page by repeating the same dict (``pages * sets``).
+
+Text is drawn with the instanced + subset Devanagari font (assets.pdf_font)
+and shaped with HarfBuzz (uharfbuzz) so conjuncts and matras come out
+right; without uharfbuzz reportlab falls back to unshaped text.
+"""
+import io
+import threading
+from collections import Counter
+
+from assets import pdf_font
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+FONT_NAME = "Marathi"
+PAGE_SIZE = A4
+MARGINS = (50, 30, 30, 30)  # left, top, right, bottom – same as the pdfMake pages
+CELL_PADDING = 4  # pdfMake's default horizontal cell padding
+LINE_HEIGHT = 1.25
+MAX_ROW_HEIGHT = 40
+# Bump when a change here alters the rendered output (keys artifact_store entries)
+RENDER_VERSION = 1
+
+_font_lock = threading.Lock()
+
+
+def register_font():
+    """Register the PDF font with reportlab once per process; returns its name."""
+    with _font_lock:
+        if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont(FONT_NAME, str(pdf_font().path), shapable=True))
+    return FONT_NAME
+
+
+def engine_version():
+    """Version of the rendered output: RENDER_VERSION plus the font build."""
+    return f"{RENDER_VERSION}-{pdf_font().sha256[:16]}"
+
+
+# ==========================
+# 🧱 Page specs
+# ==========================
+def header_cell(text, col, row=0, colspan=1, rowspan=1):
+    return {"text": text, "col": col, "row": row, "colspan": colspan, "rowspan": rowspan}
+
+
+def simple_header(cols):
+    """One header row, one cell per column."""
+    return [[header_cell(c, i) for i, c in enumerate(cols)]]
+
+
+def grouped_header(lead, groups, subs, tail=()):
+    """Two header rows: ``lead`` / ``tail`` columns span both rows, each of
+    ``groups`` spans len(subs) columns with ``subs`` underneath.
+
+        grouped_header(["अ.क्र.", "गाव"], ["एप्रिल", "मे"], ["नमुना", "निष्कर्ष"], ["शेरा"])
+    """
+    top, bottom = [], []
+    col = 0
+    for text in lead:
+        top.append(header_cell(text, col, rowspan=2))
+        col += 1
+    for group in groups:
+        top.append(header_cell(group, col, colspan=len(subs)))
+        for sub in subs:
+            bottom.append(header_cell(sub, col, row=1))
+            col += 1
+    for text in tail:
+        top.append(header_cell(text, col, rowspan=2))
+        col += 1
+    return [top, bottom]
+
+
+def cover_page(text, font_size=50, top=220, page_size=PAGE_SIZE, margins=MARGINS):
+    """Full-page title, e.g. the cover of each register."""
+    return {"kind": "cover", "text": text, "font_size": font_size, "top": top,
+            "page_size": page_size, "margins": margins}
+
+
+def table_page(title, widths, header, rows=26, body=None, title_size=16, font_size=12,
+               header_size=None, align=None, line_width=0.7, row_height=None, header_fill=None,
+               reserve=20, page_size=PAGE_SIZE, margins=MARGINS):
+    """A titled table filling the page.
+
+    ``widths`` are pdfMake-style content widths (padding is added, "*" takes
+    the remaining width); ``body`` is a list of row lists, padded with blank
+    rows up to ``rows``. Blank rows share the height left under the header
+    (less ``reserve`` points) unless ``row_height`` is given.
+    """
+    return {"kind": "table", "title": title, "widths": widths, "header": header, "rows": rows,
+            "body": body or [], "title_size": title_size, "font_size": font_size,
+            "header_size": header_size or font_size, "align": align, "line_width": line_width,
+            "row_height": row_height, "header_fill": header_fill, "reserve": reserve,
+            "page_size": page_size, "margins": margins}
+
+
+def table_pages(title, widths, header, body, rows_per_page, **options):
+    """``body`` rows split into table_page()s of ``rows_per_page`` rows each.
+
+    For data reports: the last page is not padded with blank rows, and
+    every page repeats ``title`` and ``header``. Pass ``row_height`` so
+    all pages share one row pitch.
+    """
+    chunks = [body[i:i + rows_per_page] for i in range(0, len(body), rows_per_page)] or [[]]
+    return [table_page(title, widths, header, rows=max(len(chunk), 1), body=chunk, **options) for chunk in chunks]
+
+
+def custom_page(draw, page_size=PAGE_SIZE, margins=MARGINS, **fields):
+    """A page drawn by ``draw(canvas, page)``, for forms that are not one table."""
+    return {"kind": "custom", "draw": draw, "page_size": page_size, "margins": margins, **fields}
+
+
+# ==========================
+# 🖨️ Drawing
+# ==========================
+def _column_widths(widths, available):
+    fixed = sum(w + 2 * CELL_PADDING for w in widths if w != "*")
+    stars = sum(1 for w in widths if w == "*")
+    star = max(available - fixed, 0) / stars if stars else 0
+    cols = [star if w == "*" else w + 2 * CELL_PADDING for w in widths]
+    scale = min(1.0, available / sum(cols))  # too-wide layouts are shrunk to the page
+    return [w * scale for w in cols]
+
+
+def _lines(text, size, width):
+    lines = []
+    for part in str(text).split("\n"):
+        lines.extend(simpleSplit(part, FONT_NAME, size, max(width - 2 * CELL_PADDING, size)) or [""])
+    return lines
+
+
+def _draw_lines(c, lines, size, x, y, width, height, align="center"):
+    """Draw ``lines`` vertically centred in the box whose top-left is (x, y)."""
+    leading = size * LINE_HEIGHT
+    baseline = y - (height - leading * len(lines)) / 2 - size
+    c.setFont(FONT_NAME, size)
+    for line in lines:
+        if align == "left":
+            c.drawString(x + CELL_PADDING, baseline, line, shaping=True)
+        elif align == "right":
+            c.drawRightString(x + width - CELL_PADDING, baseline, line, shaping=True)
+        else:
+            c.drawCentredString(x + width / 2, baseline, line, shaping=True)
+        baseline -= leading
+
+
+def draw_text(c, text, size, x, y, width, height=None, align="left"):
+    """Wrap ``text`` to ``width`` and draw it in the box whose top-left is (x, y).
+
+    Returns the height used, so callers can stack blocks downwards.
+    """
+    lines = _lines(text, size, width)
+    height = height or len(lines) * size * LINE_HEIGHT
+    _draw_lines(c, lines, size, x, y, width, height, align)
+    return height
+
+
+def text_height(text, size, width):
+    """Height draw_text() would use for ``text`` wrapped to ``width``."""
+    return len(_lines(text, size, width)) * size * LINE_HEIGHT
+
+
+def _fit_size(text, size, width):
+    """Shrink ``size`` so the longest word of ``text`` fits a cell of ``width``."""
+    longest = max((pdfmetrics.stringWidth(w, FONT_NAME, size) for w in str(text).split()), default=0)
+    room = width - 2 * CELL_PADDING
+    return size if longest <= room else max(size * room / longest, size / 2)
+
+
+def _header_heights(header, xs, size):
+    """Height of each header row, grown so spanning cells fit their text.
+
+    Also returns {id(cell): (font size, lines)}; words too wide for their
+    cell are set smaller rather than overflowing.
+    """
+    heights = [0.0] * len(header)
+    lines = {}
+    for cells in header:
+        for cell in cells:
+            width = xs[cell["col"] + cell["colspan"]] - xs[cell["col"]]
+            cell_size = _fit_size(cell["text"], size, width)
+            lines[id(cell)] = cell_size, _lines(cell["text"], cell_size, width)
+            need = len(lines[id(cell)][1]) * cell_size * LINE_HEIGHT + 2 * CELL_PADDING
+            if cell["rowspan"] == 1:
+                heights[cell["row"]] = max(heights[cell["row"]], need)
+    for cells in header:
+        for cell in cells:
+            if cell["rowspan"] > 1:
+                span = range(cell["row"], cell["row"] + cell["rowspan"])
+                cell_size, cell_lines = lines[id(cell)]
+                need = len(cell_lines) * cell_size * LINE_HEIGHT + 2 * CELL_PADDING
+                short = need - sum(heights[r] for r in span)
+                if short > 0:
+                    heights[span[-1]] += short
+    return heights, lines
+
+
+def draw_cover(c, page):
+    width, height = page["page_size"]
+    left, top, right, bottom = page["margins"]
+    size = page["font_size"]
+    lines = _lines(page["text"], size, width - left - right)
+    _draw_lines(c, lines, size, left, height - top - page["top"], width - left - right,
+                len(lines) * size * LINE_HEIGHT)
+
+
+def _column_edges(page):
+    width, height = page["page_size"]
+    left, top, right, bottom = page["margins"]
+    cols = _column_widths(page["widths"], width - left - right)
+    xs = [left]
+    for w in cols:
+        xs.append(xs[-1] + w)
+    return cols, xs
+
+
+def table_height(page):
+    """Height of a table_page() spec with ``rows=0`` (title plus header rows), for laying out flowing pages."""
+    cols, xs = _column_edges(page)
+    height = 0
+    if page["title"]:
+        height += text_height(page["title"], page["title_size"], xs[-1] - xs[0]) + 10
+    return height + sum(_header_heights(page["header"], xs, page["header_size"])[0])
+
+
+def draw_table(c, page, top=None):
+    """Draw a table_page() spec from ``top`` (default: the top margin); returns its bottom y.
+
+    With ``rows=0`` only the title and header rows are drawn; header
+    cells may then hold data too, with row/column spans.
+    """
+    width, height = page["page_size"]
+    left, top_margin, right, bottom = page["margins"]
+    cols, xs = _column_edges(page)
+
+    y = height - top_margin if top is None else top
+    if page["title"]:
+        title_lines = _lines(page["title"], page["title_size"], xs[-1] - left)
+        title_height = len(title_lines) * page["title_size"] * LINE_HEIGHT + 10
+        _draw_lines(c, title_lines, page["title_size"], left, y, xs[-1] - left, title_height)
+        y -= title_height
+
+    c.setLineWidth(page["line_width"])
+    heights, header_lines = _header_heights(page["header"], xs, page["header_size"])
+    row_tops = [y]
+    for h in heights:
+        row_tops.append(row_tops[-1] - h)
+    if page["header_fill"]:
+        c.setFillColor(HexColor(page["header_fill"]))
+        c.rect(xs[0], row_tops[-1], xs[-1] - xs[0], y - row_tops[-1], stroke=0, fill=1)
+        c.setFillColor(HexColor("#000000"))
+    for cells in page["header"]:
+        for cell in cells:
+            x0, x1 = xs[cell["col"]], xs[cell["col"] + cell["colspan"]]
+            y0, y1 = row_tops[cell["row"]], row_tops[cell["row"] + cell["rowspan"]]
+            c.rect(x0, y1, x1 - x0, y0 - y1)
+            cell_size, cell_lines = header_lines[id(cell)]
+            _draw_lines(c, cell_lines, cell_size, x0, y0, x1 - x0, y0 - y1)
+    y = row_tops[-1]
+
+    rows = max(page["rows"], len(page["body"]))
+    if not rows:
+        return y
+    row_height = page["row_height"] or min((y - bottom - page["reserve"]) / rows, MAX_ROW_HEIGHT)
+    c.rect(xs[0], y - rows * row_height, xs[-1] - xs[0], rows * row_height)
+    for r in range(1, rows):
+        c.line(xs[0], y - r * row_height, xs[-1], y - r * row_height)
+    for x in xs[1:-1]:
+        c.line(x, y, x, y - rows * row_height)
+
+    align = page["align"] or ["center"] * len(cols)
+    for r, values in enumerate(page["body"]):
+        row_top = y - r * row_height
+        for i, value in enumerate(values):
+            lines = _lines(value, page["font_size"], cols[i])
+            _draw_lines(c, lines, page["font_size"], xs[i], row_top, cols[i], row_height, align[i])
+    return y - rows * row_height
+
+
+def draw_page_number(c, page, number):
+    c.setFont(FONT_NAME, 10)
+    c.drawCentredString(page["page_size"][0] / 2, page["margins"][3] / 2, str(number))
+
+
+DRAW = {
+    "cover": draw_cover,
+    "table": draw_table,
+    "custom": lambda c, page: page["draw"](c, page),
+}
+
+
+def render_pdf(pages, number_from=2, title=None, progress=None, first_number=1):
+    """Render page dicts to PDF bytes; pages from ``number_from`` on get a page number.
+
+    A page dict that occurs more than once is drawn once into a form
+    XObject and placed by reference, so 100 copies of a blank form cost
+    about as much as one in time and file size. ``progress(fraction)`` is
+    called after every page (see report_jobs). ``first_number`` is the
+    number of the first page, for parts of a larger document.
+    """
+    register_font()
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=PAGE_SIZE, pageCompression=1)
+    if title:
+        c.setTitle(title)
+
+    repeats = Counter(id(page) for page in pages)
+    forms = {}
+    for number, page in enumerate(pages, start=first_number):
+        c.setPageSize(page["page_size"])
+        if repeats[id(page)] > 1:
+            name = forms.get(id(page))
+            if name is None:
+                name = forms[id(page)] = f"page{len(forms)}"
+                c.beginForm(name, 0, 0, *page["page_size"])
+                DRAW[page["kind"]](c, page)
+                c.endForm()
+            c.doForm(name)
+        else:
+            DRAW[page["kind"]](c, page)
+        if number_from and number >= number_from:
+            draw_page_number(c, page, number)
+        c.showPage()
+        if progress:
+            progress((number - first_number + 1) / len(pages))
+    c.save()
+    return buffer.getvalue()
@@ -3,10 +3,74 @@ import time
 import streamlit as st
 import pandas as pd
 from datetime import date
-import io, json, base64
+import json
 import streamlit.components.v1 as components
+from assets import pdf_font, pdfmake_assets_js, pdfmake_script
 from db_config import get_connection
-from pathlib import Path
+from exports import XLSX_MIME, export_xlsx
+from name_search import search_names
+from pdf_render import custom_page, draw_table, draw_text, render_pdf, simple_header, table_page
+from record_picker import BENEFICIARIES, fetch_record, record_picker
+from report_jobs import job_kind, queue_button
+from village_cache import beneficiary_frame, bump_village
+from village_events import publish
+
+# ---------------- Booth lists (server-side, every booth) ----------------
+BOOTH_MARGINS = (40, 40, 30, 40)
+BOOTH_WIDTHS = [18, "*", 70, 18, 70, 70]
+BOOTH_ROWS = 28
+
+
+def _draw_booth_page(c, page):
+    """Campaign header, then this page's slice of the booth's list."""
+    width, height = page["page_size"]
+    left, top, right, bottom = page["margins"]
+    inner = width - left - right
+    form = page["form"]
+    y = height - top
+    y -= draw_text(c, f"पल्स पोलिओ लसीकरण मोहीम {form['ldate'].split('-')[-1]}", 16, left, y, inner,
+                   align="center")
+    y -= draw_text(c, f"प्राथमिक आरोग्य केंद्र {form['phc_name']}", 16, left, y, inner, align="center") + 5
+    draw_text(c, f"उपकेंद्र: {form['shc_name']}", 11.5, left, y, inner / 2, align="center")
+    y -= draw_text(c, f"बुथ क्रमांक: {page['booth_no']}", 11.5, left + inner / 2, y, inner / 2, align="center") + 5
+    y -= draw_text(c, "० ते ५ वर्षे वयोगटातील अपेक्षित लाभार्थी यादी", 14, left, y, inner, align="center")
+    draw_table(c, page["table"], top=y - 5)
+
+
+def booth_pages(df, form):
+    """Pages for every booth of ``df`` (name, dob, gender, booth_no), each booth starting a new page."""
+    header = simple_header(["अ.क्र.", "लाभार्थीचे नाव", "जन्मदिनांक", "लिंग", form["ldate"], "शेरा"])
+    pages = []
+    for booth_no, booth in df.sort_values(["booth_no", "name"]).groupby("booth_no", sort=False):
+        rows = [[str(i), name, dob, gender, "", ""]
+                for i, (name, dob, gender) in enumerate(zip(booth["name"], booth["dob"], booth["gender"]), start=1)]
+        for start in range(0, len(rows), BOOTH_ROWS):
+            chunk = rows[start:start + BOOTH_ROWS]
+            table = table_page("", BOOTH_WIDTHS, header, rows=len(chunk), body=chunk, font_size=10,
+                               row_height=22, align=["center", "left", "center", "center", "center", "center"],
+                               margins=BOOTH_MARGINS)
+            pages.append(custom_page(_draw_booth_page, margins=BOOTH_MARGINS, form=form,
+                                     booth_no=booth_no, table=table))
+    return pages
+
+
+def render_booth_lists(village, created_by, form, progress=None):
+    """Polio beneficiary lists for every booth of ``created_by`` as one PDF."""
+    df = beneficiary_frame(village, created_by)
+    if df.empty:
+        raise ValueError("No beneficiaries found")
+    df = df[["name", "dob", "gender", "booth_no"]].copy()
+    df["dob"] = pd.to_datetime(df["dob"]).dt.strftime("%d-%m-%Y")
+    df = df.fillna("")
+    return render_pdf(booth_pages(df, form), number_from=1, title="पल्स पोलिओ लाभार्थी यादी", progress=progress)
+
+
+@job_kind("polio_imunization_list.booth_lists")
+def booth_lists_job(params, progress):
+    pdf = render_booth_lists(params["village"], params["created_by"], params["form"], progress)
+    return pdf, "beneficiaries_all_booths.pdf", "application/pdf"
+
+
 # ---------------- Beneficiaries Tab ----------------
 def beneficiaries_tab(user):
     st.header("✅ Beneficiaries / Immunization List")
@@ -29,15 +93,16 @@ def beneficiaries_tab(user):
                 st.error("Name is required")
             else:
                 try:
-                    conn = get_connection()
-                    cur = conn.cursor()
-                    cur.execute(
-                        "INSERT INTO beneficiaries (name,dob,gender,booth_no,created_by) VALUES (%s,%s,%s,%s,%s)",
-                        (name.strip(), dob, gender, booth_no.strip(), created_by)
-                    )
-                    conn.commit()
-                    cur.close()
-                    conn.close()
+                    with get_connection() as conn:
+                        cur = conn.cursor()
+                        cur.execute(
+                            "INSERT INTO beneficiaries (name,dob,gender,booth_no,created_by) VALUES (%s,%s,%s,%s,%s)",
+                            (name.strip(), dob, gender, booth_no.strip(), created_by)
+                        )
+                        publish(cur, "beneficiaries", user["village"])
+                        conn.commit()
+                        cur.close()
+                    bump_village(user["village"])
                     st.success(f"{name} added successfully!")
                 except Exception as e:
                     st.error(f"Insert failed: {e}")
@@ -46,12 +111,7 @@ def beneficiaries_tab(user):
     elif menu == "View / Edit":
         st.subheader("View / Edit Beneficiaries")
         try:
-            conn = get_connection()
-            df = pd.read_sql(
-                "SELECT id,name,dob,gender,booth_no FROM beneficiaries WHERE created_by=%s ORDER BY id",
-                conn, params=(created_by,)
-            )
-            conn.close()
+            df = beneficiary_frame(user["village"], created_by)
         except Exception as e:
             st.error(f"Failed to load data: {e}")
             df = pd.DataFrame()
@@ -59,61 +119,69 @@ def beneficiaries_tab(user):
         if df.empty:
             st.info("No beneficiaries found")
         else:
-            df["dob"] = pd.to_datetime(df["dob"]).dt.date
             st.dataframe(df, use_container_width=True)
 
+            # Ranked fuzzy search (spelling variants) – a match can be picked for edit/delete
+            sel_id = None
+            name_query = st.text_input("🔍 नावाने शोधा (लाभार्थी)", key="beneficiary_name_search")
+            if name_query.strip():
+                matches = search_names("beneficiaries", name_query, created_by)
+                st.markdown(f"**Beneficiaries** – {len(matches)} matches")
+                if not matches.empty:
+                    st.dataframe(matches, use_container_width=True, hide_index=True)
+                    labels = {f"{r.id} — {r.name}": int(r.id) for r in matches.itertuples()}
+                    sel_id = labels.get(st.selectbox("Select match to edit/delete", [""] + list(labels)))
+
             # Edit / Delete selection
-            df["label"] = df["id"].astype(str) + " — " + df["name"]
-            selection = st.selectbox("Select beneficiary to edit/delete", df["label"].tolist())
-            sel_id = int(selection.split(" — ")[0])
-            row = df[df["id"]==sel_id].iloc[0]
-
-            with st.form("edit_form"):
-                edit_name = st.text_input("Name", value=row["name"])
-                edit_dob = st.date_input("Date of Birth", value=row["dob"])
-                edit_gender = st.selectbox("Gender", ["M","F","O"], index=["M","F","O"].index(row["gender"]))
-                edit_booth = st.text_input("Booth No", value=row["booth_no"])
-                save = st.form_submit_button("Save Changes")
-
-            if st.button("Delete Beneficiary"):
-                try:
-                    conn = get_connection()
-                    cur = conn.cursor()
-                    cur.execute("DELETE FROM beneficiaries WHERE id=%s", (sel_id,))
-                    conn.commit()
-                    cur.close()
-                    conn.close()
-                    st.success("Deleted successfully")
-                    st.experimental_rerun()
-                except Exception as e:
-                    st.error(f"Delete failed: {e}")
+            if sel_id is None:
+                sel_id = record_picker("Select beneficiary to edit/delete", BENEFICIARIES, created_by,
+                                       key="edit_beneficiary", village=user["village"])
+            if sel_id is not None:
+                row = fetch_record("beneficiaries", sel_id, user["village"])
 
-            if save:
-                try:
-                    conn = get_connection()
-                    cur = conn.cursor()
-                    cur.execute(
-                        "UPDATE beneficiaries SET name=%s,dob=%s,gender=%s,booth_no=%s WHERE id=%s",
-                        (edit_name, edit_dob, edit_gender, edit_booth, sel_id)
-                    )
-                    conn.commit()
-                    cur.close()
-                    conn.close()
-                    st.success("Updated successfully")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Update failed: {e}")
+                with st.form("edit_form"):
+                    edit_name = st.text_input("Name", value=row["name"])
+                    edit_dob = st.date_input("Date of Birth", value=row["dob"])
+                    edit_gender = st.selectbox("Gender", ["M","F","O"], index=["M","F","O"].index(row["gender"]))
+                    edit_booth = st.text_input("Booth No", value=row["booth_no"])
+                    save = st.form_submit_button("Save Changes")
+
+                if st.button("Delete Beneficiary"):
+                    try:
+                        with get_connection() as conn:
+                            cur = conn.cursor()
+                            cur.execute("DELETE FROM beneficiaries WHERE id=%s", (sel_id,))
+                            publish(cur, "beneficiaries", user["village"])
+                            conn.commit()
+                            cur.close()
+                        bump_village(user["village"])
+                        st.success("Deleted successfully")
+                        st.experimental_rerun()
+                    except Exception as e:
+                        st.error(f"Delete failed: {e}")
+
+                if save:
+                    try:
+                        with get_connection() as conn:
+                            cur = conn.cursor()
+                            cur.execute(
+                                "UPDATE beneficiaries SET name=%s,dob=%s,gender=%s,booth_no=%s WHERE id=%s",
+                                (edit_name, edit_dob, edit_gender, edit_booth, sel_id)
+                            )
+                            publish(cur, "beneficiaries", user["village"])
+                            conn.commit()
+                            cur.close()
+                        bump_village(user["village"])
+                        st.success("Updated successfully")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Update failed: {e}")
 
     # ---------------- Export / Download ----------------
     elif menu == "Export / Download":
         st.subheader("Export Beneficiaries")
         try:
-            conn = get_connection()
-            df = pd.read_sql(
-                "SELECT id,name,dob,gender,booth_no FROM beneficiaries WHERE created_by=%s ORDER BY id",
-                conn, params=(created_by,)
-            )
-            conn.close()
+            df = beneficiary_frame(user["village"], created_by)
         except Exception as e:
             st.error(f"Failed to load data: {e}")
             df = pd.DataFrame()
@@ -121,20 +189,20 @@ def beneficiaries_tab(user):
         if df.empty:
             st.info("No data to export")
         else:
-            df["dob"] = pd.to_datetime(df["dob"]).dt.date
             st.dataframe(df, use_container_width=True)
 
-            # Excel download
-            towrite = io.BytesIO()
-            with pd.ExcelWriter(towrite, engine="openpyxl") as writer:
-                df.to_excel(writer, index=False, sheet_name="beneficiaries")
-            towrite.seek(0)
-            st.download_button(
-                "⬇️ Download Excel",
-                data=towrite,
-                file_name="beneficiaries.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            # Excel download, built only on request from a server-side cursor
+            if st.button("📥 Prepare Excel"):
+                st.download_button(
+                    "⬇️ Download Excel",
+                    data=export_xlsx(
+                        "SELECT id,name,dob,gender,booth_no FROM beneficiaries WHERE created_by=%s ORDER BY id",
+                        (created_by,), sheet_name="beneficiaries"
+                    ),
+                    file_name="beneficiaries.xlsx",
+                    mime=XLSX_MIME,
+                    on_click="ignore"
+                )
 
     # ---------------- Generate PDF ----------------
     elif menu == "Generate PDF":
@@ -150,14 +218,16 @@ def beneficiaries_tab(user):
 
         ldate_str = ldate.strftime("%d-%m-%Y")
 
+        # Every booth at once is rendered in the background ("My reports")
+        queue_button("polio_imunization_list.booth_lists",
+                     {"village": village, "created_by": user["username"],
+                      "form": {"ldate": ldate_str, "phc_name": phc_name, "shc_name": shc_name}},
+                     f"पल्स पोलिओ यादी – सर्व बुथ ({ldate_str})", label="🕒 सर्व बुथची PDF पार्श्वभूमीत तयार करा")
+
         # Fetch beneficiaries for this user and booth
         try:
-            conn = get_connection()
-            df = pd.read_sql(
-                "SELECT name,dob,gender FROM beneficiaries WHERE created_by=%s AND booth_no=%s ORDER BY name",
-                conn, params=(user['username'], booth_no)
-            )
-            conn.close()
+            df = beneficiary_frame(village, user['username'])
+            df = df.loc[df["booth_no"] == booth_no, ["name", "dob", "gender"]].sort_values("name")
         except Exception as e:
             st.error(f"Failed to load data: {e}")
             df = pd.DataFrame()
@@ -167,12 +237,9 @@ def beneficiaries_tab(user):
         else:
             df["dob"] = pd.to_datetime(df["dob"]).dt.strftime("%d-%m-%Y")
             data_json = df.to_dict(orient="records")
-            BASE_DIR = Path(__file__).resolve().parent
-            font_path = BASE_DIR / "fonts" / "NotoSerifDevanagari-VariableFont_wdth,wght.ttf"
-            with open(font_path, "rb") as f:
-                font_b64 = base64.b64encode(f.read()).decode("utf-8")
+            font_js = pdfmake_assets_js(fonts={"CustomFont.ttf": pdf_font()})
 
-            if st.button("Generate PDF") and font_b64:
+            if st.button("Generate PDF") and font_js:
                 with st.spinner("PDF तयार होत आहे..."):
                     time.sleep(1)
 
@@ -180,8 +247,7 @@ def beneficiaries_tab(user):
                 components.html(f"""
                 <html>
                 <head>
-                  <script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/pdfmake.min.js"></script>
-                  <script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/vfs_fonts.js"></script>
+                  {pdfmake_script()}
                 </head>
                 <body>
                   <button onclick="previewPDF()">👁️ Preview PDF</button>
@@ -197,7 +263,7 @@ def beneficiaries_tab(user):
                         'village':'{village}'
                     }};
 
-                    pdfMake.vfs["CustomFont.ttf"] = "{font_b64}";
+                    {font_js}
                     pdfMake.fonts = {{
                         MarathiFont: {{
                             normal: "CustomFont.ttf",
@@ -1,7 +1,91 @@
 import streamlit as st
-import streamlit.components.v1 as components
-import base64
-from pathlib import Path
+from artifact_store import cached_artifact
+from pdf_render import (LINE_HEIGHT, custom_page, draw_table, draw_text, engine_version, header_cell, render_pdf,
+                        table_page)
+from reportlab.lib.pagesizes import A4, landscape
+
+PAGE_SIZE = landscape(A4)
+MARGINS = (5, 34, 5, 0)  # Left, Top (binding margin), Right, Bottom
+INSET = 5  # between the page border and the content
+
+HEADER = [
+    [
+        header_cell("Village", 0, rowspan=3),
+        header_cell("House\nNo.", 1, rowspan=3),
+        header_cell("Name of the Head\nof Family", 2, rowspan=3),
+        header_cell("Name of the\nPatient", 3, rowspan=3),
+        header_cell("Age", 4, rowspan=3),
+        header_cell("Sex", 5, rowspan=3),
+        header_cell("Sr.No.\nof\nBlood Smear", 6, rowspan=3),
+        header_cell("Treatment\nNo. of Tablets\nGiven\n(4-Amino\nQuinoline)", 7, rowspan=3),
+        header_cell("Date of\nCollection", 8, rowspan=3),
+        header_cell("Result (9)", 9, colspan=5),
+        header_cell("Mixed\nIndicate\nStage", 14, rowspan=3),
+        header_cell("If +\nProgressive\n+ve\nCase No.", 15, rowspan=3),
+    ],
+    [
+        header_cell("F", 9, row=1, colspan=3),
+        header_cell("V", 12, row=1, rowspan=2),
+        header_cell("M", 13, row=1, rowspan=2),
+    ],
+    [
+        header_cell("R", 9, row=2),
+        header_cell("G", 10, row=2),
+        header_cell("RG", 11, row=2),
+    ],
+    # Column numbers
+    [header_cell(text, col, row=3) for col, text in
+     enumerate(["1", "2", "3", "4", "(5a)", "(5b)", "6", "7", "8", "", "", "", "", "", "10", "11"])],
+]
+
+SMEAR_TABLE = table_page("", [50, 30, 135, 135, 20, 20, 35, 55, 50, 15, 15, 18, 15, 15, 30, 35], HEADER,
+                         rows=14, font_size=7, header_size=10, row_height=24, header_fill="#E8E8E8",
+                         line_width=0.5, page_size=PAGE_SIZE,
+                         margins=(MARGINS[0] + 2 * INSET, MARGINS[1], MARGINS[2] + 2 * INSET, MARGINS[3]))
+
+
+def _draw_smear_page(c, page):
+    width, height = page["page_size"]
+    left, top, right, bottom = page["margins"]
+    x = left + INSET
+    inner = width - left - right - 2 * INSET
+
+    y = height - top - INSET
+    y -= draw_text(c, "For Reporting of Blood Smears by MPW / HA / Passive Agency", 18, x, y, inner,
+                   align="center") + 5
+    draw_text(c, "Name of Section: ____________________________________________________", 11, x, y, 400)
+    draw_text(c, "Population: ___________________", 11, x + 400, y, 200)
+    draw_text(c, "Name of P.H.C.: ____________________", 11, x + 600, y, 200)
+    y -= 17
+    draw_text(c, "Headquarter: _____________________________", 11, x, y, inner / 2)
+    draw_text(c, "Code No.: ___________________________", 11, x + inner / 2, y, inner / 2)
+    y = draw_table(c, SMEAR_TABLE, top=y - 19) - 8
+
+    footer = [("____________________", "Signature Microscopist", "left"),
+              ("____________________", "Date of Examination", "center"),
+              ("______________________________", "Signature of MPW / HA / HS / Others", "right")]
+    for i, (line, label, align) in enumerate(footer):
+        column = x + i * inner / 3
+        used = draw_text(c, line, 11, column, y - 15, inner / 3, align=align)
+        draw_text(c, label, 11, column, y - 15 - used, inner / 3, align=align)
+    y -= 15 + 2 * 11 * LINE_HEIGHT + INSET
+
+    # Page border around everything
+    c.setLineWidth(1)
+    c.rect(left, y, width - left - right, height - top - y)
+
+
+SMEAR_PAGE = custom_page(_draw_smear_page, page_size=PAGE_SIZE, margins=MARGINS)
+
+
+def render_smear_report(num_pages):
+    """``num_pages`` identical blood smear report pages as PDF bytes."""
+    return render_pdf([SMEAR_PAGE] * num_pages, number_from=None, title="Blood Smear Report - MPW Format")
+
+
+def smear_report_pdf(num_pages):
+    return cached_artifact("rakt_namune.smear_report", engine_version(), {"pages": num_pages},
+                           lambda: render_smear_report(num_pages))
 
 
 def rakt_namne_pdf():
@@ -10,290 +94,12 @@ def rakt_namne_pdf():
     # 1. Page Count Input
     num_pages = st.number_input("Number of Pages:", min_value=1, max_value=100, value=1)
 
-    # 2. Font Loading (Required for Marathi/English rendering)
-    BASE_DIR = Path(__file__).resolve().parent
-    font_path = BASE_DIR / "fonts" / "NotoSerifDevanagari-VariableFont_wdth,wght.ttf"
-    font_b64 = base64.b64encode(font_path.read_bytes()).decode()
-    use_custom_font = True
-
-    # 3. HTML/JS with PDF logic
-    font_config = ""
-    if use_custom_font:
-        font_config = f"""
-        pdfMake.vfs["Marathi.ttf"] = "{font_b64}";
-        pdfMake.fonts = {{
-            MarathiFont: {{
-                normal: "Marathi.ttf",
-                bold: "Marathi.ttf"
-            }}
-        }};
-        """
-        default_font = "MarathiFont"
-    else:
-        default_font = "Roboto"
-
-    html_template = f"""
-    <html>
-    <head>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/pdfmake.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/vfs_fonts.js"></script>
-        <style>
-            body {{ font-family: sans-serif; display: flex; gap: 10px; padding: 10px; }}
-            .btn {{
-                padding: 10px 18px; border: none; border-radius: 6px; 
-                cursor: pointer; font-weight: bold; color: white; font-size: 13px;
-            }}
-            .btn-generate {{ background-color: #673AB7; }}
-            .btn-download {{ background-color: #2196F3; }}
-        </style>
-    </head>
-    <body>
-        <button class="btn btn-generate" onclick="generatePDF('preview')">Preview PDF</button>
-        <button class="btn btn-download" onclick="generatePDF('download')">Download PDF</button>
-
-        <script>
-        {font_config}
-
-        function getReportSection() {{
-            return [
-                // Page Border - Wrapping all content
-                {{
-                    table: {{
-                        widths: ['*'],
-                        body: [
-                            [
-                                {{
-                                    stack: [
-                                        // Main Heading
-                                        {{ 
-                                            text: "For Reporting of Blood Smears by MPW / HA / Passive Agency", 
-                                            style: 'mainHeading',
-                                            margin: [5, 5, 5, 5]
-                                        }},
-
-                                        // Second Line - Name of Section, Population, and Name of PHC
-                                        {{
-                                            columns: [
-                                                {{ text: "Name of Section: ____________________________________________________", fontSize: 11, width: 400 }},
-                                                {{ text: "Population: ___________________", fontSize: 11, width: 200 }},
-                                                {{ text: "Name of P.H.C.: ____________________", fontSize: 11, width: 200}}
-                                            ],
-                                            margin: [5, 0, 5, 3]
-                                        }},
-
-                                        // Third Line - Headquarter and Code No
-                                        {{
-                                            columns: [
-                                                {{ text: "Headquarter: _____________________________", fontSize: 11, width: '*' }},
-                                                {{ text: "Code No.: ___________________________", fontSize: 11, width: '*' }}
-                                            ],
-                                            margin: [5, 0, 5, 5]
-                                        }},
-
-                                        // Main Table
-                                        {{
-                                            table: {{
-                                                headerRows: 3,
-                                                widths: [50, 30, 135, 135, 20, 20, 35, 55, 50, 15, 15, 18, 15, 15, 30, 35],
-                                                body: [
-                                                    // First Header Row - Main Columns with Result(9) spanning
-                                                    [
-                                                        {{ text: "Village", rowSpan: 3, style: 'tableHeader', margin: [0, 45, 0, 0] }},
-                                                        {{ text: "House\\nNo.", rowSpan: 3, style: 'tableHeader', margin: [0, 35, 0, 0]  }},
-                                                        {{ text: "Name of the Head\\n of Family", rowSpan: 3, style: 'tableHeader', margin: [0, 35, 0, 0] }},
-                                                        {{ text: "Name of the\\nPatient", rowSpan: 3, style: 'tableHeader', margin: [0, 35, 0, 0] }},
-                                                        {{ text: "Age", rowSpan: 3, style: 'tableHeader', margin: [0, 45, 0, 0]  }},
-                                                        {{ text: "Sex", rowSpan: 3, style: 'tableHeader', margin: [0, 45, 0, 0]  }},
-                                                        {{ text: "Sr.No.\\n of\\nBlood Smear", rowSpan: 3, style: 'tableHeader', margin: [0, 15, 0, 0]   }},
-                                                        {{ text: "Treatment\\nNo. of Tablets\\nGiven\\n(4-Amino\\nQuinoline)", rowSpan: 3, style: 'tableHeader' }},
-                                                        {{ text: "Date of\\nCollection", rowSpan: 3, style: 'tableHeader', margin: [0, 35, 0, 0] }},
-                                                        {{ text: "Result (9)", colSpan: 5, style: 'tableHeader' }},
-                                                        {{}}, {{}}, {{}}, {{}},
-                                                        {{ text: "Mixed\\nIndicate\\nStage", rowSpan: 3, style: 'tableHeader', margin: [0, 15, 0, 0]  }},
-                                                        {{ text: "If +\\nProgressive\\n+ve\\nCase No.", rowSpan: 3, style: 'tableHeader' }}
-                                                    ],
-                                                    // Second Header Row - F, V, M under Result(9)
-                                                    [
-                                                        {{text: "Village"}}, {{}}, {{}}, {{}}, {{}}, {{}}, {{}}, {{}}, {{}},
-                                                        {{ text: "F", colSpan: 3, style: 'subHeader' }},
-                                                        {{}}, {{}},
-                                                        {{ text: "V", rowSpan: 2, style: 'subHeader' }},
-                                                        {{ text: "M", rowSpan: 2, style: 'subHeader' }},
-                                                        {{}},
-                                                        {{}}
-                                                    ],
-                                                    // Third Header Row - R, G, RG under F and Column Numbers
-                                                    [
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{ text: "R", style: 'subColumnHeader' }},
-                                                        {{ text: "G", style: 'subColumnHeader' }},
-                                                        {{ text: "RG", style: 'subColumnHeader' }},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}}
-                                                    ],
-[
-                                                        {{ text: "1", style: 'columnNumber' }},
-                                                        {{ text: "2", style: 'columnNumber' }},
-                                                        {{ text: "3", style: 'columnNumber' }},
-                                                        {{ text: "4", style: 'columnNumber' }},
-                                                        {{ text: "(5a)", style: 'columnNumber' }},
-                                                        {{ text: "(5b)", style: 'columnNumber' }},
-                                                        {{ text: "6", style: 'columnNumber' }},
-                                                        {{ text: "7", style: 'columnNumber' }},
-                                                        {{ text: "8", style: 'columnNumber' }},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{}},
-                                                        {{ text: "10", style: 'columnNumber' }},
-                                                        {{ text: "11", style: 'columnNumber' }}
-                                                    ],                                                    
-                                                    // Data Rows (14 empty rows for data entry)
-                                                    ...Array(14).fill([
-                                                        {{ text: "", margin: [0, 8.3, 0, 8.3] }},
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        "",
-                                                        ""
-                                                    ])
-                                                ]
-                                            }},
-                                            layout: {{
-                                                hLineWidth: function(i, node) {{ return 0.5; }},
-                                                vLineWidth: function(i, node) {{ return 0.5; }},
-                                                hLineColor: function(i, node) {{ return '#000000'; }},
-                                                vLineColor: function(i, node) {{ return '#000000'; }}
-                                            }},
-                                            margin: [5, 0, 5, 8]
-                                        }},
-
-                                        // Footer Section with three columns
-                                        {{
-                                            columns: [
-                                                {{
-                                                    width: '*',
-                                                    stack: [
-                                                        {{ text: "____________________", fontSize: 11, alignment: 'left', margin: [0, 15, 0, 0] }},
-                                                        {{ text: "Signature Microscopist", fontSize: 11, alignment: 'left' }}
-
-                                                    ]
-                                                }},
-                                                {{
-                                                    width: '*',
-                                                    stack: [
-                                                        {{ text: "____________________", fontSize: 11, alignment: 'center', margin: [0, 15, 0, 0] }},
-                                                        {{ text: "Date of Examination", fontSize: 11, alignment: 'center' }}
-
-                                                    ]
-                                                }},
-                                                {{
-                                                    width: '*',
-                                                    stack: [
-                                                        {{ text: "______________________________", fontSize: 11, alignment: 'right', margin: [0, 15, 0, 0] }},
-                                                        {{ text: "Signature of MPW / HA / HS / Others", fontSize: 11, alignment: 'right' }}
-
-                                                    ]
-                                                }}
-                                            ],
-                                            margin: [5, 0, 5, 5]
-                                        }}
-                                    ],
-                                    border: [true, true, true, true]
-                                }}
-                            ]
-                        ]
-                    }},
-                    layout: {{
-                        hLineWidth: function(i, node) {{ return 1; }},
-                        vLineWidth: function(i, node) {{ return 1; }},
-                        hLineColor: function(i, node) {{ return '#000000'; }},
-                        vLineColor: function(i, node) {{ return '#000000'; }}
-                    }}
-                }}
-            ];
-        }}
-
-        function generatePDF(action) {{
-            let content = [];
-            for (let p = 0; p < {num_pages}; p++) {{
-                content.push(...getReportSection());
-                if (p < {num_pages} - 1) content.push({{ text: "", pageBreak: "after" }});
-            }}
-
-            const docDefinition = {{
-                pageSize: "A4",
-                pageOrientation: "landscape",
-                pageMargins: [5, 34, 5, 0], // Left, Top (binding margin), Right, Bottom
-                defaultStyle: {{ 
-                    font: "{default_font}", 
-                    fontSize: 7 
-                }},
-                styles: {{
-                    mainHeading: {{ 
-                        fontSize: 18, 
-                        bold: true, 
-                        alignment: 'center' 
-                    }},
-                    tableHeader: {{ 
-                        fontSize: 10, 
-                        bold: true, 
-                        alignment: 'center',
-                        fillColor: '#E8E8E8'
-                    }},
-                    subHeader: {{ 
-                        fontSize: 10, 
-                        bold: true, 
-                        alignment: 'center',
-                        fillColor: '#F0F0F0'
-                    }},
-                    subColumnHeader: {{ 
-                        fontSize: 10, 
-                        bold: true, 
-                        alignment: 'center',
-                        fillColor: '#F5F5F5'
-                    }},
-                    columnNumber: {{ 
-                        fontSize: 10, 
-                        alignment: 'center',
-                        fillColor: '#F8F8F8'
-                    }}
-                }},
-                content: content
-            }};
-
-            if (action === 'download') {{
-                pdfMake.createPdf(docDefinition).download("Blood_Smear_Report_MPW.pdf");
-            }} else {{
-                pdfMake.createPdf(docDefinition).open();
-            }}
-        }}
-        </script>
-    </body>
-    </html>
-    """
-    components.html(html_template, height=150)
+    # 2. Rendered on the server (Marathi/English font from assets.pdf_font)
+    if st.button("📄 Generate PDF"):
+        with st.spinner("PDF तयार होत आहे..."):
+            pdf = smear_report_pdf(int(num_pages))
+        st.download_button("⬇️ Download PDF", pdf, file_name="Blood_Smear_Report_MPW.pdf",
+                           mime="application/pdf", on_click="ignore")
 
 
 if __name__ == "__main__":
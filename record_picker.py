@@ -0,0 +1,161 @@
+# record_picker.py
+"""
+Searchable, keyset-paginated record picker for edit/delete screens.
+
+Only one page (PAGE_SIZE rows) is ever fetched: rows are filtered by a
+prefix search on the normalized name key (see name_search) and paged
+with a row comparison on (order columns, id), so page N costs the same
+as page 1. The selectbox options are the row ids, shown through
+``label``. Pages and records are read through village_cache, so they
+are reloaded only after bump_village().
+
+A picker is described by a spec dict:
+
+    table   – table name
+    scope   – column restricting rows to the user (village_name / created_by)
+    order   – ordering columns; id is always appended as a tiebreaker
+    search  – columns matched by the prefix search
+    columns – extra columns needed by ``label``
+    label   – row dict -> display text
+"""
+import streamlit as st
+from psycopg import sql
+from psycopg.rows import dict_row
+from db_config import get_connection
+from name_search import search_key
+from village_cache import get_cache
+
+PAGE_SIZE = 50
+
+HOUSEHOLDS = {
+    "table": "m_no_register",
+    "scope": "village_name",
+    "order": ("m_no",),
+    "search": ("m_no", "family_head"),
+    "columns": ("family_head",),
+    "label": lambda r: f"{r['m_no']} - {r['family_head']}",
+}
+
+MEMBERS = {
+    "table": "family_members",
+    "scope": "village_name",
+    "order": ("m_no",),
+    "search": ("m_no", "member_name"),
+    "columns": ("member_name",),
+    "label": lambda r: f"M No {r['m_no']} - {r['member_name']}",
+}
+
+BENEFICIARIES = {
+    "table": "beneficiaries",
+    "scope": "created_by",
+    "order": (),
+    "search": ("name", "booth_no"),
+    "columns": ("name",),
+    "label": lambda r: f"{r['id']} — {r['name']}",
+}
+
+
+# ==========================
+# 🔧 Helper Functions
+# ==========================
+def _like_prefix(text):
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def _query_page(spec, scope_value, search, after, page_size):
+    keys = list(spec["order"]) + ["id"]
+    columns = list(dict.fromkeys(keys + list(spec["columns"])))
+
+    where = [sql.SQL("{} = %s").format(sql.Identifier(spec["scope"]))]
+    params = [scope_value]
+    search = search_key(search)
+    if search:
+        # Same normalized key as the trigram indexes from migration 4
+        where.append(sql.SQL("({})").format(sql.SQL(" OR ").join(
+            sql.SQL("mpw_search_key({}::text) LIKE %s").format(sql.Identifier(col)) for col in spec["search"]
+        )))
+        params.extend([_like_prefix(search)] * len(spec["search"]))
+    if after is not None:
+        where.append(sql.SQL("({}) > ({})").format(
+            sql.SQL(", ").join(map(sql.Identifier, keys)),
+            sql.SQL(", ").join([sql.Placeholder()] * len(keys)),
+        ))
+        params.extend(after)
+
+    query = sql.SQL("SELECT {} FROM {} WHERE {} ORDER BY {} LIMIT %s").format(
+        sql.SQL(", ").join(map(sql.Identifier, columns)),
+        sql.Identifier(spec["table"]),
+        sql.SQL(" AND ").join(where),
+        sql.SQL(", ").join(map(sql.Identifier, keys)),
+    )
+    params.append(page_size + 1)
+
+    with get_connection() as conn:
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(query, params)
+            return cur.fetchall()
+
+
+def _query_record(table, record_id):
+    with get_connection() as conn:
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(sql.SQL("SELECT * FROM {} WHERE id = %s").format(sql.Identifier(table)),
+                        (record_id,))
+            return cur.fetchone()
+
+
+def fetch_page(spec, scope_value, search="", after=None, page_size=PAGE_SIZE, village=None):
+    """Up to page_size + 1 rows after the keyset ``after`` (the extra row signals a next page).
+
+    ``village`` is the village whose writes invalidate the page; it
+    defaults to ``scope_value`` (village-scoped specs).
+    """
+    village = scope_value if village is None else village
+    after = None if after is None else tuple(after)
+    return get_cache().get("picker_page", village, lambda: _query_page(spec, scope_value, search, after, page_size),
+                           spec["table"], scope_value, search, after, page_size)
+
+
+def fetch_record(table, record_id, village):
+    """One full row by id as a dict, or None. Cached until ``village`` is bumped – treat as read-only."""
+    record_id = int(record_id)
+    return get_cache().get("record", village, lambda: _query_record(table, record_id), table, record_id)
+
+
+# ==========================
+# 🔎 Picker widget
+# ==========================
+def record_picker(label, spec, scope_value, key, page_size=PAGE_SIZE, village=None):
+    """Search box + one page of options + prev/next; returns the selected id or None."""
+    search = st.text_input("🔍 शोधा (M No / नाव)", key=f"{key}_search")
+
+    pager = st.session_state.setdefault(f"{key}_pager", {"search": "", "cursors": [None]})
+    if pager["search"] != search:
+        pager.update(search=search, cursors=[None])
+
+    rows = fetch_page(spec, scope_value, search, pager["cursors"][-1], page_size, village)
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    if not rows:
+        st.info("⛔ कोणतीही नोंद सापडली नाही.")
+        return None
+
+    # Keyed on ids: two rows may share a label (e.g. same-named members of one household)
+    labels = {r["id"]: spec["label"](r) for r in rows}
+    choice = st.selectbox(label, list(labels), format_func=labels.get, key=f"{key}_select")
+
+    keys = list(spec["order"]) + ["id"]
+
+    def next_page():
+        pager["cursors"].append(tuple(rows[-1][k] for k in keys))
+
+    def prev_page():
+        pager["cursors"].pop()
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    col1.button("⬅️ मागे", key=f"{key}_prev", on_click=prev_page, disabled=len(pager["cursors"]) == 1)
+    col2.caption(f"पान {len(pager['cursors'])}")
+    col3.button("पुढे ➡️", key=f"{key}_next", on_click=next_page, disabled=not has_next)
+
+    return choice
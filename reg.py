@@ -1,719 +1,303 @@
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
 import streamlit as st
-import pandas as pd
-import base64
-import json
-from pathlib import Path
-import streamlit.components.v1 as components
-
-
-def create_all_columns():
-    """Create all possible columns for all registers"""
-    cols = set()
-
-    # पाणी नमुने
-    cols.update(["अ.क्र.", "गाव", "UID", "स्रोत", "शेरा"])
-    months = ["एप्रिल", "मे", "जून", "जुलै", "ऑगस्ट", "सप्टेंबर", "ऑक्टोबर", "नोव्हेंबर", "डिसेंबर", "जानेवारी",
-              "फेब्रुवारी", "मार्च"]
-    for m in months:
-        cols.update([f"{m} नमुना", f"{m} निष्कर्ष"])
-
-    # मिठ नमुने
-    cols.update(["गावाचे नाव", "दुकानदाराचे नाव", "मोबाईल नंबर", "कंपनीचे नाव",
-                 "Batch Number", "Manuf. दिनांक", "Expiry दिनांक",
-                 "तपासणीसाठी घेतलेला दिनांक", "तपासणीसाठी दिलेला दिनांक"])
-
-    # AFP
-    cols.update(["नाव", "लिंग", "वय", "पूर्ण लसीकरण", "संपूर्ण लसीकरण",
-                 "कोणत्या भागास लुळेपणा", "पत्ता", "दिनांक", "दवाखान्याचे नाव",
-                 "Stool Sample घे. दिनांक", "Stool Sample तपासणी दिनांक", "निष्कर्ष"])
-
-    # गप्पी/डास
-    cols.update(["गप्पी मासे सोडल्याचे ठिकाण", "डास उत्पत्तीचे ठिकाण", "कायम", "हंगामी"])
-
-    # शाळा
-    cols.update(["शाळेचे नाव"])
-    age_groups = ["१ ली", "२ री", "३ री", "४ थी", "५ वी", "६ वी", "७ वी", "८ वी", "९ वी", "१० वी", "११ वी", "१२ वी"]
-    for g in age_groups:
-        cols.update([f"{g} मुले", f"{g} मुली"])
-    cols.update(["एकूण - मुले", "एकूण - मुली"])
-
-    # अंगणवाडी
-    cols.update(["अंगणवाडीचे नाव"])
-    age_groups_ang = ["० – १ वर्ष", "१ – २ वर्ष", "२ – ३ वर्ष", "३ – ६ वर्ष"]
-    for g in age_groups_ang:
-        cols.update([f"{g} - मुले", f"{g} - मुली"])
-    cols.update(["एकूण - मुले", "एकूण - मुली"])
-
-    # कुष्ठ
-    cols.update(["लक्षणे", "निदान", "कुष्ठरुग्णाचे संपूर्ण नाव", "मो. नंबर",
-                 "चालू दिनांक", "P.B.", "M.B.", "उपचार कालावधी",
-                 "उपचार देणाऱ्याचे नाव व संपर्क क्रमांक"])
-
-    # OT
-    cols.update(["O.T. चाचणी घेतल्याचे ठिकाण", "वेळ", "निष्कर्ष +ve", "निष्कर्ष -ve",
-                 "केलेली कार्यवाही"])
-
-    # मोतीबिंदू
-    cols.update(["शस्त्रक्रिया झालेला रुग्ण", "डोळा उजवा", "डोळा डावा",
-                 "शस्त्रक्रिया झालेलं ठिकाण", "संशयित मोतीबिंदू रुग्णाचे नाव"])
-
-    # TCL
-    cols.update(["ग्रामपंचायतीचे नाव", "TCL उत्पादनाचे नाव", "उत्पादन Batch Number",
-                 "उत्पादन दिनांक", "मुदत बाह्य दिनांक", "नमुना घेतल्याचा दि.",
-                 "तपासणीसाठी पाठवलेला दि."])
-
-    # क्षय
-    cols.update(["मासिक", "वार्षिक", "संशयित क्षयरुग्णाचे नाव", "घेतलेला दिनांक",
-                 "पाठवलेला दिनांक", "Lab No", "क्षयरुग्णाचे नाव", "वजन",
-                 "Start of Treatment", "थुंकी", "एक्स-रे", "IP", "CP",
-                 "End of Treatment", "Mobile Number"])
-
-    # इतर आवश्यक सामान्य कॉलम्स
-    cols.update(["वय", "लिंग", "शेरा", "दिनांक", "अ.क्र.", "गावाचे नाव"])
-
-    return sorted(list(cols))
-
-
-def generate_combined_html(register_sets, data_json, font_b64):
-    """Generate complete HTML for PDF generation"""
-
-    # Calculate page numbers for index
-    index_data = []
-    current_page = 3  # Cover(1), Index(2), first register cover starts at 3
-
-    for reg_name, info in register_sets.items():
-        if info['sets'] > 0:
-            start_page = current_page
-            # 1 for cover page + (sets * pages_per_set)
-            total_pages = 1 + (info['sets'] * info['pages_per_set'])
-            end_page = start_page + total_pages - 1
-            index_data.append({
-                'name': reg_name,
-                'start': start_page,
-                'end': end_page
-            })
-            current_page = end_page + 1
-
-    return f"""
-<html>
-<head>
-<meta charset="UTF-8"/>
-<script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/pdfmake.min.js"></script>
-<script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/vfs_fonts.js"></script>
-</head>
-<body>
-
-<button onclick="previewPDF()" style="padding:10px 20px;background:#2196F3;color:white;border:none;border-radius:6px;margin-right:10px;font-size:16px; cursor: pointer;">Preview PDF</button>
-<button onclick="downloadPDF()" style="padding:10px 20px;background:#4CAF50;color:white;border:none;border-radius:6px;font-size:16px; cursor: pointer;">Download PDF</button>
-
-<script>
-pdfMake.vfs["Marathi.ttf"] = "{font_b64}";
-pdfMake.fonts = {{
-    MarathiFont: {{
-      normal:"Marathi.ttf", bold:"Marathi.ttf", italics:"Marathi.ttf", bolditalics:"Marathi.ttf"
-    }}
-}};
-
-const tableData = {data_json};
-const registerSets = {json.dumps(register_sets, ensure_ascii=False)};
-const indexData = {json.dumps(index_data, ensure_ascii=False)};
-const content = [];
-
-// Utility function to generate content (Includes Footer/Page Numbering and Margins)
-function generateContent(pdfContent) {{
-    const docDefinition = {{
-        content: pdfContent,
-        defaultStyle: {{
-            font: 'MarathiFont', 
-            fontSize: 12
-        }},
-        pageMargins: [50, 30, 30, 30],
-
-        footer: function(currentPage, pageCount) {{
-             if (currentPage >= 2) {{ 
-                return {{
-                    text: currentPage.toString(), 
-                    alignment: 'center',
-                    fontSize: 10,
-                    margin: [0, 10, 0, 0] 
-                }};
-            }}
-             return null;
-        }}
-    }};
-    return docDefinition;
-}}
-
-// Cover Page
-content.push({{
-    text:"आरोग्य विभाग\\nनोंदवही संग्रह",
-    fontSize:50,
-    bold:true,
-    alignment:"center",
-    margin:[0,220,0,0],
-    pageBreak: "after"
-}});
-
-// Index Page
-content.push({{
-    text:"अनुक्रमणिका",
-    fontSize:30,
-    bold:true,
-    alignment:"center",
-    margin:[0,20,0,30]
-}});
-
-const indexTableBody = [[
-    {{text:"अ.क्र.", bold:true, alignment:"center"}},
-    {{text:"रजिस्टरचे नाव", bold:true, alignment:"center"}},
-    {{text:"पृष्ठ क्रमांक", bold:true, alignment:"center"}}
-]];
-
-indexData.forEach((item, idx) => {{
-    indexTableBody.push([
-        {{text:(idx+1).toString(), alignment:"center"}},
-        {{text:item.name, alignment:"left"}},
-        {{text:item.start + " ते " + item.end, alignment:"center"}}
-    ]);
-}});
-
-content.push({{
-    table:{{
-        headerRows:1,
-        widths:[40, "*", 100],
-        body:indexTableBody
-    }},
-    layout:{{
-        hLineWidth:()=>1,
-        vLineWidth:()=>1,
-        paddingTop:()=>8,
-        paddingBottom:()=>8
-    }},
-    pageBreak: "after"
-}});
-
-function buildSimpleTable(title, cols, widths) {{
-    content.push({{text:title, alignment:"center", bold:true, fontSize:16, margin:[0,5,0,5]}});
-    const headerRow = cols.map(c => ({{text:c, bold:true, alignment:"center"}}));
-    const body = [headerRow];
-    for(let r=0; r<26; r++) {{
-        const row = cols.map(c => ({{text: tableData[r]?.[c] || "", alignment:"center", margin:[0,10,0,10]}}));
-        body.push(row);
-    }}
-    content.push({{
-        table:{{headerRows:1, widths:widths, body:body}},
-        layout:{{hLineWidth:()=>0.7, vLineWidth:()=>0.7, paddingTop:()=>3, paddingBottom:()=>3}}
-    }});
-}}
-
-// पाणी नमुने रजिस्टर
-if(registerSets["पाणी नमुने तपासणी रजिस्टर"].sets > 0) {{
-    content.push({{
-        text:"पाणी नमुने तपासणी\\nरजिस्टर",
-        fontSize:55,
-        bold:true,
-        alignment:"center",
-        margin:[0,200,0,0],
-        pageBreak: "after"
-    }});
-
-    function buildPaniTable(fixedCols, months, widths, addShara, heading) {{
-        const headerRow1 = [];
-        const headerRow2 = [];
-
-        for(const c of fixedCols) {{
-            headerRow1.push({{text:c, bold:true, alignment:"center", rowSpan:2}});
-            headerRow2.push("");
-        }}
-
-        for(const m of months) {{
-            headerRow1.push({{text:m, colSpan:2, alignment:"center", bold:true}});
-            headerRow1.push({{}});
-            headerRow2.push({{text:"नमुना", bold:true, alignment:"center"}});
-            headerRow2.push({{text:"निष्कर्ष", bold:true, alignment:"center"}});
-        }}
-
-        if(addShara) {{
-            headerRow1.push({{text:"शेरा", rowSpan:2, alignment:"center", bold:true}});
-            headerRow2.push("");
-        }}
-
-        const blankRows = [];
-        for(let r=0; r<26; r++) {{
-            const row = [];
-            for(const c of fixedCols) {{
-                row.push({{text: tableData[r]?.[c] || "", alignment:"center", margin:[0,9,0,9]}});
-            }}
-            for(const m of months) {{
-                row.push({{text: tableData[r]?.[m+" नमुना"] || "", alignment:"center", margin:[0,9,0,9]}});
-                row.push({{text: tableData[r]?.[m+" निष्कर्ष"] || "", alignment:"center", margin:[0,9,0,9]}});
-            }}
-            if(addShara) {{
-                row.push({{text: tableData[r]?.["शेरा"] || "", alignment:"center", margin:[0,9,0,9]}});
-            }}
-            blankRows.push(row);
-        }}
-
-        content.push({{text: heading, alignment:"center", fontSize:16, bold:true, margin:[0,8,0,8]}});
-        content.push({{
-            table:{{headerRows:2, widths:widths, body:[headerRow1, headerRow2, ...blankRows]}},
-            layout:{{hLineWidth:()=>0.7, vLineWidth:()=>0.7, paddingTop:()=>4, paddingBottom:()=>4}}
-        }});
-    }}
-
-    for(let i=0; i<registerSets["पाणी नमुने तपासणी रजिस्टर"].sets; i++) {{
-        buildPaniTable(["अ.क्र.","गाव","UID","स्रोत"], ["एप्रिल","मे"], [20,82,50,110,42,42,42,42], false, "पाणी नमुने तपासणी रजिस्टर- एप्रिल/मे");
-        content.push({{text:"", pageBreak:"after"}});
-        buildPaniTable([], ["जून","जुलै","ऑगस्ट","सप्टेंबर"], [42,42,42,42,42,42,42,42,84], true, "पाणी नमुने तपासणी रजिस्टर- जून ते सप्टेंबर");
-        content.push({{text:"", pageBreak:"after"}});
-        buildPaniTable(["अ.क्र.","गाव","UID","स्रोत"], ["ऑक्टोबर","नोव्हेंबर"], [20,82,50,110,42,42,42,42], false, "पाणी नमुने तपासणी रजिस्टर- ऑक्टोबर/नोव्हेंबर");
-        content.push({{text:"", pageBreak:"after"}});
-        buildPaniTable([], ["डिसेंबर","जानेवारी","फेब्रुवारी","मार्च"], [42,42,42,42,42,42,42,42,84], true, "पाणी नमुने तपासणी रजिस्टर- डिसेंबर ते मार्च");
-        if(i < registerSets["पाणी नमुने तपासणी रजिस्टर"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// मिठ नमुने रजिस्टर
-if(registerSets["मिठ नमुने तपासणी रजिस्टर"].sets > 0) {{
-    content.push({{text:"मिठ नमुने तपासणी\\nरजिस्टर",fontSize:55,bold:true,alignment:"center",margin:[0,200,0,0], pageBreak:"after"}});
-
-    const mithPages = [
-        {{cols:["अ.क्र    .","गावाचे नाव","दुकानदाराचे नाव","मोबाईल नंबर","कंपनीचे नाव"], widths:[25,110,110,85,120]}},
-        {{cols:["Batch Number","Manuf. दिनांक","Expiry दिनांक","तपासणीसाठी घेतलेला दिनांक","तपासणीसाठी दिलेला दिनांक","शेरा"], widths:[53,63,63,80,80,100]}}
-    ];
-
-    for(let i=0; i<registerSets["मिठ नमुने तपासणी रजिस्टर"].sets; i++) {{
-        mithPages.forEach((p, idx) => {{
-            buildSimpleTable("मिठ नमुने तपासणी रजिस्टर", p.cols, p.widths);
-            if(!(i === registerSets["मिठ नमुने तपासणी रजिस्टर"].sets-1 && idx === 1)) content.push({{text:"", pageBreak:"after"}});
-        }});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// AFP रुग्ण नोंद रजिस्टर
-if(registerSets["AFP रुग्ण नोंद रजिस्टर"].sets > 0) {{
-    content.push({{text:"AFP रुग्ण नोंद\\nरजिस्टर",fontSize:55,bold:true,alignment:"center",margin:[0,200,0,0], pageBreak:"after"}});
-
-    const afpPages = [
-        {{cols:["अ.क्र       .","नाव","लिंग","वय","पूर्ण लसीकरण","संपूर्ण लसीकरण","कोणत्या भागास लुळेपणा"], widths:[20,165,35,35,40,40,95]}},
-        {{cols:["पत्ता","दिनांक","दवाखान्याचे नाव","Stool Sample घे.दिनांक","Stool Sample त.दिनांक","निष्कर्ष"], widths:[100,50,100,50,50,90]}}
-    ];
-
-    for(let i=0; i<registerSets["AFP रुग्ण नोंद रजिस्टर"].sets; i++) {{
-        afpPages.forEach((p, idx) => {{
-            buildSimpleTable("AFP रुग्ण नोंद रजिस्टर", p.cols, p.widths);
-            if(!(i === registerSets["AFP रुग्ण नोंद रजिस्टर"].sets-1 && idx === 1)) content.push({{text:"", pageBreak:"after"}});
-        }});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// गप्पी मासे
-if(registerSets["गप्पी मासे पैदास केंद्र माहिती"].sets > 0) {{
-    content.push({{text:"गप्पी मासे पैदास केंद्र\\nमाहिती",fontSize:50,bold:true,alignment:"center",margin:[0,220,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["गप्पी मासे पैदास केंद्र माहिती"].sets; i++) {{
-        buildSimpleTable("गप्पी मासे पैदास केंद्र माहिती", ["अ.क्र.","गावाचे नाव","गप्पी मासे सोडल्याचे ठिकाण","कायम","हंगामी"], [30,123,173,60,60]);
-        if(i < registerSets["गप्पी मासे पैदास केंद्र माहिती"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// डास उत्पत्ती
-if(registerSets["डास उत्पत्ती ठिकाणांची माहिती"].sets > 0) {{
-    content.push({{text:"डास उत्पत्ती ठिकाणांची\\nमाहिती",fontSize:50,bold:true,alignment:"center",margin:[0,220,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["डास उत्पत्ती ठिकाणांची माहिती"].sets; i++) {{
-        buildSimpleTable("डास उत्पत्ती ठिकाणांची माहिती", ["अ.क्र.","गावाचे नाव","डास उत्पत्तीचे ठिकाण","कायम","हंगामी"], [20,87,235,50,50]);
-        if(i < registerSets["डास उत्पत्ती ठिकाणांची माहिती"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// शाळा पटसंख्या
-if(registerSets["शाळेतील मुलामुलींची पटसंख्या"].sets > 0) {{
-    content.push({{text:"शाळेतील मुलामुलींची पटसंख्या",fontSize:55,bold:true,alignment:"center",margin:[0,180,0,0], pageBreak:"after"}});
-
-    function buildShalaTable(fixedCols, ageGroups, widths, addTotal, heading) {{
-        const headerRow1 = [];
-        const headerRow2 = [];
-
-        if(fixedCols.length > 0) {{
-            headerRow1.push({{text:"अ.क्र.", bold:true, alignment:"center", rowSpan:2}},
-                            {{text:"गावाचे नाव", bold:true, alignment:"center", rowSpan:2}},
-                            {{text:"शाळेचे नाव", bold:true, alignment:"center", rowSpan:2}});
-            headerRow2.push("", "", "");
-        }}
-
-        for(const g of ageGroups) {{
-            headerRow1.push({{text:g, colSpan:2, alignment:"center", bold:true}}, {{}});
-            headerRow2.push({{text:"मुले", bold:true, alignment:"center"}}, {{text:"मुली", bold:true, alignment:"center"}});
-        }}
-
-        if(addTotal) {{
-            headerRow1.push({{text:"एकूण", colSpan:2, alignment:"center", bold:true}}, {{}});
-            headerRow2.push({{text:"मुले", bold:true, alignment:"center"}}, {{text:"मुली", bold:true, alignment:"center"}});
-        }}
-
-        const blankRows = [];
-        for(let r=0; r<25; r++) {{
-            const row = [];
-            if(fixedCols.length > 0) {{
-                row.push({{text: tableData[r]?.["अ.क्र."] || "", alignment:"center", margin:[0,8,0,8]}});
-                row.push({{text: tableData[r]?.["गावाचे नाव"] || "", alignment:"center", margin:[0,8,0,8]}});
-                row.push({{text: tableData[r]?.["शाळेचे नाव"] || "", alignment:"center", margin:[0,8,0,8]}});
-            }}
-            for(const g of ageGroups) {{
-                row.push({{text: tableData[r]?.[g + " मुले"] || "", alignment:"center", margin:[0,8,0,8]}});
-                row.push({{text: tableData[r]?.[g + " मुली"] || "", alignment:"center", margin:[0,8,0,8]}});
-            }}
-            if(addTotal) {{
-                row.push({{text: tableData[r]?.["एकूण - मुले"] || "", alignment:"center", margin:[0,8,0,8]}});
-                row.push({{text: tableData[r]?.["एकूण - मुली"] || "", alignment:"center", margin:[0,8,0,8]}});
-            }}
-            blankRows.push(row);
-        }}
-
-        content.push({{text: heading, alignment:"center", fontSize:18, bold:true, margin:[0,8,0,8]}});
-        content.push({{
-            table:{{headerRows:2, widths:widths, body:[headerRow1, headerRow2, ...blankRows]}},
-            layout:{{hLineWidth:()=>0.8, vLineWidth:()=>0.8, paddingTop:()=>5, paddingBottom:()=>5}}
-        }});
-    }}
-
-    for(let i=0; i<registerSets["शाळेतील मुलामुलींची पटसंख्या"].sets; i++) {{
-        buildShalaTable(["अ.क्र.", "गावाचे नाव", "शाळेचे नाव"], ["१ ली", "२ री", "३ री", "४ थी", "५ वी"], [20,75,100,19,19,19,19,19,19,19,19,19,19], false, "शाळेतील मुलामुलींची पटसंख्या (पान १)");
-        content.push({{text:"", pageBreak:"after"}});
-        buildShalaTable([], ["६ वी", "७ वी", "८ वी", "९ वी", "१० वी", "११ वी", "१२ वी"], [22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,34,34], true, "शाळेतील मुलामुलींची पटसंख्या (पान २)");
-        if(i < registerSets["शाळेतील मुलामुलींची पटसंख्या"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// अंगणवाडी
-if(registerSets["अंगणवाडी मुलामुलींची पटसंख्या"].sets > 0) {{
-    content.push({{text:"अंगणवाडी मुलामुलींची\\nपटसंख्या",fontSize:46,bold:true,alignment:"center",margin:[0,180,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["अंगणवाडी मुलामुलींची पटसंख्या"].sets; i++) {{
-        const h1 = [
-            {{text:"अ.क्र.", bold:true, alignment:"center", rowSpan:2}},
-            {{text:"गावाचे नाव", bold:true, alignment:"center", rowSpan:2}},
-            {{text:"अंगणवाडीचे नाव", bold:true, alignment:"center", rowSpan:2}},
-            {{text:"० – १ वर्ष", colSpan:2, alignment:"center", bold:true}}, {{}},
-            {{text:"१ – २ वर्ष", colSpan:2, alignment:"center", bold:true}}, {{}},
-            {{text:"२ – ३ वर्ष", colSpan:2, alignment:"center", bold:true}}, {{}},
-            {{text:"३ – ६ वर्ष", colSpan:2, alignment:"center", bold:true}}, {{}},
-            {{text:"एकूण", colSpan:2, alignment:"center", bold:true}}, {{}}
-        ];
-
-        const h2 = ["", "", "", {{text:"मुले", bold:true}}, {{text:"मुली", bold:true}}, {{text:"मुले", bold:true}}, {{text:"मुली", bold:true}}, {{text:"मुले", bold:true}}, {{text:"मुली", bold:true}}, {{text:"मुले", bold:true}}, {{text:"मुली", bold:true}}, {{text:"मुले", bold:true}}, {{text:"मुली", bold:true}}];
-
-        const body = [h1, h2];
-        for(let r=0; r<25; r++) {{
-            const row = [
-                {{text: tableData[r]?.["अ.क्र."] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["गावाचे नाव"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["अंगणवाडीचे नाव"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["० – १ वर्ष - मुले"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["० – १ वर्ष - मुली"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["१ – २ वर्ष - मुले"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["१ – २ वर्ष - मुली"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["२ – ३ वर्ष - मुले"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["२ – ३ वर्ष - मुली"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["३ – ६ वर्ष - मुले"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["३ – ६ वर्ष - मुली"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["एकूण - मुले"] || "", alignment:"center", margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["एकूण - मुली"] || "", alignment:"center", margin:[0,8,0,8]}}
-            ];
-            body.push(row);
-        }}
-
-        content.push({{text:"अंगणवाडी मुलामुलींची पटसंख्या",alignment:"center",fontSize:15,bold:true,margin:[0,10,0,10]}});
-        content.push({{
-            table:{{headerRows:2, widths:[25,80,90,19,19,19,19,19,19,19,19,20,20], body:body}},
-            layout:{{hLineWidth:()=>0.8, vLineWidth:()=>0.8, paddingTop:()=>5, paddingBottom:()=>5}}
-        }});
-        if(i < registerSets["अंगणवाडी मुलामुलींची पटसंख्या"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// संशयित कुष्ठरुग्ण नोंदवही
-if(registerSets["संशयित कुष्ठरुग्ण नोंदवही"].sets > 0) {{
-    content.push({{text:"संशयित कुष्ठरुग्ण\\nनोंदवही",fontSize:50,bold:true,alignment:"center",margin:[0,220,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["संशयित कुष्ठरुग्ण नोंदवही"].sets; i++) {{
-        buildSimpleTable("संशयित कुष्ठरुग्ण नोंदवही", ["अ.क्र.","गावाचे नाव","संशयित कुष्ठरुग्णाचे नाव","वय"],[30,180,205,40]);
-        content.push({{text:"", pageBreak:"after"}});
-        buildSimpleTable("संशयित कुष्ठरुग्ण नोंदवही", ["लिंग","लक्षणे","निदान"], [40,220,215]);
-        if(i < registerSets["संशयित कुष्ठरुग्ण नोंदवही"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// O.T. चाचणी
-if(registerSets["O.T. चाचणी रजिस्टर"].sets > 0) {{
-    content.push({{text:"O.T. चाचणी रजिस्टर",fontSize:50,bold:true,alignment:"center",margin:[0,200,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["O.T. चाचणी रजिस्टर"].sets; i++) {{
-        const h1 = [
-            {{text:"अ.क्र.", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"दिनांक", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"O.T. चाचणी घेतल्याचे ठिकाण", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"वेळ", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"निष्कर्ष", colSpan:2, alignment:"center", bold:true}}, {{}},
-            {{text:"केलेली कार्यवाही", rowSpan:2, alignment:"center", bold:true}}
-        ];
-        const h2 = [{{}}, {{}}, {{}}, {{}}, {{text:"+ve", alignment:"center", fontSize:10}}, {{text:"-ve", alignment:"center", fontSize:10}}, {{}}];
-
-        const body = [h1, h2];
-        for(let r=0; r<26; r++) {{
-            body.push([
-                {{text: tableData[r]?.["अ.क्र."] || "", alignment:"center", margin:[0,8.5,0,8.5]}},
-                {{text: tableData[r]?.["दिनांक"] || "", alignment:"center", fontSize:7, margin:[0,8.5,0,8.5]}},
-                {{text: tableData[r]?.["O.T. चाचणी घेतल्याचे ठिकाण"] || "", alignment:"center", margin:[0,8.5,0,8.5]}},
-                {{text: tableData[r]?.["वेळ"] || "", alignment:"center", margin:[0,8.5,0,8.5]}},
-                {{text: tableData[r]?.["निष्कर्ष +ve"] || "", alignment:"center", fontSize:7, margin:[0,8.5,0,8.5]}},
-                {{text: tableData[r]?.["निष्कर्ष -ve"] || "", alignment:"center", fontSize:7, margin:[0,8.5,0,8.5]}},
-                {{text: tableData[r]?.["केलेली कार्यवाही"] || "", alignment:"center", margin:[0,8.5,0,8.5]}}
-            ]);
-        }}
-
-        content.push({{text:"O.T. चाचणी रजिस्टर",alignment:"center",bold:true,fontSize:18,margin:[0,8,0,8]}});
-        content.push({{
-            table:{{headerRows:2, widths:[20,55,170,40,25,25,105], body:body}},
-            layout:{{hLineWidth:()=>0.7, vLineWidth:()=>0.7, paddingTop:()=>4, paddingBottom:()=>4}}
-        }});
-        if(i < registerSets["O.T. चाचणी रजिस्टर"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// मोतीबिंदू शस्त्रक्रिया नोंदवही
-if(registerSets["मोतीबिंदू शस्त्रक्रिया नोंदवही"].sets > 0) {{
-    content.push({{text:"मोतीबिंदू शस्त्रक्रिया\\nनोंदवही",fontSize:50,bold:true,alignment:"center",margin:[0,200,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["मोतीबिंदू शस्त्रक्रिया नोंदवही"].sets; i++) {{
-        const h1 = [
-            {{text:"अ.क्र.", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"गावाचे नाव", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"शस्त्रक्रिया झालेला रुग्ण", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"वय", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"लिंग", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"डोळा", colSpan:2, alignment:"center", bold:true}}, {{}},
-            {{text:"शस्त्रक्रिया झालेलं ठिकाण", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"दिनांक", rowSpan:2, alignment:"center", bold:true}}
-        ];
-        const h2 = [{{}}, {{}}, {{}}, {{}}, {{}}, {{text:"उजवा", alignment:"center", fontSize:10}}, {{text:"डावा", alignment:"center", fontSize:10}}, {{}}, {{}}];
-
-        const body = [h1, h2];
-        for(let r=0; r<26; r++) {{
-            body.push([
-                {{text: tableData[r]?.["अ.क्र."] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["गावाचे नाव"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["शस्त्रक्रिया झालेला रुग्ण"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["वय"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["लिंग"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["डोळा उजवा"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["डोळा डावा"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["शस्त्रक्रिया झालेलं ठिकाण"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["दिनांक"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}}
-            ]);
-        }}
-
-        content.push({{text:"मोतीबिंदू शस्त्रक्रिया नोंदवही",alignment:"center",bold:true,fontSize:18,margin:[0,8,0,8]}});
-        content.push({{
-            table:{{headerRows:2, widths:[20,65,115,20,20,20,20,115,40], body:body}},
-            layout:{{hLineWidth:()=>0.7, vLineWidth:()=>0.7, paddingTop:()=>4, paddingBottom:()=>4}}
-        }});
-        if(i < registerSets["मोतीबिंदू शस्त्रक्रिया नोंदवही"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// संशयित मोतीबिंदू रुग्ण नोंदवही
-if(registerSets["संशयित मोतीबिंदू रुग्ण नोंदवही"].sets > 0) {{
-    content.push({{text:"संशयित मोतीबिंदू रुग्ण\\nनोंदवही",fontSize:48,bold:true,alignment:"center",margin:[0,200,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["संशयित मोतीबिंदू रुग्ण नोंदवही"].sets; i++) {{
-        const h1 = [
-            {{text:"अ.क्र.", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"गावाचे नाव", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"संशयित मोतीबिंदू रुग्णाचे नाव", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"वय", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"लिंग", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"डोळा", colSpan:2, alignment:"center", bold:true}}, {{}}
-        ];
-        const h2 = [{{}}, {{}}, {{}}, {{}}, {{}}, {{text:"उजवा", alignment:"center", fontSize:10}}, {{text:"डावा", alignment:"center", fontSize:10}}];
-
-        const body = [h1, h2];
-        for(let r=0; r<26; r++) {{
-            body.push([
-                {{text: tableData[r]?.["अ.क्र."] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["गावाचे नाव"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["संशयित मोतीबिंदू रुग्णाचे नाव"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["वय"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["लिंग"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["डोळा उजवा"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}},
-                {{text: tableData[r]?.["डोळा डावा"] || "", alignment:"center", fontSize:11, margin:[0,9,0,9]}}
-            ]);
-        }}
-
-        content.push({{text:"संशयित मोतीबिंदू रुग्ण नोंदवही",alignment:"center",bold:true,fontSize:18,margin:[0,8,0,8]}});
-        content.push({{
-            table:{{headerRows:2, widths:[25,90,175,35,35,35,35], body:body}},
-            layout:{{hLineWidth:()=>0.7, vLineWidth:()=>0.7, paddingTop:()=>4, paddingBottom:()=>4}}
-        }});
-        if(i < registerSets["संशयित मोतीबिंदू रुग्ण नोंदवही"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// कुष्ठरुग्ण नोंदवही
-if(registerSets["कुष्ठरुग्ण नोंदवही"].sets > 0) {{
-    content.push({{text:"कुष्ठरुग्ण नोंदवही",fontSize:52,bold:true,alignment:"center",margin:[0,200,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["कुष्ठरुग्ण नोंदवही"].sets; i++) {{
-        // Page 1
-        buildSimpleTable("कुष्ठरुग्ण नोंदवही - रुग्ण माहिती", ["अ.क्र.","गावाचे नाव","कुष्ठरुग्णाचे संपूर्ण नाव","वय","लिंग","मो. नंबर","निदान"], [20,70,145,25,25,80,70]);
-        content.push({{text:"", pageBreak:"after"}});
-
-        // Page 2
-        const h1 = [
-            {{text:"चालू दिनांक", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"उपचार", colSpan:2, alignment:"center", bold:true}}, {{}},
-            {{text:"P.B.", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"M.B.", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"उपचार कालावधी", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"उपचार देणाऱ्याचे नाव व संपर्क क्रमांक", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"शेरा", rowSpan:2, alignment:"center", bold:true}}
-        ];
-        const h2 = [{{}}, {{text:"सुरु", alignment:"center", fontSize:10}}, {{text:"समाप्त", alignment:"center", fontSize:10}}, {{}}, {{}}, {{}}, {{}}, {{}}];
-
-        const body = [h1, h2];
-        for(let r=0; r<26; r++) {{
-            body.push([
-                {{text: tableData[r]?.["चालू दिनांक"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["उपचार सुरु"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["उपचार समाप्त"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["P.B."] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["M.B."] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["उपचार कालावधी"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["उपचार देणाऱ्याचे नाव व संपर्क क्रमांक"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["शेरा"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}}
-            ]);
-        }}
-
-        content.push({{text:"कुष्ठरुग्ण नोंदवही - उपचार माहिती (पान २)",alignment:"center",bold:true,fontSize:18,margin:[0,8,0,8]}});
-        content.push({{
-            table:{{headerRows:2, widths:[40,40,40,30,30,50,130,70], body:body}},
-            layout:{{hLineWidth:()=>0.7, vLineWidth:()=>0.7, paddingTop:()=>4, paddingBottom:()=>4}}
-        }});
-
-        if(i < registerSets["कुष्ठरुग्ण नोंदवही"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// TCL नमुना तपासणी नोंदवही
-if(registerSets["T.C.L नमुना तपासणी नोंदवही"].sets > 0) {{
-    content.push({{text:"T.C.L नमुना तपासणी\\nनोंदवही",fontSize:50,bold:true,alignment:"center",margin:[0,200,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["T.C.L नमुना तपासणी नोंदवही"].sets; i++) {{
-        // Page 1
-        buildSimpleTable("T.C.L नमुना तपासणी नोंदवही", ["अ.क्र.","ग्रामपंचायतीचे नाव","TCL उत्पादनाचे नाव","उत्पादन Batch Number","उत्पादन दिनांक"], [25,115,150,85,70]);
-        content.push({{text:"", pageBreak:"after"}});
-
-        // Page 2
-        buildSimpleTable("T.C.L नमुना तपासणी नोंदवही", ["अ.क्र.","मुदत बाह्य दिनांक","नमुना घेतल्याचा दि.","तपासणीसाठी पाठवलेला दि.","निष्कर्ष", "शेरा"], [25,63,63,63,80,150]);
-        if(i < registerSets["T.C.L नमुना तपासणी नोंदवही"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// संशयित क्षयरुग्ण नोंदवही
-if(registerSets["संशयित क्षयरुग्ण नोंदवही"].sets > 0) {{
-    content.push({{text:"संशयित क्षयरुग्ण\\nनोंदवही",fontSize:50,bold:true,alignment:"center",margin:[0,200,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["संशयित क्षयरुग्ण नोंदवही"].sets; i++) {{
-        // Page 1
-        buildSimpleTable("संशयित क्षयरुग्ण नोंदवही (पान १)", ["अ.क्र.","गावाचे नाव","संशयित क्षयरुग्णाचे नाव","लिंग","वय","मोबाईल नंबर"], [20,100,160,30,30,95]);
-        content.push({{text:"", pageBreak:"after"}});
-
-        // Page 2
-        const h1 = [
-            {{text:"दिनांक", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"नमुना", colSpan:2, alignment:"center", bold:true}}, {{}},
-            {{text:"Lab No", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"निष्कर्ष", rowSpan:2, alignment:"center", bold:true}},
-            {{text:"शेरा", rowSpan:2, alignment:"center", bold:true}}
-        ];
-        const h2 = [{{}}, {{text:"घेतलेला दिनांक", alignment:"center", fontSize:10}}, {{text:"पाठवलेला दिनांक", alignment:"center", fontSize:10}}, {{}}, {{}}, {{}}];
-
-        const body = [h1, h2];
-        for(let r=0; r<27; r++) {{
-            body.push([
-                {{text: tableData[r]?.["दिनांक"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["घेतलेला दिनांक"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["पाठवलेला दिनांक"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["Lab No"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["निष्कर्ष"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}},
-                {{text: tableData[r]?.["शेरा"] || "", alignment:"center", fontSize:10, margin:[0,8,0,8]}}
-            ]);
-        }}
-
-        content.push({{text:"संशयित क्षयरुग्ण नोंदवही (पान २)",alignment:"center",bold:true,fontSize:18,margin:[0,8,0,8]}});
-        content.push({{
-            table:{{headerRows:2, widths:[60,60,60,60,60,150], body:body}},
-            layout:{{hLineWidth:()=>0.7, vLineWidth:()=>0.7, paddingTop:()=>4, paddingBottom:()=>4}}
-        }});
-
-        if(i < registerSets["संशयित क्षयरुग्ण नोंदवही"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// उपचाराखालील क्षयरुग्ण नोंदवही
-if(registerSets["उपचाराखालील क्षयरुग्ण नोंदवही"].sets > 0) {{
-    content.push({{text:"उपचाराखालील क्षयरुग्ण\\nनोंदवही",fontSize:50,bold:true,alignment:"center",margin:[0,200,0,0], pageBreak:"after"}});
-
-    for(let i=0; i<registerSets["उपचाराखालील क्षयरुग्ण नोंदवही"].sets; i++) {{
-        // Page 1
-        buildSimpleTable("उपचाराखालील क्षयरुग्ण नोंदवही (पान १)", ["मासिक","वार्षिक","गावाचे नाव","क्षयरुग्णाचे नाव","लिंग","वय","वजन","Start of Treatment"], [30,30,80,140,25,25,30,64]);
-        content.push({{text:"", pageBreak:"after"}});
-
-        // Page 2
-        buildSimpleTable("उपचाराखालील क्षयरुग्ण नोंदवही (पान २)", ["थुंकी","एक्स-रे","IP","CP","End of Treatment", "Mobile Number", "शेरा"], [40,50,40,40,75,85,100]);
-        if(i < registerSets["उपचाराखालील क्षयरुग्ण नोंदवही"].sets-1) content.push({{text:"", pageBreak:"after"}});
-    }}
-    content.push({{text:"", pageBreak:"after"}});
-}}
-
-// Final functions to create PDF and download/preview
-function previewPDF() {{
-    try {{
-        const docDefinition = generateContent(content);
-        pdfMake.createPdf(docDefinition).open();
-    }} catch (e) {{
-        alert("PDF तयार करताना त्रुटी आली. कृपया कन्सोल तपासा. Error: " + e.message);
-        console.error("PDF Generation Error:", e);
-    }}
-}}
-function downloadPDF() {{
-    try {{
-        const docDefinition = generateContent(content);
-        pdfMake.createPdf(docDefinition).download('आरोग्य-नोंदवही-संग्रह.pdf');
-    }} catch (e) {{
-        alert("PDF तयार करताना त्रुटी आली. कृपया कन्सोल तपासा. Error: " + e.message);
-        console.error("PDF Generation Error:", e);
-    }}
-}}
-</script>
-</body>
-</html>
-"""
+from artifact_store import cached_artifact
+from assets import FONT_PATH
+from pdf_render import cover_page, engine_version, grouped_header, render_pdf, simple_header, table_page
+from pypdf import PdfReader, PdfWriter
+from report_jobs import job_kind, queue_button
+
+BOOK_FILE_NAME = "आरोग्य-नोंदवही-संग्रह.pdf"
+# Books this long render their registers in parallel processes; below it, merging the
+# parts with pypdf costs more than the parallel render saves
+PARALLEL_MIN_PAGES = 1000
+
+log = logging.getLogger(__name__)
+
+MONTH_SUBS = ["नमुना", "निष्कर्ष"]
+CHILD_SUBS = ["मुले", "मुली"]
+EYE_SUBS = ["उजवा", "डावा"]
+
+
+def _pani_page(lead, months, widths, tail, heading):
+    return table_page(heading, widths, grouped_header(lead, months, MONTH_SUBS, tail))
+
+
+# ==========================
+# 📚 Register definitions
+# ==========================
+# Every set of a register repeats its "pages"; the cover is printed once.
+REGISTERS = [
+    {"name": "पाणी नमुने तपासणी रजिस्टर", "cover": "पाणी नमुने तपासणी\nरजिस्टर", "cover_size": 55, "cover_top": 200,
+     "pages": [
+         _pani_page(["अ.क्र.", "गाव", "UID", "स्रोत"], ["एप्रिल", "मे"], [20, 82, 50, 110, 42, 42, 42, 42], [],
+                    "पाणी नमुने तपासणी रजिस्टर- एप्रिल/मे"),
+         _pani_page([], ["जून", "जुलै", "ऑगस्ट", "सप्टेंबर"], [42] * 8 + [84], ["शेरा"],
+                    "पाणी नमुने तपासणी रजिस्टर- जून ते सप्टेंबर"),
+         _pani_page(["अ.क्र.", "गाव", "UID", "स्रोत"], ["ऑक्टोबर", "नोव्हेंबर"], [20, 82, 50, 110, 42, 42, 42, 42], [],
+                    "पाणी नमुने तपासणी रजिस्टर- ऑक्टोबर/नोव्हेंबर"),
+         _pani_page([], ["डिसेंबर", "जानेवारी", "फेब्रुवारी", "मार्च"], [42] * 8 + [84], ["शेरा"],
+                    "पाणी नमुने तपासणी रजिस्टर- डिसेंबर ते मार्च"),
+     ]},
+    {"name": "मिठ नमुने तपासणी रजिस्टर", "cover": "मिठ नमुने तपासणी\nरजिस्टर", "cover_size": 55, "cover_top": 200,
+     "pages": [
+         table_page("मिठ नमुने तपासणी रजिस्टर", [25, 110, 110, 85, 120],
+                    simple_header(["अ.क्र.", "गावाचे नाव", "दुकानदाराचे नाव", "मोबाईल नंबर", "कंपनीचे नाव"])),
+         table_page("मिठ नमुने तपासणी रजिस्टर", [53, 63, 63, 80, 80, 100],
+                    simple_header(["Batch Number", "Manuf. दिनांक", "Expiry दिनांक", "तपासणीसाठी घेतलेला दिनांक",
+                                   "तपासणीसाठी दिलेला दिनांक", "शेरा"])),
+     ]},
+    {"name": "AFP रुग्ण नोंद रजिस्टर", "cover": "AFP रुग्ण नोंद\nरजिस्टर", "cover_size": 55, "cover_top": 200,
+     "pages": [
+         table_page("AFP रुग्ण नोंद रजिस्टर", [20, 165, 35, 35, 40, 40, 95],
+                    simple_header(["अ.क्र.", "नाव", "लिंग", "वय", "पूर्ण लसीकरण", "संपूर्ण लसीकरण",
+                                   "कोणत्या भागास लुळेपणा"])),
+         table_page("AFP रुग्ण नोंद रजिस्टर", [100, 50, 100, 50, 50, 90],
+                    simple_header(["पत्ता", "दिनांक", "दवाखान्याचे नाव", "Stool Sample घे.दिनांक",
+                                   "Stool Sample त.दिनांक", "निष्कर्ष"])),
+     ]},
+    {"name": "गप्पी मासे पैदास केंद्र माहिती", "cover": "गप्पी मासे पैदास केंद्र\nमाहिती", "cover_size": 50,
+     "cover_top": 220,
+     "pages": [
+         table_page("गप्पी मासे पैदास केंद्र माहिती", [30, 123, 173, 60, 60],
+                    simple_header(["अ.क्र.", "गावाचे नाव", "गप्पी मासे सोडल्याचे ठिकाण", "कायम", "हंगामी"])),
+     ]},
+    {"name": "डास उत्पत्ती ठिकाणांची माहिती", "cover": "डास उत्पत्ती ठिकाणांची\nमाहिती", "cover_size": 50,
+     "cover_top": 220,
+     "pages": [
+         table_page("डास उत्पत्ती ठिकाणांची माहिती", [20, 87, 235, 50, 50],
+                    simple_header(["अ.क्र.", "गावाचे नाव", "डास उत्पत्तीचे ठिकाण", "कायम", "हंगामी"])),
+     ]},
+    {"name": "शाळेतील मुलामुलींची पटसंख्या", "cover": "शाळेतील मुलामुलींची पटसंख्या", "cover_size": 55,
+     "cover_top": 180,
+     "pages": [
+         table_page("शाळेतील मुलामुलींची पटसंख्या (पान १)", [20, 75, 100] + [19] * 10,
+                    grouped_header(["अ.क्र.", "गावाचे नाव", "शाळेचे नाव"], ["१ ली", "२ री", "३ री", "४ थी", "५ वी"],
+                                   CHILD_SUBS),
+                    rows=25, title_size=18, line_width=0.8),
+         table_page("शाळेतील मुलामुलींची पटसंख्या (पान २)", [22] * 14 + [34, 34],
+                    grouped_header([], ["६ वी", "७ वी", "८ वी", "९ वी", "१० वी", "११ वी", "१२ वी", "एकूण"],
+                                   CHILD_SUBS),
+                    rows=25, title_size=18, line_width=0.8),
+     ]},
+    {"name": "अंगणवाडी मुलामुलींची पटसंख्या", "cover": "अंगणवाडी मुलामुलींची\nपटसंख्या", "cover_size": 46,
+     "cover_top": 180,
+     "pages": [
+         table_page("अंगणवाडी मुलामुलींची पटसंख्या", [25, 80, 90] + [19] * 8 + [20, 20],
+                    grouped_header(["अ.क्र.", "गावाचे नाव", "अंगणवाडीचे नाव"],
+                                   ["० – १ वर्ष", "१ – २ वर्ष", "२ – ३ वर्ष", "३ – ६ वर्ष", "एकूण"], CHILD_SUBS),
+                    rows=25, title_size=15, line_width=0.8),
+     ]},
+    {"name": "संशयित कुष्ठरुग्ण नोंदवही", "cover": "संशयित कुष्ठरुग्ण\nनोंदवही", "cover_size": 50, "cover_top": 220,
+     "pages": [
+         table_page("संशयित कुष्ठरुग्ण नोंदवही", [30, 180, 205, 40],
+                    simple_header(["अ.क्र.", "गावाचे नाव", "संशयित कुष्ठरुग्णाचे नाव", "वय"])),
+         table_page("संशयित कुष्ठरुग्ण नोंदवही", [40, 220, 215], simple_header(["लिंग", "लक्षणे", "निदान"])),
+     ]},
+    {"name": "O.T. चाचणी रजिस्टर", "cover": "O.T. चाचणी रजिस्टर", "cover_size": 50, "cover_top": 200,
+     "pages": [
+         table_page("O.T. चाचणी रजिस्टर", [20, 55, 170, 40, 25, 25, 105],
+                    grouped_header(["अ.क्र.", "दिनांक", "O.T. चाचणी घेतल्याचे ठिकाण", "वेळ"], ["निष्कर्ष"],
+                                   ["+ve", "-ve"], ["केलेली कार्यवाही"]),
+                    title_size=18),
+     ]},
+    {"name": "मोतीबिंदू शस्त्रक्रिया नोंदवही", "cover": "मोतीबिंदू शस्त्रक्रिया\nनोंदवही", "cover_size": 50,
+     "cover_top": 200,
+     "pages": [
+         table_page("मोतीबिंदू शस्त्रक्रिया नोंदवही", [20, 65, 115, 20, 20, 20, 20, 115, 40],
+                    grouped_header(["अ.क्र.", "गावाचे नाव", "शस्त्रक्रिया झालेला रुग्ण", "वय", "लिंग"], ["डोळा"],
+                                   EYE_SUBS, ["शस्त्रक्रिया झालेलं ठिकाण", "दिनांक"]),
+                    title_size=18, font_size=11),
+     ]},
+    {"name": "संशयित मोतीबिंदू रुग्ण नोंदवही", "cover": "संशयित मोतीबिंदू रुग्ण\nनोंदवही", "cover_size": 48,
+     "cover_top": 200,
+     "pages": [
+         table_page("संशयित मोतीबिंदू रुग्ण नोंदवही", [25, 90, 175, 35, 35, 35, 35],
+                    grouped_header(["अ.क्र.", "गावाचे नाव", "संशयित मोतीबिंदू रुग्णाचे नाव", "वय", "लिंग"], ["डोळा"],
+                                   EYE_SUBS),
+                    title_size=18, font_size=11),
+     ]},
+    {"name": "कुष्ठरुग्ण नोंदवही", "cover": "कुष्ठरुग्ण नोंदवही", "cover_size": 52, "cover_top": 200,
+     "pages": [
+         table_page("कुष्ठरुग्ण नोंदवही - रुग्ण माहिती", [20, 70, 145, 25, 25, 80, 70],
+                    simple_header(["अ.क्र.", "गावाचे नाव", "कुष्ठरुग्णाचे संपूर्ण नाव", "वय", "लिंग", "मो. नंबर",
+                                   "निदान"])),
+         table_page("कुष्ठरुग्ण नोंदवही - उपचार माहिती (पान २)", [40, 40, 40, 30, 30, 50, 130, 70],
+                    grouped_header(["चालू दिनांक"], ["उपचार"], ["सुरु", "समाप्त"],
+                                   ["P.B.", "M.B.", "उपचार कालावधी", "उपचार देणाऱ्याचे नाव व संपर्क क्रमांक", "शेरा"]),
+                    title_size=18, font_size=10),
+     ]},
+    {"name": "T.C.L नमुना तपासणी नोंदवही", "cover": "T.C.L नमुना तपासणी\nनोंदवही", "cover_size": 50,
+     "cover_top": 200,
+     "pages": [
+         table_page("T.C.L नमुना तपासणी नोंदवही", [25, 115, 150, 85, 70],
+                    simple_header(["अ.क्र.", "ग्रामपंचायतीचे नाव", "TCL उत्पादनाचे नाव", "उत्पादन Batch Number",
+                                   "उत्पादन दिनांक"])),
+         table_page("T.C.L नमुना तपासणी नोंदवही", [25, 63, 63, 63, 80, 150],
+                    simple_header(["अ.क्र.", "मुदत बाह्य दिनांक", "नमुना घेतल्याचा दि.", "तपासणीसाठी पाठवलेला दि.",
+                                   "निष्कर्ष", "शेरा"])),
+     ]},
+    {"name": "संशयित क्षयरुग्ण नोंदवही", "cover": "संशयित क्षयरुग्ण\nनोंदवही", "cover_size": 50, "cover_top": 200,
+     "pages": [
+         table_page("संशयित क्षयरुग्ण नोंदवही (पान १)", [20, 100, 160, 30, 30, 95],
+                    simple_header(["अ.क्र.", "गावाचे नाव", "संशयित क्षयरुग्णाचे नाव", "लिंग", "वय", "मोबाईल नंबर"])),
+         table_page("संशयित क्षयरुग्ण नोंदवही (पान २)", [60, 60, 60, 60, 60, 150],
+                    grouped_header(["दिनांक"], ["नमुना"], ["घेतलेला दिनांक", "पाठवलेला दिनांक"],
+                                   ["Lab No", "निष्कर्ष", "शेरा"]),
+                    rows=27, title_size=18, font_size=10),
+     ]},
+    {"name": "उपचाराखालील क्षयरुग्ण नोंदवही", "cover": "उपचाराखालील क्षयरुग्ण\nनोंदवही", "cover_size": 50,
+     "cover_top": 200,
+     "pages": [
+         table_page("उपचाराखालील क्षयरुग्ण नोंदवही (पान १)", [30, 30, 80, 140, 25, 25, 30, 64],
+                    simple_header(["मासिक", "वार्षिक", "गावाचे नाव", "क्षयरुग्णाचे नाव", "लिंग", "वय", "वजन",
+                                   "Start of Treatment"])),
+         table_page("उपचाराखालील क्षयरुग्ण नोंदवही (पान २)", [40, 50, 40, 40, 75, 85, 100],
+                    simple_header(["थुंकी", "एक्स-रे", "IP", "CP", "End of Treatment", "Mobile Number", "शेरा"])),
+     ]},
+]
+
+
+# ==========================
+# 📖 Register book
+# ==========================
+def book_index(register_sets):
+    """[(name, first page, last page)] for the registers with at least one set.
+
+    Cover(1), Index(2), the first register cover starts at 3.
+    """
+    index = []
+    current_page = 3
+    for reg in REGISTERS:
+        sets = register_sets.get(reg["name"], 0)
+        if sets > 0:
+            total_pages = 1 + sets * len(reg["pages"])
+            index.append((reg["name"], current_page, current_page + total_pages - 1))
+            current_page += total_pages
+    return index
+
+
+def index_page(index):
+    return table_page("अनुक्रमणिका", [40, "*", 100], simple_header(["अ.क्र.", "रजिस्टरचे नाव", "पृष्ठ क्रमांक"]),
+                      rows=len(index), body=[[str(i), name, f"{start} ते {end}"]
+                                             for i, (name, start, end) in enumerate(index, start=1)],
+                      title_size=30, align=["center", "left", "center"], line_width=1, row_height=32)
+
+
+BOOK_COVER = cover_page("आरोग्य विभाग\nनोंदवही संग्रह", font_size=50, top=220)
+BOOK_TITLE = "आरोग्य विभाग – नोंदवही संग्रह"
+
+
+def section_pages(reg, sets):
+    """One register: its cover, then ``sets`` copies of its pages."""
+    return [cover_page(reg["cover"], font_size=reg["cover_size"], top=reg["cover_top"])] + reg["pages"] * sets
+
+
+def book_pages(register_sets):
+    """Page specs of the whole book for {register name: number of sets}."""
+    pages = [BOOK_COVER, index_page(book_index(register_sets))]
+    for reg in REGISTERS:
+        sets = register_sets.get(reg["name"], 0)
+        if sets > 0:
+            pages.extend(section_pages(reg, sets))
+    return pages
+
+
+def render_section(name, sets, first_number):
+    """One register as PDF bytes, numbered from ``first_number``.
+
+    Top-level so the book's process pool can run it.
+    """
+    reg = next(r for r in REGISTERS if r["name"] == name)
+    return render_pdf(section_pages(reg, sets), number_from=first_number, first_number=first_number)
+
+
+def book_workers():
+    """Processes for rendering registers in parallel (BOOK_WORKERS secret, default one per core)."""
+    return int(st.secrets.get("BOOK_WORKERS", os.cpu_count() or 1))
+
+
+@st.cache_resource
+def get_book_pool():
+    """Worker processes for the book's sections, started once per server process."""
+    return ProcessPoolExecutor(max_workers=book_workers(), mp_context=multiprocessing.get_context("spawn"))
+
+
+class SectionMismatch(RuntimeError):
+    """A rendered register's page count differs from the numbering planned by book_index()."""
+
+
+def render_sections(register_sets, progress=None):
+    """The book as independently rendered registers, concatenated with pypdf.
+
+    Every register is rendered in its own worker process with page
+    numbers planned by book_index(). The real page counts are checked
+    against that plan before merging; a difference raises SectionMismatch
+    (render_register_book then renders the book in one pass).
+    """
+    args = [(name, register_sets[name], start) for name, start, _ in book_index(register_sets)]
+    futures = [get_book_pool().submit(render_section, *a) for a in args]
+    for done, _ in enumerate(as_completed(futures), start=1):
+        if progress:
+            progress(done / (len(args) + 1))
+    readers = [PdfReader(io.BytesIO(f.result())) for f in futures]
+
+    index = []
+    start = 3
+    for (name, _, planned), reader in zip(args, readers):
+        if start != planned:  # the sections' page numbers were stamped from book_index()
+            raise SectionMismatch(f"{name}: section starts on page {start}, expected {planned}")
+        index.append((name, start, start + len(reader.pages) - 1))
+        start += len(reader.pages)
+
+    writer = PdfWriter()
+    writer.append(PdfReader(io.BytesIO(render_pdf([BOOK_COVER, index_page(index)]))), import_outline=False)
+    for reader in readers:
+        writer.append(reader, import_outline=False)
+    writer.add_metadata({"/Title": BOOK_TITLE})
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def render_register_book(register_sets, progress=None):
+    """The combined register book as PDF bytes.
+
+    On more than one worker, books of PARALLEL_MIN_PAGES or more render
+    their registers in parallel (render_sections). Otherwise – or if the
+    parallel render fails – the book is one render_pdf() pass: with the
+    repeated pages drawn as form XObjects that is faster than merging the
+    parts with pypdf for small books.
+    """
+    index = book_index(register_sets)
+    total_pages = index[-1][2] if index else 2
+    if book_workers() > 1 and len(index) > 1 and total_pages >= PARALLEL_MIN_PAGES:
+        try:
+            return render_sections(register_sets, progress)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time
+            log.exception("register book worker pool broke; rendering in one pass")
+            get_book_pool.clear()
+        except SectionMismatch:
+            log.exception("register book sections do not match their planned numbering; rendering in one pass")
+    return render_pdf(book_pages(register_sets), title=BOOK_TITLE, progress=progress)
+
+
+def register_book_pdf(register_sets, progress=None):
+    # Zero counts are dropped so requests for the same book share one cache entry
+    sets = {name: int(n) for name, n in register_sets.items() if n > 0}
+    return cached_artifact("reg.register_book", engine_version(), sets,
+                           lambda: render_register_book(sets, progress))
+
+
+@job_kind("reg.register_book")
+def register_book_job(params, progress):
+    return register_book_pdf(params["sets"], progress), BOOK_FILE_NAME, "application/pdf"
 
 
 def combined_all_registers():
@@ -721,71 +305,47 @@ def combined_all_registers():
     st.title("सर्व रजिस्टर एकत्रित जनरेटर")
     st.markdown("---")
 
-    # All register definitions
-    all_registers = [
-        {"name": "पाणी नमुने तपासणी रजिस्टर", "pages_per_set": 4},
-        {"name": "मिठ नमुने तपासणी रजिस्टर", "pages_per_set": 2},
-        {"name": "AFP रुग्ण नोंद रजिस्टर", "pages_per_set": 2},
-        {"name": "गप्पी मासे पैदास केंद्र माहिती", "pages_per_set": 1},
-        {"name": "डास उत्पत्ती ठिकाणांची माहिती", "pages_per_set": 1},
-        {"name": "शाळेतील मुलामुलींची पटसंख्या", "pages_per_set": 2},
-        {"name": "अंगणवाडी मुलामुलींची पटसंख्या", "pages_per_set": 1},
-        {"name": "संशयित कुष्ठरुग्ण नोंदवही", "pages_per_set": 2},
-        # Changed to 2 pages for consistency (as per JS implementation)
-        {"name": "O.T. चाचणी रजिस्टर", "pages_per_set": 1},
-        {"name": "मोतीबिंदू शस्त्रक्रिया नोंदवही", "pages_per_set": 1},
-        {"name": "संशयित मोतीबिंदू रुग्ण नोंदवही", "pages_per_set": 1},
-        {"name": "कुष्ठरुग्ण नोंदवही", "pages_per_set": 2},
-        {"name": "T.C.L नमुना तपासणी नोंदवही", "pages_per_set": 2},
-        {"name": "संशयित क्षयरुग्ण नोंदवही", "pages_per_set": 2},
-        {"name": "उपचाराखालील क्षयरुग्ण नोंदवही", "pages_per_set": 2}
-    ]
-
     st.subheader("प्रत्येक रजिस्टरसाठी किती संच हवे ते भरा: 📝")
     st.write("*(प्रत्येक संचात त्या रजिस्टरची सर्व पाने येतील)*")
 
     # Input for each register
     register_sets = {}
     cols = st.columns(3)
-    for idx, reg in enumerate(all_registers):
+    for idx, reg in enumerate(REGISTERS):
         with cols[idx % 3]:
-            sets = st.number_input(
+            register_sets[reg["name"]] = st.number_input(
                 f"**{reg['name']}**",
                 min_value=0,
                 value=7,
                 step=1,
                 key=reg['name'],
-                help=f"प्रत्येक संचात {reg['pages_per_set']} पाने"
+                help=f"प्रत्येक संचात {len(reg['pages'])} पाने"
             )
-            register_sets[reg['name']] = {
-                'sets': sets,
-                'pages_per_set': reg['pages_per_set']
-            }
 
     st.markdown("---")
 
-    # Create empty data
-    all_cols = create_all_columns()
-    df = pd.DataFrame({c: [""] * 25 for c in all_cols})
-    # Data is prepared for JSON injection (No special encoding needed if the data is simple/small)
-    data_json = json.dumps(df.to_dict(orient="records"), ensure_ascii=False)
-    BASE_DIR = Path(__file__).resolve().parent
-    font_path = BASE_DIR / "fonts" / "NotoSerifDevanagari-VariableFont_wdth,wght.ttf"
-    # Load font
-    #font_path = Path("fonts/NotoSerifDevanagari-VariableFont_wdth,wght.ttf")
-    if not font_path.exists():
+    if not FONT_PATH.exists():
         st.error(
             "❌ **फॉन्ट गहाळ आहे:** `fonts/NotoSerifDevanagari-VariableFont_wdth,wght.ttf` ही फाईल तुमच्या Streamlit ॲपच्या 'fonts' फोल्डरमध्ये असणे आवश्यक आहे.")
         return
-    # Base64 Encode the font file
-    font_b64 = base64.b64encode(font_path.read_bytes()).decode()
 
-    # Generate HTML
-    full_html = generate_combined_html(register_sets, data_json, font_b64)
+    index = book_index(register_sets)
+    total_pages = index[-1][2] if index else 2
+    st.caption(f"एकूण पाने: {total_pages}")
 
-    # Display the HTML component
-    components.html(full_html, height=800, scrolling=True)
+    # Rendered on the server, so the time no longer depends on the phone
+    c1, c2 = st.columns(2)
+    with c1:
+        if st.button("📄 PDF तयार करा"):
+            with st.spinner("PDF तयार होत आहे..."):
+                pdf = register_book_pdf(register_sets)
+            st.download_button("⬇️ Download PDF", pdf, file_name=BOOK_FILE_NAME, mime="application/pdf",
+                               on_click="ignore")
+    with c2:
+        # Big books: render in the background and download later from "My reports"
+        sets = {name: int(n) for name, n in register_sets.items() if n > 0}
+        queue_button("reg.register_book", {"sets": sets}, f"नोंदवही संग्रह ({total_pages} पाने)")
 
 
 if __name__ == "__main__":
-    combined_all_registers()
\ No newline at end of file
+    combined_all_registers()
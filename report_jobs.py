@@ -0,0 +1,296 @@
+# report_jobs.py
+"""
+Background report jobs.
+
+Big outputs (the register book with many sets, the village-wide family
+PDF, polio lists for every booth) take long enough that rendering them in
+the Streamlit script thread freezes the page, and the result is lost if
+the MPW navigates away. A page instead queues a job:
+
+    queue_button("reg.register_book", {"sets": sets}, "नोंदवही संग्रह")
+
+Jobs run on a small per-process thread pool (REPORT_WORKERS). Each one is
+a row in report_jobs (queued → running → done / failed) with its
+progress, so "📂 My reports" can show it from any session and offer the
+file once it is done. The output is stored in report_job_files, so any
+replica can serve it until the user deletes the job.
+
+Every process renews a lease (heartbeat_at) on the jobs it owns every
+HEARTBEAT_SECONDS. A queued / running job whose lease is older than
+LEASE_SECONDS was left by a dead process – replicas get a new hostname on
+every restart, so any runner re-claims it (up to MAX_ATTEMPTS, then marks
+it failed). Stale jobs do not count towards MAX_ACTIVE_PER_USER and the
+user can delete them.
+
+Generators register themselves with @job_kind and take
+``(params, progress)``, where ``progress(fraction)`` may be called as
+often as convenient – it is written to the database at most once per
+PROGRESS_INTERVAL seconds. They return (bytes, file name, mime).
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb
+from db_config import get_connection
+
+log = logging.getLogger(__name__)
+
+MAX_ACTIVE_PER_USER = 3
+MAX_ATTEMPTS = 2
+PROGRESS_INTERVAL = 1.0
+HEARTBEAT_SECONDS = 30
+LEASE_SECONDS = 120
+POLL_SECONDS = 3
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+JOB_KINDS = {}
+
+
+class JobLimitError(Exception):
+    """The user already has MAX_ACTIVE_PER_USER jobs queued or running."""
+
+
+def job_kind(kind):
+    """Register ``fn(params, progress) -> (bytes, file_name, mime)`` as job ``kind``."""
+    def register(fn):
+        JOB_KINDS[kind] = fn
+        return fn
+    return register
+
+
+def _execute(query, params=()):
+    with get_connection() as conn:
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall() if cur.description else []
+        conn.commit()
+    return rows
+
+
+class JobRunner:
+    """Bounded worker pool that runs report_jobs rows and records their outcome."""
+
+    def __init__(self, workers):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-job")
+        self._lock = threading.Lock()
+        self.running = 0
+        self._reclaim()
+        threading.Thread(target=self._heartbeat, name="report-job-heartbeat", daemon=True).start()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            try:
+                _execute("""
+                    UPDATE report_jobs SET heartbeat_at = now()
+                    WHERE worker = %s AND status IN ('queued', 'running')
+                """, (WORKER_ID,))
+                self._reclaim()
+            except Exception:
+                log.exception("report job heartbeat failed")
+
+    def _reclaim(self):
+        """Take over jobs whose owner stopped renewing its lease; fail those already retried."""
+        failed = _execute("""
+            UPDATE report_jobs SET status = 'failed', finished_at = now(),
+                                   error = 'रिपोर्ट तयार करणारी प्रक्रिया थांबली – कृपया पुन्हा तयार करा.'
+            WHERE status IN ('queued', 'running') AND attempts >= %s
+              AND heartbeat_at < now() - make_interval(secs => %s)
+            RETURNING id
+        """, (MAX_ATTEMPTS, LEASE_SECONDS))
+        rows = _execute("""
+            UPDATE report_jobs SET worker = %s, status = 'queued', progress = 0, started_at = NULL,
+                                   heartbeat_at = now(), attempts = attempts + 1
+            WHERE id IN (SELECT id FROM report_jobs
+                         WHERE status IN ('queued', 'running') AND kind = ANY(%s)
+                           AND heartbeat_at < now() - make_interval(secs => %s)
+                         FOR UPDATE SKIP LOCKED)
+            RETURNING id, kind, params
+        """, (WORKER_ID, list(JOB_KINDS), LEASE_SECONDS))
+        for row in sorted(rows, key=lambda r: r["id"]):
+            self._executor.submit(self._run, row["id"], row["kind"], row["params"])
+        if rows or failed:
+            log.info("re-claimed %d and failed %d stale report jobs", len(rows), len(failed))
+
+    def submit(self, username, kind, params, title):
+        """Queue a job; returns its id."""
+        if kind not in JOB_KINDS:
+            raise KeyError(f"unknown report job kind: {kind}")
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                # Serialise submissions per user so the limit check cannot race
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"report_jobs:{username}",))
+                cur.execute("""
+                    SELECT count(*) FROM report_jobs
+                    WHERE username = %s AND status IN ('queued', 'running')
+                      AND heartbeat_at >= now() - make_interval(secs => %s)
+                """, (username, LEASE_SECONDS))
+                if cur.fetchone()[0] >= MAX_ACTIVE_PER_USER:
+                    conn.rollback()
+                    raise JobLimitError(f"एका वेळी फक्त {MAX_ACTIVE_PER_USER} रिपोर्ट तयार होऊ शकतात – "
+                                        "आधीचे पूर्ण होईपर्यंत थांबा.")
+                cur.execute("""
+                    INSERT INTO report_jobs (username, kind, title, params, worker)
+                    VALUES (%s, %s, %s, %s, %s) RETURNING id
+                """, (username, kind, title, Jsonb(params), WORKER_ID))
+                job_id = cur.fetchone()[0]
+            conn.commit()
+        self._executor.submit(self._run, job_id, kind, params)
+        return job_id
+
+    def _run(self, job_id, kind, params):
+        # Skip jobs deleted or taken over by another runner while they waited in the queue
+        if not _execute("""
+            UPDATE report_jobs SET status = 'running', started_at = now(), heartbeat_at = now()
+            WHERE id = %s AND worker = %s AND status = 'queued' RETURNING id
+        """, (job_id, WORKER_ID)):
+            return
+        with self._lock:
+            self.running += 1
+        last = [0.0]
+
+        def progress(fraction):
+            now = time.monotonic()
+            if now - last[0] >= PROGRESS_INTERVAL:
+                last[0] = now
+                _execute("UPDATE report_jobs SET progress = %s, heartbeat_at = now() WHERE id = %s AND worker = %s",
+                         (min(float(fraction), 1.0), job_id, WORKER_ID))
+
+        try:
+            data, file_name, mime = JOB_KINDS[kind](params, progress)
+            with get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        UPDATE report_jobs SET status = 'done', progress = 1, file_name = %s,
+                                               mime = %s, size_bytes = %s, finished_at = now()
+                        WHERE id = %s AND worker = %s
+                    """, (file_name, mime, len(data), job_id, WORKER_ID))
+                    if cur.rowcount:  # not re-claimed or deleted meanwhile
+                        cur.execute("""
+                            INSERT INTO report_job_files (job_id, data) VALUES (%s, %s)
+                            ON CONFLICT (job_id) DO UPDATE SET data = EXCLUDED.data
+                        """, (job_id, data))
+                conn.commit()
+        except Exception as e:
+            log.exception("report job %s (%s) failed", job_id, kind)
+            _execute("""
+                UPDATE report_jobs SET status = 'failed', error = %s, finished_at = now()
+                WHERE id = %s AND worker = %s
+            """, (str(e)[:500] or type(e).__name__, job_id, WORKER_ID))
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@st.cache_resource
+def get_runner():
+    return JobRunner(int(st.secrets.get("REPORT_WORKERS", 2)))
+
+
+def user_jobs(username, limit=20):
+    """The user's most recent jobs, newest first."""
+    return _execute("""
+        SELECT id, kind, title, status, progress, file_name, mime, size_bytes, error,
+               created_at, finished_at,
+               status IN ('queued', 'running') AND heartbeat_at < now() - make_interval(secs => %s) AS stale
+        FROM report_jobs WHERE username = %s ORDER BY created_at DESC LIMIT %s
+    """, (LEASE_SECONDS, username, limit))
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def job_file(username, job_id):
+    """Output bytes of a finished job (immutable once written), or None."""
+    rows = _execute("""
+        SELECT f.data FROM report_job_files f JOIN report_jobs j ON j.id = f.job_id
+        WHERE j.id = %s AND j.username = %s
+    """, (job_id, username))
+    return bytes(rows[0]["data"]) if rows else None
+
+
+def delete_job(username, job_id):
+    """Delete a finished job with its file (ON DELETE CASCADE), or cancel one whose lease expired."""
+    _execute("""
+        DELETE FROM report_jobs
+        WHERE id = %s AND username = %s
+          AND (status IN ('done', 'failed') OR heartbeat_at < now() - make_interval(secs => %s))
+    """, (job_id, username, LEASE_SECONDS))
+
+
+# ==========================
+# 🖥️ UI
+# ==========================
+def queue_button(kind, params, title, label="🕒 पार्श्वभूमीत तयार करा", key=None):
+    """Button that queues job ``kind`` for the logged-in user."""
+    if not st.button(label, key=key or f"queue_{kind}"):
+        return None
+    try:
+        job_id = get_runner().submit(st.session_state["user"]["username"], kind, params, title)
+    except JobLimitError as e:
+        st.warning(str(e))
+        return None
+    st.success(f"✅ \"{title}\" रांगेत टाकला (#{job_id}). तयार झाल्यावर 📂 My reports मधून डाउनलोड करा – "
+               "तोपर्यंत दुसरे काम करू शकता.")
+    return job_id
+
+
+STATUS_LABELS = {"queued": "⏳ रांगेत", "running": "⚙️ तयार होत आहे", "done": "✅ तयार", "failed": "❌ अयशस्वी"}
+
+
+def _job_list(username, jobs=None):
+    jobs = user_jobs(username) if jobs is None else jobs
+    if not jobs:
+        st.info("अजून कोणताही रिपोर्ट रांगेत टाकलेला नाही.")
+        return False
+
+    for job in jobs:
+        with st.container(border=True):
+            c1, c2 = st.columns([3, 1])
+            c1.markdown(f"**{job['title']}**  \n#{job['id']} · {job['created_at']:%d-%m-%Y %H:%M}")
+            c2.write("⚠️ थांबले" if job["stale"] else STATUS_LABELS[job["status"]])
+            if job["stale"]:
+                st.caption("हा रिपोर्ट तयार करणारी प्रक्रिया थांबली आहे – थोड्या वेळात पुन्हा सुरू होईल, "
+                           "किंवा 🗑️ ने रद्द करा.")
+            elif job["status"] in ("queued", "running"):
+                st.progress(job["progress"])
+            elif job["status"] == "failed":
+                st.error(job["error"])
+            else:
+                data = job_file(username, job["id"])
+                if data is None:
+                    st.caption("⌛ फाईल सापडली नाही – कृपया पुन्हा तयार करा.")
+                else:
+                    c1.download_button(f"⬇️ {job['file_name']} ({job['size_bytes'] / 1024:.0f} KB)", data,
+                                       file_name=job["file_name"], mime=job["mime"], key=f"job_dl_{job['id']}",
+                                       on_click="ignore")
+            if (job["status"] in ("done", "failed") or job["stale"]) and c2.button("🗑️", key=f"job_del_{job['id']}"):
+                delete_job(username, job["id"])
+                st.rerun()
+    return any(job["status"] in ("queued", "running") for job in jobs)
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _live_job_list(username):
+    """Polls while something is queued or running, then hands back to a full rerun."""
+    if not _job_list(username):
+        st.rerun()
+
+
+def my_reports_page(user):
+    st.header("📂 My reports")
+    st.caption("पार्श्वभूमीत तयार होणारे रिपोर्ट. पान सोडून गेलात तरी काम चालू राहते.")
+    try:
+        get_runner()  # starts this process's heartbeat and picks up stale jobs
+        jobs = user_jobs(user["username"])
+    except Exception as e:
+        st.error(f"Failed to load reports: {e}")
+        return
+    if any(job["status"] in ("queued", "running") for job in jobs):
+        _live_job_list(user["username"])
+    else:
+        _job_list(user["username"], jobs)
@@ -1,19 +1,22 @@
 # reports_and_search.py
-from pathlib import Path
 import streamlit as st
 import pandas as pd
-import base64
+import numpy as np
 import json
-from db_config import get_connection
+from assets import pdf_font, pdfmake_assets_js, pdfmake_script
+from exports import CSV_MIME, export_csv
+from name_search import search_names
+from pdf_render import render_pdf, simple_header, table_pages
+from report_jobs import job_kind, queue_button
+from village_cache import register_frame, report_frame
 from streamlit.components.v1 import html as components_html
 
 
 # ==========================
 # 🔧 Helper Functions
 # ==========================
-def generate_village_report(user, rtype="All Members", mno=None):
-    """Fetch filtered records for a village based on type (All, BP, Sugar, Both)."""
-    conn = get_connection()
+def village_report_query(user, rtype="All Members", mno=None):
+    """Build the filtered village report query (All, BP, Sugar, Both) and its params."""
     q = """
         SELECT f.*, m.family_head
         FROM family_members f
@@ -32,16 +35,38 @@ def generate_village_report(user, rtype="All Members", mno=None):
         q += " AND f.sugar = TRUE"
     elif rtype == "Both (BP + Sugar)":
         q += " AND f.bp = TRUE AND f.sugar = TRUE"
+    return q, params
+
+
+def filter_report(frame, rtype="All Members", mno=None):
+    """Same filters as village_report_query, as boolean masks on the cached frame."""
+    mask = pd.Series(True, index=frame.index)
+    if mno:
+        mno = str(mno).strip()
+        mask &= frame["m_no"] == int(mno) if mno.isdigit() else False
 
-    df = pd.read_sql(q, conn, params=params)
-    conn.close()
-    return df
+    if rtype == "BP Patients":
+        mask &= frame["bp"].fillna(False)
+    elif rtype == "Sugar Patients":
+        mask &= frame["sugar"].fillna(False)
+    elif rtype == "Both (BP + Sugar)":
+        mask &= frame["bp"].fillna(False) & frame["sugar"].fillna(False)
+    return frame[mask]
+
+
+def generate_village_report(user, rtype="All Members", mno=None):
+    """Filtered records for a village based on type (All, BP, Sugar, Both).
+
+    Served from the village's cached joined frame: one DB round-trip per
+    data version, then every filter change is a vectorized mask.
+    """
+    return filter_report(report_frame(user["village"]), rtype, mno)
 
 
 # ==========================
 # 📄 PDF Generation for M No-wise
 # ==========================
-def generate_pdf_make(df, font_b64):
+def generate_pdf_make(df, font_js):
     """Create Marathi Register PDF with inside binding margins and tall rows"""
     import json
 
@@ -63,15 +88,14 @@ def generate_pdf_make(df, font_b64):
 <html>
 <head>
 <meta charset="UTF-8"/>
-<script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/pdfmake.min.js"></script>
-<script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/vfs_fonts.js"></script>
+{pdfmake_script()}
 </head>
 <body>
 
 <button onclick="previewPDF()" style="padding:12px 24px; background:#4CAF50; color:white; border:none; border-radius:4px; cursor:pointer; font-weight:bold;">Generate High-Padding Register</button>
 
 <script>
-pdfMake.vfs["Marathi.ttf"] = "{font_b64}";
+{font_js}
 pdfMake.fonts = {{
   MarathiFont: {{
     normal:"Marathi.ttf", bold:"Marathi.ttf", italics:"Marathi.ttf", bolditalics:"Marathi.ttf"
@@ -195,45 +219,48 @@ function previewPDF(){{ pdfMake.createPdf(docDefinition).open(); }}
 # ==========================
 # 📄 Village-wise PDF (all members)
 # ==========================
-def generate_village_pdf(user, font_b64):
+def _text(series):
+    """Column as a list of strings, nulls as empty strings."""
+    return series.astype("string").fillna("").tolist()
+
+
+def village_payload(df):
+    """Columnar PDF payload ({column: [values]}) built with vectorized operations."""
+    def yes_no(col):
+        flags = df[col].fillna(False).astype(bool) if col in df else pd.Series(False, index=df.index)
+        return np.where(flags, "होय", "नाही").tolist()
+
+    def text(col):
+        return _text(df[col]) if col in df else [""] * len(df)
+
+    return {
+        "m_no": text("m_no"),
+        "member_name": text("member_name"),
+        "age": text("age"),
+        "gender": text("gender"),
+        "bp": yes_no("bp"),
+        "sugar": yes_no("sugar"),
+        "other": text("other"),
+        "mobile": text("mobile"),
+    }
+
+
+def generate_village_pdf(user, font_js):
     """Generate village-wise PDF with all family members grouped by M No."""
-    conn = get_connection()
-    df = pd.read_sql("""
-        SELECT f.*, m.m_no
-        FROM family_members f
-        JOIN m_no_register m
-        ON f.m_no = m.m_no AND f.village_name = m.village_name
-        WHERE f.village_name = %s
-        ORDER BY f.m_no, f.member_name
-    """, conn, params=[user["village"]])
-    conn.close()
+    df = report_frame(user["village"])
 
     if df.empty:
         st.warning("⚠️ No family data found for this village.")
         return
 
-    data_json = []
-    for _, row in df.iterrows():
-        data_json = []
-        for row in df.itertuples(index=False):
-            data_json.append({
-                "m_no": str(row.m_no),
-                "member_name": str(row.member_name),
-                "age": str(getattr(row, 'age', '')),
-                "gender": str(getattr(row, 'gender', '')),
-                "bp": "होय" if getattr(row, 'bp', False) else "नाही",
-                "sugar": "होय" if getattr(row, 'sugar', False) else "नाही",
-                "other": str(getattr(row, 'other', '')),
-                "mobile": str(getattr(row, 'mobile', ''))
-            })
+    data_json = village_payload(df.sort_values(["m_no", "member_name"]))
 
     components_html(
         f"""
         <html>
         <head>
             <meta charset='utf-8' />
-            <script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/pdfmake.min.js"></script>
-            <script src="https://cdnjs.cloudflare.com/ajax/libs/pdfmake/0.1.72/vfs_fonts.js"></script>
+            {pdfmake_script()}
         </head>
         <body>
             <div style="margin-bottom:10px;">
@@ -242,13 +269,13 @@ def generate_village_pdf(user, font_b64):
             </div>
             <script>
                 const data = {json.dumps(data_json, ensure_ascii=False)};
-                pdfMake.vfs["CustomFont.ttf"] = "{font_b64}";
+                {font_js}
                 pdfMake.fonts = {{
                   MarathiFont: {{
-                    normal: "CustomFont.ttf",
-                    bold: "CustomFont.ttf",
-                    italics: "CustomFont.ttf",
-                    bolditalics: "CustomFont.ttf"
+                    normal: "Marathi.ttf",
+                    bold: "Marathi.ttf",
+                    italics: "Marathi.ttf",
+                    bolditalics: "Marathi.ttf"
                   }}
                 }};
                 const bodyData = [
@@ -263,18 +290,18 @@ def generate_village_pdf(user, font_b64):
                         {{ text: 'मोबाईल', bold:true, alignment:'center' }}
                     ]
                 ];
-                data.forEach(d => {{
+                for (let i = 0; i < data.m_no.length; i++) {{
                     bodyData.push([
-                        {{ text: d['m_no'], alignment:'center' }},
-                        {{ text: d['member_name'] }},
-                        {{ text: d['age'], alignment:'center' }},
-                        {{ text: d['gender'], alignment:'center' }},
-                        {{ text: d['bp'], alignment:'center' }},
-                        {{ text: d['sugar'], alignment:'center' }},
-                        {{ text: d['other'] }},
-                        {{ text: d['mobile'] }}
+                        {{ text: data.m_no[i], alignment:'center' }},
+                        {{ text: data.member_name[i] }},
+                        {{ text: data.age[i], alignment:'center' }},
+                        {{ text: data.gender[i], alignment:'center' }},
+                        {{ text: data.bp[i], alignment:'center' }},
+                        {{ text: data.sugar[i], alignment:'center' }},
+                        {{ text: data.other[i] }},
+                        {{ text: data.mobile[i] }}
                     ]);
-                }});
+                }}
                 const docDefinition = {{
                   defaultStyle: {{ font: "MarathiFont" }},
                   pageMargins: [30,50,30,40],
@@ -300,6 +327,30 @@ def generate_village_pdf(user, font_b64):
     )
 
 
+VILLAGE_PDF_COLUMNS = ["M-No", "सदस्याचे नाव", "वय", "लिंग", "BP", "Sugar", "इतर आजार", "मोबाईल"]
+VILLAGE_PDF_WIDTHS = [30, "*", 22, 28, 24, 30, 60, 62]
+VILLAGE_PDF_ROWS = 30
+
+
+def render_village_pdf(village, progress=None):
+    """Village-wise family members report rendered on the server (same columns as the pdfMake one)."""
+    df = report_frame(village)
+    data = village_payload(df.sort_values(["m_no", "member_name"]))
+    body = [list(row) for row in zip(*(data[k] for k in data))]
+    pages = table_pages(f"Village-wise Family Members Report - {village}", VILLAGE_PDF_WIDTHS,
+                        simple_header(VILLAGE_PDF_COLUMNS), body, VILLAGE_PDF_ROWS, title_size=12,
+                        font_size=9, header_size=10, row_height=22,
+                        align=["center", "left", "center", "center", "center", "center", "left", "left"],
+                        margins=(30, 40, 30, 40))
+    return render_pdf(pages, number_from=1, title=f"Village-wise Family Members Report - {village}",
+                      progress=progress)
+
+
+@job_kind("reports_and_search.village_pdf")
+def village_pdf_job(params, progress):
+    return render_village_pdf(params["village"], progress), "village_family_report.pdf", "application/pdf"
+
+
 # ==========================
 # Main Reports Page
 # ==========================
@@ -316,33 +367,44 @@ def reports_page():
         rtype = st.radio("Select Report Type", ["All Members", "BP Patients", "Sugar Patients", "Both (BP + Sugar)"],
                          horizontal=True)
         mno = st.text_input("Search by M No (optional)")
+
+        name = st.text_input("🔍 नावाने शोधा (सदस्य / कुटुंब प्रमुख)")
+        if name.strip():
+            for target in ["members", "family heads"]:
+                matches = search_names(target, name, user["village"])
+                st.markdown(f"**{target.title()}** – {len(matches)} matches")
+                if not matches.empty:
+                    st.dataframe(matches, use_container_width=True, hide_index=True)
+            st.divider()
+
         df = generate_village_report(user, rtype, mno)
         st.write(f"Total Records: {len(df)}")
         if df.empty:
             st.warning("⚠️ No data found.")
         else:
             st.dataframe(df, use_container_width=True, hide_index=True)
-            csv = df.to_csv(index=False).encode("utf-8")
-            st.download_button("⬇️ Download CSV", csv, file_name="village_report.csv", mime="text/csv")
+            # Built only on request, streamed from COPY instead of df.to_csv()
+            if st.button("📥 Prepare CSV"):
+                q, params = village_report_query(user, rtype, mno)
+                st.download_button("⬇️ Download CSV", export_csv(q, params),
+                                   file_name="village_report.csv", mime=CSV_MIME, on_click="ignore")
 
     # -------------------------
     # Tab 2: PDF Reports
     # -------------------------
     with tab2:
         st.markdown("### 📄 Generate PDF Reports")
-        BASE_DIR = Path(__file__).resolve().parent
-        font_path = BASE_DIR / "fonts" / "NotoSerifDevanagari-VariableFont_wdth,wght.ttf"
-        with open(font_path, "rb") as f:
-            font_b64 = base64.b64encode(f.read()).decode()
+        font_js = pdfmake_assets_js(fonts={"Marathi.ttf": pdf_font()})
 
         choice = st.radio("Select PDF Type", ["M No-wise PDF", "Village-wise PDF"], horizontal=True)
 
         if st.button("📄 Generate PDF"):
             if choice == "M No-wise PDF":
-                conn = get_connection()
-                df_font = pd.read_sql("SELECT * FROM m_no_register WHERE village_name=%s ORDER BY m_no", conn,
-                                      params=[user["village"]])
-                conn.close()
-                generate_pdf_make(df_font, font_b64)
+                df_font = register_frame(user["village"])
+                generate_pdf_make(df_font, font_js)
             else:  # Village-wise PDF
-                generate_village_pdf(user, font_b64)
+                generate_village_pdf(user, font_js)
+        if choice == "Village-wise PDF":
+            # Whole village on the server, downloaded later from "My reports"
+            queue_button("reports_and_search.village_pdf", {"village": user["village"]},
+                         f"Village-wise PDF – {user['village']}")
@@ -0,0 +1,71 @@
+# rollups.py
+"""
+Read side of the trigger-maintained aggregates from migration 6.
+
+household_counts holds the real number of family_members rows per
+household; village_ncd_rollup holds members / BP / Sugar / both per
+(village, gender, age band). Both are kept current by statement-level
+triggers on family_members, so these reads touch a handful of rows
+instead of aggregating family_members, and are cached per village in
+village_cache like the other register reads.
+"""
+import pandas as pd
+import streamlit as st
+from db_config import get_connection
+from village_cache import get_cache
+
+# Keep in step with the mpw_age_band() SQL function
+AGE_BANDS = ["0-17", "18-29", "30-39", "40-49", "50-59", "60+", "Unknown"]
+MEASURES = ["members", "bp", "sugar", "bp_sugar"]
+
+
+def _read(query, params):
+    with get_connection() as conn:
+        return pd.read_sql(query, conn, params=params)
+
+
+def village_rollup(village):
+    """Rollup rows for one village: gender, age_band, members, bp, sugar, bp_sugar."""
+    return get_cache().get("ncd_rollup", village, lambda: _read(
+        """SELECT gender, age_band, members, bp, sugar, bp_sugar
+           FROM village_ncd_rollup WHERE village_name = %s AND members > 0""", (village,)
+    ))
+
+
+def village_totals(village):
+    """{"members", "bp", "sugar", "bp_sugar"} totals for the village."""
+    frame = village_rollup(village)
+    return {m: int(frame[m].sum()) if not frame.empty else 0 for m in MEASURES}
+
+
+def household_counts(village):
+    """Actual member count per M No (households without members are absent)."""
+    return get_cache().get("household_counts", village, lambda: _read(
+        """SELECT m_no, members FROM household_counts
+           WHERE village_name = %s AND members > 0 ORDER BY m_no""", (village,)
+    ))
+
+
+def actual_members(village, m_no):
+    counts = household_counts(village)
+    match = counts.loc[counts["m_no"] == m_no, "members"]
+    return int(match.iloc[0]) if not match.empty else 0
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def district_rollup():
+    """Rollup rows for every village with its PHC (admin views, refreshed every 30 s)."""
+    return _read(
+        """SELECT r.village_name, coalesce(p.phc_name, 'Unassigned') AS phc_name,
+                  r.gender, r.age_band, r.members, r.bp, r.sugar, r.bp_sugar
+           FROM village_ncd_rollup r
+           LEFT JOIN village_phc p USING (village_name)
+           WHERE r.members > 0""", None
+    )
+
+
+def ordered_bands(frame):
+    """Sort by age band in band order rather than alphabetically."""
+    return frame.assign(
+        age_band=pd.Categorical(frame["age_band"], AGE_BANDS, ordered=True)
+    ).sort_values("age_band")
@@ -0,0 +1,95 @@
+# single_flight.py
+"""
+Single-flight deduplication of concurrent identical work.
+
+On reporting day many MPWs ask for the same blank register book or
+diary within minutes. The first request for a key runs the render;
+requests for the same key arriving while it runs wait for that render
+and share its result (or its exception) instead of starting their own:
+
+    value = get_flights().do(key, render, label="reg.register_book")
+
+Only an Exception is shared. If the leader's run is interrupted (a
+Streamlit rerun / stop, KeyboardInterrupt) the flight is released and
+one of the waiters runs ``fn`` itself.
+
+Nothing is kept once the call finishes – caching the result is
+artifact_store's job, this only collapses overlapping calls.
+"""
+import threading
+from collections import Counter
+
+import streamlit as st
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.abandoned = False
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-safe {key: in-flight call} registry with coalescing counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = Counter()
+        self.coalesced = Counter()
+
+    def do(self, key, fn, label=None):
+        """Run ``fn()`` once per key at a time; concurrent callers get the same result."""
+        label = label or "other"
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.executed[label] += 1
+                else:
+                    call.waiters += 1
+                    self.coalesced[label] += 1
+
+            if leader:
+                break
+            call.done.wait()
+            if call.abandoned:  # the leader was interrupted – try to lead ourselves
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            # Not the waiters' business (e.g. the leader's session was rerun)
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """[{generator, renders, coalesced}] – coalesced requests never started a render."""
+        with self._lock:
+            labels = sorted(set(self.executed) | set(self.coalesced))
+            return [{"generator": label, "renders": self.executed[label], "coalesced": self.coalesced[label]}
+                    for label in labels]
+
+
+@st.cache_resource
+def get_flights():
+    return SingleFlight()
@@ -0,0 +1,6 @@
+# tests/conftest.py
+# The app's modules live at the repository root (streamlit run main.py).
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
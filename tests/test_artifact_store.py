@@ -0,0 +1,84 @@
+# tests/test_artifact_store.py
+import os
+
+from artifact_store import ArtifactStore, artifact_key
+
+
+def test_key_ignores_dict_order_but_not_versions():
+    key = artifact_key("reg.register_book", 1, {"a": 1, "b": 2})
+    assert key == artifact_key("reg.register_book", 1, {"b": 2, "a": 1})
+    assert key != artifact_key("reg.register_book", 2, {"a": 1, "b": 2})
+    assert key != artifact_key("reg.register_book", 1, {"a": 1, "b": 2}, data_version=3)
+
+
+def test_memory_disk_and_miss_counters(tmp_path):
+    store = ArtifactStore(tmp_path)
+    assert store.get("k") is None
+    store.put("k", b"pdf")
+    assert store.get("k") == b"pdf"
+
+    restarted = ArtifactStore(tmp_path)
+    assert restarted.get("k") == b"pdf"
+    assert restarted.get("k") == b"pdf"
+    assert (store.stats()["misses"], store.stats()["memory_hits"]) == (1, 1)
+    assert (restarted.stats()["disk_hits"], restarted.stats()["memory_hits"]) == (1, 1)
+
+
+def test_disk_evicts_least_recently_used(tmp_path):
+    store = ArtifactStore(tmp_path, max_disk_bytes=30, max_memory_bytes=0)
+    store.put("a", b"a" * 10)
+    store.put("b", b"b" * 10)
+    store.put("c", b"c" * 10)
+    assert store.get("a") == b"a" * 10  # a is now the most recently used
+    store.put("d", b"d" * 10)
+
+    assert store.get("b") is None
+    assert not (tmp_path / "b" / "b.bin").exists()
+    assert [store.get(k) is not None for k in "acd"] == [True, True, True]
+    stats = store.stats()
+    assert (stats["files"], stats["disk_bytes"], stats["evictions"]) == (3, 30, 1)
+
+
+def test_an_entry_larger_than_the_disk_limit_is_kept_alone(tmp_path):
+    store = ArtifactStore(tmp_path, max_disk_bytes=10, max_memory_bytes=0)
+    store.put("a", b"a" * 5)
+    store.put("big", b"x" * 50)
+    assert store.get("a") is None
+    assert store.get("big") == b"x" * 50
+    assert store.stats()["files"] == 1
+
+
+def test_memory_tier_is_bounded_and_skips_large_items(tmp_path):
+    store = ArtifactStore(tmp_path, max_memory_bytes=20)
+    store.put("a", b"a" * 10)
+    store.put("b", b"b" * 10)
+    store.put("c", b"c" * 10)  # pushes a out of memory
+    store.put("big", b"x" * 21)
+    stats = store.stats()
+    assert (stats["memory_entries"], stats["memory_bytes"]) == (2, 20)
+    assert store.get("a") == b"a" * 10
+    assert store.stats()["disk_hits"] == 1
+
+
+def test_restart_uses_mtime_as_lru_order(tmp_path):
+    store = ArtifactStore(tmp_path)
+    for i, key in enumerate(["old", "new"]):
+        store.put(key, b"0123456789")
+        os.utime(tmp_path / key[:2] / f"{key}.bin", (1000 + i, 1000 + i))
+
+    restarted = ArtifactStore(tmp_path, max_disk_bytes=20)
+    restarted.put("next", b"0123456789")
+    assert restarted.get("old") is None
+    assert restarted.get("new") is not None
+
+
+def test_get_or_create_builds_once_and_clear_removes_files(tmp_path):
+    store = ArtifactStore(tmp_path)
+    builds = []
+    for _ in range(2):
+        assert store.get_or_create("k", lambda: builds.append(1) or b"pdf") == b"pdf"
+    assert len(builds) == 1
+
+    store.clear()
+    assert store.stats()["files"] == 0
+    assert list(tmp_path.glob("*/*.bin")) == []
@@ -0,0 +1,84 @@
+# tests/test_bulk_import.py
+import pandas as pd
+
+from bulk_import import EXISTING_MNO_ERROR, validate_households, validate_members
+
+
+def table(rows):
+    """An upload as read_table() returns it: all-string columns, blanks as ''."""
+    return pd.DataFrame(rows).fillna("").astype(str)
+
+
+def errors(report):
+    return sorted(zip(report["row"], report["column"]))
+
+
+def test_households_valid_rows_are_converted():
+    valid, report = validate_households(table([
+        {"m_no": "1", "family_head": "राम पाटील", "member_count": "4", "mobile": "+91 98765-43210"},
+        {"m_no": "2", "family_head": "सीता जाधव", "ranjan": ""},
+    ]))
+    assert report.empty
+    assert valid["m_no"].tolist() == [1, 2]
+    assert valid["member_count"].tolist() == [4, 0]
+    assert valid["mobile"].tolist() == ["9876543210", ""]
+
+
+def test_households_error_rows_use_file_line_numbers():
+    valid, report = validate_households(table([
+        {"m_no": "1", "family_head": "अ"},
+        {"m_no": "x", "family_head": "ब"},        # line 3: bad M No
+        {"m_no": "3", "family_head": ""},         # line 4: no head
+        {"m_no": "4", "family_head": "ड", "taki": "-1", "mobile": "12345"},  # line 5
+        {"m_no": "6", "family_head": "इ"},
+        {"m_no": "6", "family_head": "फ"},        # lines 6 and 7: duplicate M No
+    ]))
+    assert errors(report) == [(3, "m_no"), (4, "family_head"), (5, "mobile"), (5, "taki"), (6, "m_no"), (7, "m_no")]
+    assert valid["m_no"].tolist() == [1]
+
+
+def test_households_missing_required_column():
+    valid, report = validate_households(table([{"m_no": "1"}]))
+    assert valid.empty
+    assert report.to_dict("records") == [{"row": 1, "column": "family_head", "error": "column missing"}]
+
+
+def test_households_existing_mno_is_reported_but_stays_valid():
+    valid, report = validate_households(table([
+        {"m_no": "1", "family_head": "अ"},
+        {"m_no": "2", "family_head": "ब"},
+    ]), existing_mnos=pd.Series([2, 9]))
+    assert valid["m_no"].tolist() == [1, 2]
+    assert report.to_dict("records") == [{"row": 3, "column": "m_no", "error": EXISTING_MNO_ERROR}]
+
+
+def member(m_no="1", name="राम", age="30", gender="पुरुष", bp="होय", sugar="no", **extra):
+    return {"m_no": m_no, "member_name": name, "age": age, "gender": gender, "bp": bp, "sugar": sugar, **extra}
+
+
+def test_members_valid_rows_are_mapped():
+    valid, report = validate_members(table([member(), member(name="सीता", gender="F", bp="", sugar="yes")]), [1])
+    assert report.empty
+    assert valid["gender"].tolist() == ["Male", "Female"]
+    assert valid["bp"].tolist() == [True, False]
+    assert valid["sugar"].tolist() == [False, True]
+
+
+def test_members_error_rows():
+    valid, report = validate_members(table([
+        member(),
+        member(m_no="7"),                       # line 3: unknown household
+        member(name="क", age="130"),            # line 4
+        member(name="अ", gender="?"),           # line 5
+        member(name="ब", bp="maybe"),           # line 6
+        member(name="", mobile="123"),          # line 7: no name, bad mobile
+    ]), [1])
+    assert errors(report) == [(3, "m_no"), (4, "age"), (5, "gender"), (6, "bp"), (7, "member_name"), (7, "mobile")]
+    assert valid.index.tolist() == [0]
+
+
+def test_members_duplicates_in_file_keep_the_first():
+    valid, report = validate_members(table([member(), member(age="31"), member(m_no="2")]), [1, 2])
+    assert report.to_dict("records") == [
+        {"row": 3, "column": "member_name", "error": "duplicate member in file (same M No and name)"}]
+    assert valid["m_no"].tolist() == [1, 2]
@@ -0,0 +1,148 @@
+# tests/test_report_jobs.py
+"""
+Lease / reclaim SQL of report_jobs against a real PostgreSQL.
+
+Set TEST_DATABASE_URL (any database the user may create schemas in); the
+tables are created in a throw-away schema, so nothing else is touched.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+import psycopg
+import pytest
+
+import report_jobs
+from migrations import MIGRATIONS
+from report_jobs import WORKER_ID, JobLimitError, JobRunner
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+SCHEMA = f"test_report_jobs_{os.getpid()}"
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.execute(f"CREATE SCHEMA {SCHEMA}")
+
+    @contextmanager
+    def connect():
+        with psycopg.connect(DATABASE_URL, options=f"-c search_path={SCHEMA}") as conn:
+            yield conn
+
+    with connect() as conn:
+        for version, _, statements in MIGRATIONS:
+            if version in (8, 9, 10):
+                for statement in statements:
+                    conn.execute(statement)
+    monkeypatch.setattr(report_jobs, "get_connection", connect)
+    monkeypatch.setitem(report_jobs.JOB_KINDS, "test.kind", lambda params, progress: (b"%PDF", "a.pdf", "application/pdf"))
+    yield connect
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+
+
+class FakeExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+
+
+def runner():
+    """A JobRunner without its thread pool / heartbeat thread."""
+    r = JobRunner.__new__(JobRunner)
+    r._executor = FakeExecutor()
+    r._lock = threading.Lock()
+    r.running = 0
+    return r
+
+
+def add_job(db, username="mpw1", kind="test.kind", status="queued", worker="old-host:1",
+            attempts=1, age_seconds=0):
+    with db() as conn:
+        return conn.execute("""
+            INSERT INTO report_jobs (username, kind, title, params, status, worker, attempts, heartbeat_at)
+            VALUES (%s, %s, 't', '{"sets": 1}', %s, %s, %s, now() - make_interval(secs => %s))
+            RETURNING id
+        """, (username, kind, status, worker, attempts, age_seconds)).fetchone()[0]
+
+
+def job(db, job_id):
+    with db() as conn:
+        return conn.execute("SELECT status, worker, attempts, error IS NOT NULL FROM report_jobs WHERE id = %s",
+                            (job_id,)).fetchone()
+
+
+STALE = report_jobs.LEASE_SECONDS + 60
+
+
+def test_reclaim_takes_over_stale_jobs(db):
+    queued = add_job(db, age_seconds=STALE)
+    running = add_job(db, status="running", age_seconds=STALE)
+    r = runner()
+    r._reclaim()
+
+    assert job(db, queued) == ("queued", WORKER_ID, 2, False)
+    assert job(db, running) == ("queued", WORKER_ID, 2, False)
+    assert r._executor.submitted == [(queued, "test.kind", {"sets": 1}), (running, "test.kind", {"sets": 1})]
+
+
+def test_reclaim_fails_jobs_out_of_attempts(db):
+    job_id = add_job(db, status="running", attempts=report_jobs.MAX_ATTEMPTS, age_seconds=STALE)
+    r = runner()
+    r._reclaim()
+
+    assert job(db, job_id) == ("failed", "old-host:1", report_jobs.MAX_ATTEMPTS, True)
+    assert r._executor.submitted == []
+
+
+def test_reclaim_leaves_live_finished_and_unknown_jobs(db):
+    live = add_job(db, status="running")
+    done = add_job(db, status="done", age_seconds=STALE)
+    unknown = add_job(db, kind="removed.kind", age_seconds=STALE)
+    r = runner()
+    r._reclaim()
+
+    assert job(db, live) == ("running", "old-host:1", 1, False)
+    assert job(db, done) == ("done", "old-host:1", 1, False)
+    assert job(db, unknown) == ("queued", "old-host:1", 1, False)
+    assert r._executor.submitted == []
+
+
+def test_reclaimed_job_is_not_finished_by_its_old_worker(db, monkeypatch):
+    job_id = add_job(db, age_seconds=STALE)
+    runner()._reclaim()
+    monkeypatch.setattr(report_jobs, "WORKER_ID", "old-host:1")
+    runner()._run(job_id, "test.kind", {})
+    assert job(db, job_id) == ("queued", WORKER_ID, 2, False)
+
+
+def test_run_stores_the_file_and_delete_removes_it(db):
+    job_id = add_job(db, worker=WORKER_ID)
+    runner()._run(job_id, "test.kind", {})
+
+    assert job(db, job_id) == ("done", WORKER_ID, 1, False)
+    assert report_jobs.job_file.__wrapped__("mpw1", job_id) == b"%PDF"
+    assert report_jobs.job_file.__wrapped__("mpw2", job_id) is None
+    report_jobs.delete_job("mpw1", job_id)
+    with db() as conn:
+        assert conn.execute("SELECT count(*) FROM report_job_files").fetchone()[0] == 0
+
+
+def test_limit_ignores_stale_jobs(db):
+    for _ in range(report_jobs.MAX_ACTIVE_PER_USER):
+        add_job(db, age_seconds=STALE)
+    r = runner()
+    job_id = r.submit("mpw1", "test.kind", {}, "t")
+    assert r._executor.submitted == [(job_id, "test.kind", {})]
+
+    for _ in range(report_jobs.MAX_ACTIVE_PER_USER - 1):
+        add_job(db)
+    with pytest.raises(JobLimitError):
+        r.submit("mpw1", "test.kind", {}, "t")
+    r.submit("mpw2", "test.kind", {}, "t")
@@ -0,0 +1,134 @@
+# tests/test_single_flight.py
+import threading
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+class Interrupted(BaseException):
+    """Stands in for Streamlit's RerunException / StopException."""
+
+
+def start_waiters(flights, key, n, fn, label="gen"):
+    """Start ``n`` callers of ``flights.do(key, fn)``; returns (threads, outcomes)."""
+    outcomes = []
+
+    def call():
+        try:
+            outcomes.append(("value", flights.do(key, fn, label=label)))
+        except Exception as e:
+            outcomes.append(("error", e))
+
+    threads = [threading.Thread(target=call) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads, outcomes
+
+
+def wait_for_waiters(flights, key, n):
+    for _ in range(500):
+        with flights._lock:
+            call = flights._calls.get(key)
+            if call is not None and call.waiters == n:
+                return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"expected {n} waiters on {key!r}")
+
+
+def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    runs = []
+
+    def render():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return b"pdf"
+
+    leader, outcomes = start_waiters(flights, "k", 1, render)
+    assert started.wait(5)
+    waiters, waiter_outcomes = start_waiters(flights, "k", 4, render)
+    wait_for_waiters(flights, "k", 4)
+    release.set()
+    for t in leader + waiters:
+        t.join(5)
+
+    assert len(runs) == 1
+    assert outcomes + waiter_outcomes == [("value", b"pdf")] * 5
+    assert flights.stats() == [{"generator": "gen", "renders": 1, "coalesced": 4}]
+    assert flights.in_flight() == 0
+
+
+def test_sequential_calls_each_run():
+    flights = SingleFlight()
+    assert flights.do("k", lambda: 1) == 1
+    assert flights.do("k", lambda: 2) == 2
+    assert flights.stats() == [{"generator": "other", "renders": 2, "coalesced": 0}]
+
+
+def test_exception_reaches_every_caller_and_frees_the_key():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    error = ValueError("render failed")
+
+    def render():
+        started.set()
+        release.wait(5)
+        raise error
+
+    leader, outcomes = start_waiters(flights, "k", 1, render)
+    assert started.wait(5)
+    waiters, waiter_outcomes = start_waiters(flights, "k", 2, render)
+    wait_for_waiters(flights, "k", 2)
+    release.set()
+    for t in leader + waiters:
+        t.join(5)
+
+    assert outcomes + waiter_outcomes == [("error", error)] * 3
+    assert flights.in_flight() == 0
+    assert flights.do("k", lambda: "retry") == "retry"
+
+
+def test_interrupted_leader_hands_the_work_to_a_waiter():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def interrupted():
+        started.set()
+        release.wait(5)
+        raise Interrupted()
+
+    leader_error = []
+
+    def lead():
+        try:
+            flights.do("k", interrupted)
+        except Interrupted as e:
+            leader_error.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    assert started.wait(5)
+    waiters, outcomes = start_waiters(flights, "k", 1, lambda: "own render")
+    wait_for_waiters(flights, "k", 1)
+    release.set()
+    leader.join(5)
+    for t in waiters:
+        t.join(5)
+
+    assert len(leader_error) == 1
+    assert outcomes == [("value", "own render")]
+    assert flights.in_flight() == 0
+
+
+def test_base_exception_is_not_swallowed():
+    flights = SingleFlight()
+
+    def interrupted():
+        raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        flights.do("k", interrupted)
+    assert flights.in_flight() == 0
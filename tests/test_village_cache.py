@@ -0,0 +1,70 @@
+# tests/test_village_cache.py
+import threading
+
+from village_cache import VillageCache
+
+
+def counting_loader(value="rows"):
+    calls = []
+
+    def load():
+        calls.append(1)
+        return value
+    return load, calls
+
+
+def test_second_read_is_a_hit():
+    cache = VillageCache()
+    load, calls = counting_loader()
+    assert cache.get("register", "गाव", load) == "rows"
+    assert cache.get("register", "गाव", load) == "rows"
+    assert len(calls) == 1
+    assert cache.stats() == {"entries": 1, "villages": 0, "hits": 1, "misses": 1}
+
+
+def test_args_are_part_of_the_key():
+    cache = VillageCache()
+    cache.get("beneficiaries", "गाव", lambda: "a", "user1")
+    assert cache.get("beneficiaries", "गाव", lambda: "b", "user2") == "b"
+    assert cache.get("beneficiaries", "गाव", lambda: "c", "user1") == "a"
+
+
+def test_bump_drops_only_that_village():
+    cache = VillageCache()
+    cache.get("register", "A", lambda: "a1")
+    cache.get("register", "B", lambda: "b1")
+    cache.bump("A")
+    assert cache.version("A") == 1 and cache.version("B") == 0
+    assert cache.get("register", "A", lambda: "a2") == "a2"
+    assert cache.get("register", "B", lambda: "b2") == "b1"
+
+
+def test_clear_bumps_every_village():
+    cache = VillageCache()
+    cache.get("register", "A", lambda: "a1")
+    cache.bump("B")
+    cache.clear()
+    assert cache.version("A") == 1 and cache.version("B") == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_value_loaded_across_a_bump_is_returned_but_not_kept():
+    cache = VillageCache()
+    loading, release = threading.Event(), threading.Event()
+    result = []
+
+    def slow_load():
+        loading.set()
+        release.wait(5)
+        return "before write"
+
+    reader = threading.Thread(target=lambda: result.append(cache.get("register", "गाव", slow_load)))
+    reader.start()
+    assert loading.wait(5)
+    cache.bump("गाव")  # a write commits while the old rows are being read
+    release.set()
+    reader.join(5)
+
+    assert result == ["before write"]
+    assert cache.stats()["entries"] == 0
+    assert cache.get("register", "गाव", lambda: "after write") == "after write"
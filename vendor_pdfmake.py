@@ -0,0 +1,62 @@
+# vendor_pdfmake.py
+"""
+Download the pinned pdfmake runtime into static/vendor/ so the app serves
+it locally (see assets.pdfmake_script). Run once and commit both files:
+
+    python vendor_pdfmake.py
+
+While assets.PDFMAKE_SHA256 is unset, the download is written and its
+digest is pinned into assets.py – compare it with the published npm
+package (pdfmake@<version>/build/pdfmake.min.js) before committing. Once
+pinned, any download with a different digest is refused.
+"""
+import hashlib
+import re
+import sys
+import urllib.request
+from pathlib import Path
+
+import assets
+from assets import PDFMAKE_CDN_URL, PDFMAKE_PATH, PDFMAKE_SHA256, write_atomic
+
+PIN_LINE = re.compile(r"^PDFMAKE_SHA256 = .*$", re.MULTILINE)
+
+
+def pin_digest(digest, source=Path(assets.__file__)):
+    """Write ``digest`` into the PDFMAKE_SHA256 line of assets.py."""
+    text = source.read_text(encoding="utf-8")
+    pinned, count = PIN_LINE.subn(f'PDFMAKE_SHA256 = "{digest}"', text)
+    if count != 1:
+        raise ValueError(f"no PDFMAKE_SHA256 line in {source}")
+    write_atomic(source, pinned.encode("utf-8"))
+
+
+def vendor_pdfmake(force=False):
+    """Fetch pdfmake.min.js from cdnjs unless it is already vendored; returns its sha256."""
+    if PDFMAKE_PATH.exists() and not force:
+        digest = hashlib.sha256(PDFMAKE_PATH.read_bytes()).hexdigest()
+    else:
+        with urllib.request.urlopen(PDFMAKE_CDN_URL, timeout=60) as response:
+            data = response.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if PDFMAKE_SHA256 is not None and digest != PDFMAKE_SHA256:
+            raise ValueError(f"{PDFMAKE_CDN_URL} has sha256 {digest}, expected {PDFMAKE_SHA256}")
+        write_atomic(PDFMAKE_PATH, data)
+    if PDFMAKE_SHA256 is None:
+        pin_digest(digest)
+        print(f"Pinned PDFMAKE_SHA256 = {digest} in assets.py – verify it against the npm package")
+    elif digest != PDFMAKE_SHA256:
+        raise ValueError(f"{PDFMAKE_PATH} has sha256 {digest}, expected {PDFMAKE_SHA256} – rerun with --force")
+    return digest
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    digest = vendor_pdfmake(force="--force" in argv)
+    print(f"{PDFMAKE_PATH.relative_to(PDFMAKE_PATH.parents[2])}  sha256={digest}  "
+          f"{PDFMAKE_PATH.stat().st_size / 1024:.0f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
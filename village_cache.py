@@ -0,0 +1,136 @@
+# village_cache.py
+"""
+Village-scoped read-through cache for register data.
+
+Every entry is keyed by (kind, village, *args) and stamped with the
+village's version counter. Write paths call bump_village() right after
+they commit, which bumps the counter and drops that village's entries,
+so the writer's next rerun reloads fresh rows while every other rerun is
+served from memory without touching PostgreSQL.
+
+Cached frames are shared between sessions – treat them as read-only.
+"""
+import threading
+
+import pandas as pd
+import streamlit as st
+from db_config import get_connection
+
+
+class VillageCache:
+    """Thread-safe {(kind, village, *args): (version, value)} store."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, village):
+        with self._lock:
+            return self._versions.get(village, 0)
+
+    def bump(self, village):
+        """Invalidate everything cached for one village."""
+        with self._lock:
+            self._versions[village] = self._versions.get(village, 0) + 1
+            for key in [k for k in self._entries if k[1] == village]:
+                del self._entries[key]
+
+    def clear(self):
+        """Invalidate every village (e.g. after missing cross-process events)."""
+        with self._lock:
+            for village in set(self._versions) | {key[1] for key in self._entries}:
+                self._versions[village] = self._versions.get(village, 0) + 1
+            self._entries.clear()
+
+    def get(self, kind, village, loader, *args):
+        key = (kind, village) + args
+        with self._lock:
+            version = self._versions.get(village, 0)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            # Only keep the value if no write landed while we were loading
+            if self._versions.get(village, 0) == version:
+                self._entries[key] = (version, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "villages": len(self._versions),
+                    "hits": self.hits, "misses": self.misses}
+
+
+@st.cache_resource
+def get_cache():
+    return VillageCache()
+
+
+def bump_village(village):
+    """Call after committing any INSERT/UPDATE/DELETE touching this village."""
+    get_cache().bump(village)
+
+
+def _read(query, params):
+    with get_connection() as conn:
+        return pd.read_sql(query, conn, params=params)
+
+
+# ==========================
+# 📚 Cached village reads
+# ==========================
+def mno_list(village):
+    """M No column for the village, ordered."""
+    return get_cache().get("mno_list", village, lambda: _read(
+        "SELECT m_no FROM m_no_register WHERE village_name = %s ORDER BY m_no", (village,)
+    ))
+
+
+def register_frame(village):
+    """Full m_no_register rows for the village, ordered by M No."""
+    return get_cache().get("register", village, lambda: _read(
+        "SELECT * FROM m_no_register WHERE village_name = %s ORDER BY m_no", (village,)
+    ))
+
+
+def report_frame(village):
+    """Joined family_members + m_no_register rows for the village, Arrow-backed.
+
+    Loaded once per village version; Reports & Search filters it with
+    boolean masks (see reports_and_search.filter_report) instead of
+    re-running the join for every filter change.
+    """
+    def load():
+        with get_connection() as conn:
+            return pd.read_sql("""
+                SELECT f.*, m.family_head
+                FROM family_members f
+                JOIN m_no_register m
+                ON f.m_no = m.m_no AND f.village_name = m.village_name
+                WHERE f.village_name = %s
+                ORDER BY f.m_no, f.id
+            """, conn, params=(village,), dtype_backend="pyarrow")
+
+    return get_cache().get("report", village, load)
+
+
+def beneficiary_frame(village, created_by):
+    """Beneficiaries entered by one user (dob already converted to date)."""
+    def load():
+        df = _read(
+            "SELECT id,name,dob,gender,booth_no FROM beneficiaries WHERE created_by=%s ORDER BY id",
+            (created_by,)
+        )
+        if not df.empty:
+            df["dob"] = pd.to_datetime(df["dob"]).dt.date
+        return df
+
+    return get_cache().get("beneficiaries", village, load, created_by)
@@ -0,0 +1,99 @@
+# village_events.py
+"""
+Cross-process cache invalidation over PostgreSQL LISTEN/NOTIFY.
+
+Write paths call publish() inside their transaction; PostgreSQL delivers
+the notification to every listening replica when the transaction
+commits. Each process runs one background listener that drops only the
+affected village from its village_cache.
+
+Payload: {"table": ..., "village": ..., "origin": ...}. "origin" lets a
+process skip its own events (it already called bump_village); payloads
+without it – e.g. sent by a database trigger – are always applied.
+"""
+import json
+import logging
+import select
+import threading
+import time
+import uuid
+
+import psycopg
+import streamlit as st
+from psycopg.conninfo import make_conninfo
+from db_config import conninfo
+from village_cache import get_cache
+
+CHANNEL = "village_changes"
+PROCESS_ID = uuid.uuid4().hex
+# An idle LISTEN socket silently dropped by a NAT / proxy would otherwise
+# block forever: ping it this often, and let TCP keepalives (plus
+# tcp_user_timeout for the ping itself) turn a dead peer into an error.
+PING_SECONDS = 30
+KEEPALIVE_OPTIONS = dict(keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3,
+                         tcp_user_timeout=60_000)
+
+log = logging.getLogger(__name__)
+
+
+def publish(cur, table, village):
+    """Queue an invalidation event; it is sent when the transaction commits."""
+    payload = json.dumps({"table": table, "village": village, "origin": PROCESS_ID}, ensure_ascii=False)
+    cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, payload))
+
+
+def handle_payload(payload, cache=None):
+    """Apply one notification payload to the local cache. Returns the village dropped, if any."""
+    try:
+        event = json.loads(payload)
+    except ValueError:
+        log.warning("Ignoring malformed %s payload: %r", CHANNEL, payload)
+        return None
+    if event.get("origin") == PROCESS_ID or not event.get("village"):
+        return None
+    (cache or get_cache()).bump(event["village"])
+    return event["village"]
+
+
+class VillageListener(threading.Thread):
+    """Daemon thread holding one dedicated LISTEN connection, reconnecting on failure."""
+
+    def __init__(self, dsn, cache):
+        super().__init__(name="village-listener", daemon=True)
+        self.dsn = dsn
+        self.cache = cache
+        self.received = 0
+        self.connected = False
+
+    def _on_notify(self, notify):
+        self.received += 1
+        handle_payload(notify.payload, self.cache)
+
+    def run(self):
+        delay = 1
+        while True:
+            try:
+                with psycopg.connect(self.dsn, autocommit=True) as conn:
+                    conn.add_notify_handler(self._on_notify)
+                    conn.execute(f"LISTEN {CHANNEL}")
+                    self.connected = True
+                    # Events may have been missed while disconnected
+                    self.cache.clear()
+                    delay = 1
+                    while True:
+                        select.select([conn.fileno()], [], [], PING_SECONDS)
+                        # Delivers whatever arrived to _on_notify; raises if the connection is gone
+                        conn.execute("SELECT 1")
+            except Exception as e:
+                log.warning("Village listener disconnected (%s); retrying in %ss", e, delay)
+            self.connected = False
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+
+
+@st.cache_resource
+def start_listener():
+    """Start this process's listener once; later calls return the same thread."""
+    listener = VillageListener(make_conninfo(conninfo(), **KEEPALIVE_OPTIONS), get_cache())
+    listener.start()
+    return listener